@@ -1,18 +1,24 @@
 # -*- coding: utf-8 -*-
 import logging
 import random
+import signal
 import sys
 import time
 
 from django import VERSION
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
+from background_task.supervisor import Supervisor
 from background_task.tasks import tasks, autodiscover
+from background_task.wakeup import get_listener
 from compat import close_connection
 
 
 logger = logging.getLogger(__name__)
 
+# How long an idle worker first waits before checking for new tasks again, doubling up to --sleep while it stays idle
+MIN_SLEEP = 0.5
+
 
 def _configure_log_std():
     class StdOutWrapper(object):
@@ -43,7 +49,8 @@ class Command(BaseCommand):
             'dest': 'sleep',
             'type': float,
             'default': 5.0,
-            'help': 'Sleep for this many seconds before checking for new tasks (if none were found) - default is 5',
+            'help': 'Sleep for up to this many seconds before checking for new tasks (if none were found), '
+                    'unless woken up by a new one - default is 5',
         }),
         (('--queue', ), {
             'action': 'store',
@@ -55,6 +62,20 @@ class Command(BaseCommand):
             'dest': 'log_std',
             'help': 'Redirect stdout and stderr to the logging system',
         }),
+        (('--workers', ), {
+            'action': 'store',
+            'dest': 'workers',
+            'type': int,
+            'default': 0,
+            'help': 'Run this many worker processes for --queue (or every queue), '
+                    'restarting them if they crash - default is 0, to run tasks in this process',
+        }),
+        (('--queue-workers', ), {
+            'action': 'append',
+            'dest': 'queue_workers',
+            'metavar': 'QUEUE=N',
+            'help': 'Also run N worker processes that only process tasks on the named queue - may be repeated',
+        }),
 
     )
 
@@ -76,20 +97,59 @@ class Command(BaseCommand):
         sleep = options.pop('sleep', 5.0)
         queue = options.pop('queue', None)
         log_std = options.pop('log_std', False)
+        workers = options.pop('workers', 0)
+        queue_workers = options.pop('queue_workers', None) or []
 
         if log_std:
             _configure_log_std()
 
+        # one worker process per entry, for the queue it names
+        allocation = [queue] * workers
+        for spec in queue_workers:
+            (name, _, count) = spec.partition('=')
+            if not name or not count.isdigit():
+                raise CommandError('--queue-workers expects QUEUE=N, not %r' % spec)
+            allocation.extend([name] * int(count))
+
         autodiscover()
 
-        start_time = time.time()
+        if allocation:
+            try:
+                Supervisor(self.run_worker, allocation, duration, sleep).run()
+            except NotImplementedError as e:
+                raise CommandError('--workers is not supported on this platform: %s' % e)
+        else:
+            self.run_worker(queue, duration, sleep)
+
+    def stop(self, signum=None, frame=None):
+        # let the task that's running finish first
+        self._stopping = True
 
-        while (duration <= 0) or (time.time() - start_time) <= duration:
-            if not self._tasks.run_next_task(queue):
-                # there were no tasks in the queue, let's recover.
-                close_connection()
-                logger.debug('waiting for tasks')
-                time.sleep(sleep)
-            else:
-                # there were some tasks to process, let's check if there is more work to do after a little break.
-                time.sleep(random.uniform(0.5, 1.5))
+    def run_worker(self, queue, duration, sleep):
+        self._stopping = False
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self.stop)
+
+        start_time = time.time()
+        listener = get_listener(queue)
+        wait = min(MIN_SLEEP, sleep)
+
+        try:
+            while not self._stopping and ((duration <= 0) or (time.time() - start_time) <= duration):
+                if not self._tasks.run_next_task(queue):
+                    # there were no tasks in the queue, let's recover.
+                    close_connection()
+                    logger.debug('waiting for tasks')
+                    if listener.wait(wait):
+                        wait = min(MIN_SLEEP, sleep)
+                    else:
+                        # still nothing, so check less often; tasks scheduled for later are only found this way
+                        wait = min(wait * 2, sleep)
+                else:
+                    wait = min(MIN_SLEEP, sleep)
+                    if not self._tasks.has_claimed_tasks(queue):
+                        # there were some tasks to process, let's check if there is more work to do after a little break.
+                        time.sleep(random.uniform(0.5, 1.5))
+        finally:
+            self._tasks.release_claimed_tasks()
+            listener.close()
@@ -6,13 +6,15 @@ import inspect
 import json
 import logging
 import os
+import socket
 import traceback
+import uuid
 
 from compat import python_2_unicode_compatible
 from compat import StringIO
 from compat.models import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.db import connections, models
 from django.db.models import Q
 from django.utils import timezone
 
@@ -23,6 +25,28 @@ from background_task.signals import task_failed, task_rescheduled
 logger = logging.getLogger(__name__)
 
 
+def make_worker_name():
+    '''
+    Names a worker for locked_by. The random part keeps it apart from workers on
+    other machines with the same pid, and from an earlier worker with its pid.
+    '''
+    # locked_by holds 64 characters
+    return '%s:%s:%s' % (socket.gethostname()[:40], os.getpid(), uuid.uuid4().hex[:8])
+
+
+def get_worker_pid(worker_name):
+    '''
+    Returns the pid of the named worker, or None if it's not on this machine.
+    '''
+    parts = (worker_name or '').split(':')
+    if len(parts) == 1:
+        # named before workers had hostnames in their names
+        return int(parts[0])
+    if parts[0] != socket.gethostname()[:40]:
+        return None
+    return int(parts[1])
+
+
 # inspired by http://github.com/tobi/delayed_job
 #
 
@@ -86,11 +110,13 @@ class TaskManager(six.with_metaclass(GetQuerySetMetaclass, models.Manager)):
     def created_by(self, creator):
         return self.get_queryset().created_by(creator)
 
-    def find_available(self, queue=None):
+    def find_available(self, queue=None, task_names=None):
         now = timezone.now()
         qs = self.unlocked(now)
         if queue:
             qs = qs.filter(queue=queue)
+        if task_names is not None:
+            qs = qs.filter(task_name__in=task_names)
         ready = qs.filter(run_at__lte=now, failed_at=None)
         _priority_ordering = '{}priority'.format(app_settings.BACKGROUND_TASK_PRIORITY_ORDERING)
         ready = ready.order_by(_priority_ordering, 'run_at')
@@ -105,6 +131,38 @@ class TaskManager(six.with_metaclass(GetQuerySetMetaclass, models.Manager)):
 
         return ready
 
+    def claim(self, locked_by, task_names=None, queue=None, limit=1):
+        """
+        Locks up to limit available tasks for locked_by in a single statement,
+        and returns them in the order they should be run.
+        """
+        if task_names is not None and not task_names:
+            return []
+
+        now = timezone.now()
+        candidates = self.find_available(queue, task_names).values_list('pk', flat=True)[:limit]
+        if candidates.query.is_empty():
+            # there's no SQL to build for it, because every async thread is busy
+            return []
+
+        connection = connections[self.db]
+        if connection.vendor == 'postgresql' and connection.pg_version >= 90500:
+            # Rows other workers are busy claiming are skipped, instead of waited for and then lost to them
+            (sql, params) = candidates.query.get_compiler(self.db).as_sql()
+            table = connection.ops.quote_name(self.model._meta.db_table)
+            claimed = list(self.raw(
+                'UPDATE ' + table + ' SET locked_by = %s, locked_at = %s '
+                'WHERE id IN (' + sql + ' FOR UPDATE SKIP LOCKED) RETURNING *',
+                [locked_by, now] + list(params)))
+        else:
+            # Checking that the tasks are still unlocked as they're updated keeps two workers
+            # from claiming the same task, on databases that don't lock it for the whole statement
+            self.unlocked(now).filter(pk__in=candidates).update(locked_by=locked_by, locked_at=now)
+            claimed = list(self.get_queryset().filter(locked_by=locked_by, locked_at=now))
+
+        descending = app_settings.BACKGROUND_TASK_PRIORITY_ORDERING == '-'
+        return sorted(claimed, key=lambda task: (-task.priority if descending else task.priority, task.run_at))
+
     def unlocked(self, now):
         max_run_time = app_settings.BACKGROUND_TASK_MAX_RUN_TIME
         qs = self.get_queryset()
@@ -112,6 +170,16 @@ class TaskManager(six.with_metaclass(GetQuerySetMetaclass, models.Manager)):
         unlocked = Q(locked_by=None) | Q(locked_at__lt=expires_at)
         return qs.filter(unlocked)
 
+    def release_expired_locks(self, now):
+        """
+        Unlocks the tasks whose lock wasn't renewed within MAX_RUN_TIME, because
+        the worker running them died, and returns how many there were.
+        """
+        max_run_time = app_settings.BACKGROUND_TASK_MAX_RUN_TIME
+        expires_at = now - timedelta(seconds=max_run_time)
+        expired = self.get_queryset().filter(locked_by__isnull=False, locked_at__lt=expires_at)
+        return expired.update(locked_by=None, locked_at=None)
+
     def locked(self, now):
         max_run_time = app_settings.BACKGROUND_TASK_MAX_RUN_TIME
         qs = self.get_queryset()
@@ -220,8 +288,11 @@ class Task(models.Model):
         Check if the locked_by process is still running.
         """
         try:
+            pid = get_worker_pid(self.locked_by)
+            if pid is None:
+                return False
             # won't kill the process. kill is a bad named system call
-            os.kill(int(self.locked_by), 0)
+            os.kill(pid, 0)
             return True
         except:
             return False
@@ -248,6 +319,16 @@ class Task(models.Model):
             return Task.objects.get(pk=self.pk)
         return None
 
+    def renew_lock(self, locked_by):
+        """
+        Refreshes the lock of a task claimed by locked_by, unless somebody else has taken it since.
+        """
+        now = timezone.now()
+        renewed = Task.objects.filter(pk=self.pk, locked_by=locked_by).update(locked_at=now)
+        if renewed:
+            self.locked_at = now
+        return bool(renewed)
+
     def _extract_error(self, type, err, tb):
         file = StringIO()
         traceback.print_exception(type, err, tb, None, file)
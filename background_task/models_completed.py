@@ -8,7 +8,7 @@ from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.utils import timezone
 
-from background_task.models import Task
+from background_task.models import Task, get_worker_pid
 
 
 class CompletedTaskQuerySet(models.QuerySet):
@@ -100,8 +100,11 @@ class CompletedTask(models.Model):
         Check if the locked_by process is still running.
         """
         try:
+            pid = get_worker_pid(self.locked_by)
+            if pid is None:
+                return False
             # won't kill the process. kill is a bad named system call
-            os.kill(int(self.locked_by), 0)
+            os.kill(pid, 0)
             return True
         except:
             return False
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
+from hashlib import sha1
 import multiprocessing
+import os
+import tempfile
 
 from django.conf import settings
 
@@ -24,14 +27,22 @@ class AppSettings(object):
 
     @property
     def MAX_RUN_TIME(self):
-        """Maximum possible task run time, after which tasks will be unlocked and tried again."""
+        """
+        Maximum time a task's lock lasts without a heartbeat, after which it will be unlocked and tried again.
+        Running tasks keep renewing their lock, see BACKGROUND_TASK_HEARTBEAT_INTERVAL.
+        """
         return getattr(settings, 'MAX_RUN_TIME', 3600)
 
     @property
     def BACKGROUND_TASK_MAX_RUN_TIME(self):
-        """Maximum possible task run time, after which tasks will be unlocked and tried again."""
+        """Maximum time a task's lock lasts without a heartbeat, after which it will be unlocked and tried again."""
         return self.MAX_RUN_TIME
 
+    @property
+    def BACKGROUND_TASK_HEARTBEAT_INTERVAL(self):
+        """How often (in seconds) the lock of a running task is renewed, and expired locks are released."""
+        return getattr(settings, 'BACKGROUND_TASK_HEARTBEAT_INTERVAL', min(60.0, self.MAX_RUN_TIME / 4.0))
+
     @property
     def BACKGROUND_TASK_RUN_ASYNC(self):
         """Control if tasks will run asynchronous in a ThreadPool."""
@@ -42,6 +53,11 @@ class AppSettings(object):
         """Specify number of concurrent threads."""
         return getattr(settings, 'BACKGROUND_TASK_ASYNC_THREADS', cpu_count)
 
+    @property
+    def BACKGROUND_TASK_CLAIM_BATCH_SIZE(self):
+        """Control how many tasks a worker locks for itself at a time."""
+        return getattr(settings, 'BACKGROUND_TASK_CLAIM_BATCH_SIZE', 5)
+
     @property
     def BACKGROUND_TASK_PRIORITY_ORDERING(self):
         """
@@ -58,4 +74,19 @@ class AppSettings(object):
             prefix = '-'
         return prefix
 
+    @property
+    def BACKGROUND_TASK_WAKEUP(self):
+        """Control if scheduling a task wakes up idle workers, instead of leaving them to find it when they next poll."""
+        return getattr(settings, 'BACKGROUND_TASK_WAKEUP', True)
+
+    @property
+    def BACKGROUND_TASK_WAKEUP_DIR(self):
+        """
+        Directory where idle workers wait for wakeups, on databases without LISTEN/NOTIFY.
+        Only workers on the same machine as the scheduling process can be woken up this way.
+        """
+        default = os.path.join(tempfile.gettempdir(), 'background_task-%s' % sha1(
+            str(settings.DATABASES['default'].get('NAME')).encode('utf-8')).hexdigest()[:12])
+        return getattr(settings, 'BACKGROUND_TASK_WAKEUP_DIR', default)
+
 app_settings = AppSettings()
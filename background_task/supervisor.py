@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import errno
+import logging
+import os
+import signal
+import time
+
+from django.db import connections
+
+from background_task.tasks import tasks
+
+logger = logging.getLogger(__name__)
+
+
+class Supervisor(object):
+    '''
+    Runs a worker process for each queue in allocation (None for a worker that
+    takes tasks from every queue), replaces the ones that die, and stops them all
+    once it's told to stop or its duration is up.
+    '''
+    # a worker that dies sooner than this after starting is restarted after a delay, so a broken one can't spin
+    min_uptime = 10.0
+    restart_delay = 5.0
+    # how long workers get to finish their current task once they're told to stop
+    shutdown_timeout = 25.0
+
+    def __init__(self, run_worker, allocation, duration=0, sleep=5.0):
+        self.run_worker = run_worker
+        self.allocation = allocation
+        self.duration = duration
+        self.sleep = sleep
+
+        # pid -> (queue, started at)
+        self.workers = {}
+        # (restart at, queue)
+        self.pending = []
+        self.stopping = False
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+
+    def run(self):
+        if not hasattr(os, 'fork'):
+            raise NotImplementedError('worker processes need os.fork()')
+
+        handlers = dict((signum, signal.signal(signum, self.stop)) for signum in (signal.SIGTERM, signal.SIGINT))
+        # the workers must not share our database connections
+        connections.close_all()
+
+        try:
+            for queue in self.allocation:
+                self.start(queue)
+
+            start_time = time.time()
+            while not self.stopping and ((self.duration <= 0) or (time.time() - start_time) <= self.duration):
+                self.reap(restart=True)
+                now = time.time()
+                for (restart_at, queue) in [item for item in self.pending if item[0] <= now]:
+                    self.pending.remove((restart_at, queue))
+                    self.start(queue)
+                time.sleep(min(1.0, self.sleep))
+        finally:
+            self.stop_workers()
+            for (signum, handler) in handlers.items():
+                signal.signal(signum, handler)
+
+    def start(self, queue):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.default_int_handler)
+                tasks.after_fork()
+                self.run_worker(queue, 0, self.sleep)
+            except BaseException:
+                logger.exception('Worker %d for queue %s crashed', os.getpid(), queue)
+                status = 1
+            finally:
+                # never return to the supervisor's code
+                os._exit(status)
+
+        logger.info('Started worker %d for queue %s', pid, queue)
+        self.workers[pid] = (queue, time.time())
+
+    def reap(self, restart=False):
+        while self.workers:
+            try:
+                (pid, status) = os.waitpid(-1, os.WNOHANG)
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                if e.errno == errno.ECHILD:
+                    self.workers = {}
+                    break
+                raise
+            if not pid:
+                break
+            if pid not in self.workers:
+                continue
+
+            (queue, started_at) = self.workers.pop(pid)
+            if not restart:
+                continue
+
+            uptime = time.time() - started_at
+            delay = self.restart_delay if uptime < self.min_uptime else 0
+            if os.WIFSIGNALED(status):
+                reason = 'was killed by signal %d' % os.WTERMSIG(status)
+            else:
+                reason = 'exited with status %d' % os.WEXITSTATUS(status)
+            logger.warning('Worker %d for queue %s %s after %ds, restarting it in %ds',
+                           pid, queue, reason, uptime, delay)
+            self.pending.append((time.time() + delay, queue))
+
+    def stop_workers(self):
+        for pid in list(self.workers):
+            self.kill(pid, signal.SIGTERM)
+
+        deadline = time.time() + self.shutdown_timeout
+        while self.workers and time.time() < deadline:
+            self.reap()
+            time.sleep(0.1)
+
+        for pid in list(self.workers):
+            logger.warning('Worker %d did not stop in time, killing it', pid)
+            self.kill(pid, signal.SIGKILL)
+        while self.workers:
+            self.reap()
+            time.sleep(0.1)
+        self.pending = []
+
+    def kill(self, pid, signum):
+        try:
+            os.kill(pid, signum)
+        except OSError as e:
+            if e.errno != errno.ESRCH:
+                raise
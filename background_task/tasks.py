@@ -6,16 +6,20 @@ from multiprocessing.pool import ThreadPool
 import logging
 import os
 import sys
+import threading
+import time
 
 from compat import atomic
+from django.db import connection
 from compat import import_module
 from django.utils import timezone
 from django.utils.encoding import python_2_unicode_compatible
 
 from background_task.exceptions import BackgroundTaskError
-from background_task.models import Task
+from background_task.models import Task, make_worker_name
 from background_task.settings import app_settings
 from background_task import signals
+from background_task import wakeup
 
 logger = logging.getLogger(__name__)
 _thread_pool = ThreadPool(processes=app_settings.BACKGROUND_TASK_ASYNC_THREADS)
@@ -27,6 +31,7 @@ def bg_runner(proxy_task, task=None, *args, **kwargs):
     If a Task instance is provided, args and kwargs are ignored and retrieved from the Task itself.
     """
     signals.task_started.send(Task)
+    heartbeat = None
     try:
         func = getattr(proxy_task, 'task_function', None)
         if isinstance(task, Task):
@@ -41,27 +46,91 @@ def bg_runner(proxy_task, task=None, *args, **kwargs):
                 task = task_qs[0]
         if func is None:
             raise BackgroundTaskError("Function is None, can't execute!")
-        func(*args, **kwargs)
-
-        if task:
+        # not in a transaction, so whatever the task writes doesn't stay locked
+        # (or, on SQLite, keep the heartbeat from writing) until it's done
+        heartbeat = Heartbeat(task)
+        with heartbeat:
+            if not heartbeat.lost:
+                func(*args, **kwargs)
+
+        if task and heartbeat.lost:
+            # it's another worker's task now, which runs it and then deletes or reschedules it
+            pass
+        elif task:
             # task done, so can delete it
-            task.increment_attempts()
-            completed = task.create_completed_task()
-            signals.task_successful.send(sender=task.__class__, task_id=task.id, completed_task=completed)
-            task.create_repetition()
-            task.delete()
+            with atomic():
+                task.increment_attempts()
+                completed = task.create_completed_task()
+                signals.task_successful.send(sender=task.__class__, task_id=task.id, completed_task=completed)
+                task.create_repetition()
+                task.delete()
             logger.info('Ran task and deleting %s', task)
 
     except Exception as ex:
         t, e, traceback = sys.exc_info()
-        if task:
+        if task and not (heartbeat and heartbeat.lost):
             logger.error('Rescheduling %s', task, exc_info=(t, e, traceback))
             signals.task_error.send(sender=ex.__class__, task=task)
-            task.reschedule(t, e, traceback)
+            with atomic():
+                task.reschedule(t, e, traceback)
         del traceback
     signals.task_finished.send(Task)
 
 
+class Heartbeat(object):
+    '''
+    Keeps renewing the lock of a task from another thread while it runs, so that
+    other workers only take it over once the worker running it has died.
+    '''
+
+    def __init__(self, task, interval=None):
+        self.task = task
+        self.interval = interval or app_settings.BACKGROUND_TASK_HEARTBEAT_INTERVAL
+        self._stopped = threading.Event()
+        self._thread = None
+        # set once another worker has taken the task over, which then runs it instead
+        self.lost = False
+
+    def __enter__(self):
+        if isinstance(self.task, Task) and self.task.locked_by:
+            # it may have waited for a thread past MAX_RUN_TIME, and been taken over since
+            if not self.task.renew_lock(self.task.locked_by):
+                logger.warning('Not running %s, another worker took it over while it waited', self.task)
+                self.lost = True
+                return self
+            self._thread = threading.Thread(target=self.run, name='heartbeat-%s' % self.task.pk)
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def run(self):
+        try:
+            while not self._stopped.wait(self.interval):
+                if not self.beat():
+                    break
+        finally:
+            # this thread's connection would otherwise be left open
+            connection.close()
+
+    def beat(self):
+        try:
+            if self.task.renew_lock(self.task.locked_by):
+                return True
+            logger.warning('Lost the lock of %s while running it, leaving it to the worker that took it over',
+                           self.task)
+            self.lost = True
+        except Exception:
+            logger.exception('Could not renew the lock of %s', self.task)
+            # the next one may get through
+            return True
+        return False
+
+
 class Tasks(object):
     def __init__(self):
         self._tasks = {}
@@ -114,6 +183,19 @@ class Tasks(object):
     def run_next_task(self, queue=None):
         return self._runner.run_next_task(self, queue)
 
+    def has_claimed_tasks(self, queue=None):
+        return self._runner.has_claimed_tasks(queue)
+
+    def release_claimed_tasks(self):
+        return self._runner.release_claimed_tasks()
+
+    def after_fork(self):
+        '''Get a process forked from this one ready to run tasks of its own'''
+        global _thread_pool
+        # the threads of the pool were left behind in the parent
+        _thread_pool = ThreadPool(processes=app_settings.BACKGROUND_TASK_ASYNC_THREADS)
+        self._runner.after_fork()
+
 
 class TaskSchedule(object):
     SCHEDULE = 0
@@ -186,7 +268,10 @@ class DBTaskRunner(object):
     '''
 
     def __init__(self):
-        self.worker_name = str(os.getpid())
+        self.worker_name = make_worker_name()
+        # tasks locked for this worker that it has not run yet, by queue
+        self._claimed = {}
+        self._last_reaped_at = 0
 
     def schedule(self, task_name, args, kwargs, run_at=None,
                  priority=0, action=TaskSchedule.SCHEDULE, queue=None, verbose_name=None, creator=None,
@@ -206,6 +291,7 @@ class DBTaskRunner(object):
             if action == TaskSchedule.RESCHEDULE_EXISTING:
                 updated = existing.update(run_at=run_at, priority=priority)
                 if updated:
+                    self.wake_up(task)
                     return
             elif action == TaskSchedule.CHECK_EXISTING:
                 if existing.count():
@@ -213,33 +299,64 @@ class DBTaskRunner(object):
 
         task.save()
         signals.task_created.send(sender=self.__class__, task=task)
+        self.wake_up(task)
         return task
 
+    def wake_up(self, task):
+        '''Let idle workers know about a task that is ready to run'''
+        if task.run_at <= timezone.now():
+            wakeup.notify(task.queue)
+
     @atomic
     def get_task_to_run(self, tasks, queue=None):
-        available_tasks = [task for task in Task.objects.find_available(queue)
-                           if task.task_name in tasks._tasks][:5]
-        for task in available_tasks:
-            # try to lock task
-            locked_task = task.lock(self.worker_name)
-            if locked_task:
-                return locked_task
+        claimed = self._claimed.setdefault(queue, [])
+        if not claimed:
+            claimed.extend(Task.objects.claim(self.worker_name, list(tasks._tasks), queue,
+                                              app_settings.BACKGROUND_TASK_CLAIM_BATCH_SIZE))
+            # these were locked just now
+            return claimed.pop(0) if claimed else None
+        while claimed:
+            task = claimed.pop(0)
+            # it may have waited past MAX_RUN_TIME and been taken by another worker
+            if task.renew_lock(self.worker_name):
+                return task
         return None
 
-    @atomic
+    def has_claimed_tasks(self, queue=None):
+        return bool(self._claimed.get(queue))
+
+    def after_fork(self):
+        self.worker_name = make_worker_name()
+        self._claimed = {}
+
+    def release_claimed_tasks(self):
+        '''Unlock the tasks claimed by this worker that it has not run yet'''
+        pks = [task.pk for claimed in self._claimed.values() for task in claimed]
+        self._claimed = {}
+        if pks:
+            Task.objects.filter(pk__in=pks, locked_by=self.worker_name).update(locked_by=None, locked_at=None)
+
     def run_task(self, tasks, task):
         logger.info('Running %s', task)
         tasks.run_task(task)
 
-    @atomic
+    def release_expired_locks(self):
+        '''Unlock the tasks of dead workers, at most once per heartbeat interval'''
+        if time.time() - self._last_reaped_at < app_settings.BACKGROUND_TASK_HEARTBEAT_INTERVAL:
+            return
+        self._last_reaped_at = time.time()
+
+        released = Task.objects.release_expired_locks(timezone.now())
+        if released:
+            logger.warning('Released %d tasks whose workers stopped renewing their locks', released)
+
     def run_next_task(self, tasks, queue=None):
-        # we need to commit to make sure
-        # we can see new tasks as they arrive
+        self.release_expired_locks()
+        # the claim is committed before the task runs, so other workers
+        # can see which tasks are taken while this one is busy
         task = self.get_task_to_run(tasks, queue)
-        # transaction.commit()
         if task:
             self.run_task(tasks, task)
-            # transaction.commit()
             return True
         else:
             return False
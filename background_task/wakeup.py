@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Wakes up idle workers as soon as a task is scheduled, so they don't have to poll
+the database to find it.
+
+On PostgreSQL this uses LISTEN/NOTIFY, which reaches workers on every machine.
+Elsewhere each idle worker binds a unix datagram socket in
+BACKGROUND_TASK_WAKEUP_DIR and schedulers send a datagram to every socket there,
+which only reaches workers on the same machine. Workers keep polling in any case,
+see process_tasks.
+"""
+import errno
+import logging
+import os
+import select
+import socket
+import time
+import uuid
+
+from django.db import connection, transaction
+
+from background_task.settings import app_settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'background_task'
+SOCKET_SUFFIX = '.sock'
+
+
+def is_postgresql():
+    return connection.vendor == 'postgresql'
+
+
+def can_use_sockets():
+    return hasattr(socket, 'AF_UNIX')
+
+
+def notify(queue=None):
+    """
+    Wakes up the workers processing queue once the current transaction commits,
+    so they can see the task that was scheduled in it.
+    """
+    if not app_settings.BACKGROUND_TASK_WAKEUP:
+        return
+
+    payload = queue or ''
+    if is_postgresql():
+        # NOTIFY is only delivered when the transaction commits by itself
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, payload])
+    elif can_use_sockets():
+        transaction.on_commit(lambda: _notify_sockets(payload))
+
+
+def _notify_sockets(payload):
+    directory = app_settings.BACKGROUND_TASK_WAKEUP_DIR
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        # Nobody is waiting
+        return
+
+    sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sender.setblocking(False)
+    try:
+        for name in names:
+            if not name.endswith(SOCKET_SUFFIX):
+                continue
+
+            path = os.path.join(directory, name)
+            try:
+                sender.sendto(payload.encode('utf-8'), path)
+            except socket.error as e:
+                if e.errno in (errno.ECONNREFUSED, errno.ENOENT):
+                    # Left behind by a worker that didn't exit cleanly
+                    _remove(path)
+                elif e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    # A full buffer means the worker has wakeups waiting already
+                    logger.warning('Could not wake up the worker at %s: %s', path, e)
+    finally:
+        sender.close()
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class Interrupted(Exception):
+    pass
+
+
+def _select(listening, timeout):
+    try:
+        return bool(select.select([listening], [], [], timeout)[0])
+    except select.error as e:
+        if e.args[0] == errno.EINTR:
+            # A signal came in, and whoever handled it may want us to stop
+            raise Interrupted()
+        raise
+
+
+class Listener(object):
+    """
+    Waits for wakeups meant for the workers of queue, or for every wakeup if queue is None.
+    """
+    def __init__(self, queue=None):
+        self.queue = queue
+
+    def wait(self, timeout):
+        """
+        Blocks for up to timeout seconds, and returns True if it was woken up before then.
+        """
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+
+            try:
+                payloads = self.receive(remaining)
+            except Interrupted:
+                return False
+            if payloads is None:
+                # Can't listen, so we're down to polling
+                time.sleep(remaining)
+                return False
+
+            if any(self.is_for_us(payload) for payload in payloads):
+                return True
+
+    def is_for_us(self, payload):
+        return self.queue is None or payload == self.queue
+
+    def receive(self, timeout):
+        """
+        Returns the payloads received within timeout seconds, or None if they can't be received.
+        """
+        return None
+
+    def close(self):
+        pass
+
+
+class PostgresListener(Listener):
+    def __init__(self, queue=None):
+        super(PostgresListener, self).__init__(queue)
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            # Kept apart from Django's connection, which process_tasks closes whenever it's idle
+            self._connection = connection.get_new_connection(connection.get_connection_params())
+            self._connection.autocommit = True
+            with self._connection.cursor() as cursor:
+                cursor.execute('LISTEN %s' % CHANNEL)
+        return self._connection
+
+    def receive(self, timeout):
+        try:
+            listening = self._connect()
+            if _select(listening, timeout):
+                listening.poll()
+            payloads = [notification.payload for notification in listening.notifies]
+            del listening.notifies[:]
+            return payloads
+        except Interrupted:
+            raise
+        except Exception as e:
+            logger.warning('Stopped listening for new tasks: %s', e)
+            self.close()
+            return None
+
+    def close(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+
+class SocketListener(Listener):
+    def __init__(self, queue=None):
+        super(SocketListener, self).__init__(queue)
+        self._socket = None
+        self._path = None
+
+    def _bind(self):
+        if self._socket is None:
+            directory = app_settings.BACKGROUND_TASK_WAKEUP_DIR
+            try:
+                os.makedirs(directory)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+
+            self._path = os.path.join(directory, '%d-%s%s' % (os.getpid(), uuid.uuid4().hex[:8], SOCKET_SUFFIX))
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._socket.bind(self._path)
+        return self._socket
+
+    def receive(self, timeout):
+        try:
+            listening = self._bind()
+            payloads = []
+            while _select(listening, timeout):
+                payloads.append(listening.recv(1024).decode('utf-8'))
+                # Take whatever else has arrived, without waiting for more
+                timeout = 0
+            return payloads
+        except (OSError, socket.error) as e:
+            logger.warning('Stopped listening for new tasks: %s', e)
+            self.close()
+            return None
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            _remove(self._path)
+            self._socket = None
+            self._path = None
+
+
+def get_listener(queue=None):
+    if not app_settings.BACKGROUND_TASK_WAKEUP:
+        return Listener(queue)
+    if is_postgresql():
+        return PostgresListener(queue)
+    if can_use_sockets():
+        return SocketListener(queue)
+    return Listener(queue)
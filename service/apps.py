@@ -5,3 +5,8 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'service'
+
+    def ready(self):
+        from service.inbox.push import connect_signals
+
+        connect_signals()
@@ -1,9 +1,65 @@
-import os
+import hashlib
+import hmac
+import threading
+import time
 
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.utils.crypto import constant_time_compare
 from rest_framework.authentication import BasicAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
 from social.app.models.node import Node
+from social.app.models.noderegistry import node_registry
+
+
+class VerifiedCredentials(object):
+    """
+    Remembers, for a short while, which password each Node last authenticated with, so checking it against the
+    Node's (deliberately slow) password hash only happens once per FEDERATION_CREDENTIALS_CACHE_TIMEOUT instead of on
+    every request.
+
+    Only a keyed digest of the password is kept, and only for the password hash it was checked against, so changing
+    a Node's password stops its old one from being accepted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Node ID -> (password hash, digest of the password, expiry time)
+        self._verified = {}
+
+    def check(self, node, password):
+        digest = hmac.new(settings.SECRET_KEY.encode('utf-8'), password.encode('utf-8'), hashlib.sha256).hexdigest()
+
+        with self._lock:
+            verified = self._verified.get(node.id)
+
+        if verified is not None:
+            (password_hash, verified_digest, expires_at) = verified
+
+            if password_hash == node.incoming_password and expires_at > time.time() and \
+                    constant_time_compare(digest, verified_digest):
+                return True
+
+        if not node.check_incoming_password(password):
+            return False
+
+        with self._lock:
+            self._verified[node.id] = (node.incoming_password, digest,
+                                       time.time() + settings.FEDERATION_CREDENTIALS_CACHE_TIMEOUT)
+
+        return True
+
+    def invalidate(self, node_id=None):
+        with self._lock:
+            if node_id is None:
+                self._verified.clear()
+            else:
+                self._verified.pop(node_id, None)
+
+
+# Shared by everything in this process
+verified_credentials = VerifiedCredentials()
 
 
 class NodeBasicAuthentication(BasicAuthentication):
@@ -17,8 +73,21 @@ class NodeBasicAuthentication(BasicAuthentication):
 
     def authenticate_credentials(self, userid, password):
         try:
-            incoming_node = Node.objects.get(
-                incoming_username=userid, incoming_password=password)
-            return incoming_node, None
+            incoming_node = node_registry.get_by_incoming_username(userid)
         except Node.DoesNotExist:
             raise AuthenticationFailed("Invalid username/password.")
+
+        if not verified_credentials.check(incoming_node, password):
+            raise AuthenticationFailed("Invalid username/password.")
+
+        return incoming_node, None
+
+
+def invalidate_verified_credentials(sender, instance, **kwargs):
+    verified_credentials.invalidate(instance.id)
+
+
+post_save.connect(invalidate_verified_credentials, sender=Node,
+                  dispatch_uid='invalidate_verified_credentials_on_save')
+post_delete.connect(invalidate_verified_credentials, sender=Node,
+                    dispatch_uid='invalidate_verified_credentials_on_delete')
@@ -1,22 +1,26 @@
-import logging
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 import requests
 from rest_framework import viewsets, status, generics
 from rest_framework.authentication import SessionAuthentication
-from rest_framework.decorators import detail_route
+from rest_framework.decorators import detail_route, list_route
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from service.authentication.node_basic import NodeBasicAuthentication
 from service.authors.serializers import AuthorSerializer, AuthorURLSerializer
+from service.conditional import ConditionalGetMixin
 from social.app.models.author import Author
+from social.app.models.contentversion import ContentVersion
+from social.app.models.uri import parse_author_id, parse_author_uris
 from social.app.models.utils import is_valid_uuid
 
 
-class AuthorViewSet(viewsets.ReadOnlyModelViewSet):
+class AuthorViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint that allows for the retrieval and modification of Authors.
     """
+    content_scopes = (ContentVersion.AUTHORS,)
 
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
@@ -46,6 +50,70 @@ class AuthorViewSet(viewsets.ReadOnlyModelViewSet):
         """
         return super(AuthorViewSet, self).retrieve(request, *args, **kwargs)
 
+    @list_route(methods=["POST"])
+    def authors_batch(self, request):
+        """
+        Returns details about many local Authors at once, specified by their IDs or URIs. Authors that aren't
+        found are left out of the response.
+
+        ### Example Input
+
+            {
+                "query": "authors", # Must be set to "authors". (required)
+                # Array of Author URIs or IDs, at most FEDERATION_MAX_BATCH_SIZE of them (required, may be empty)
+                "authors": [
+                    "http://127.0.0.1:8000/service/author/7cb311bf-69dd-4945-b610-937d032d6875",
+                    "de305d54-75b4-431b-adb2-eb6b9e546013",
+                    "..."
+                ]
+            }
+
+        ### Example Successful Response
+
+            {
+                "query": "authors",
+                "authors": [
+                    # See GET /service/author/{author_id}
+                ]
+            }
+        """
+        if self.request.data.get('query') != 'authors':
+            return Response({
+                'query': 'Expected a query key of \'authors\'',
+                'status': status.HTTP_422_UNPROCESSABLE_ENTITY
+            }, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        authors_to_find = self.request.data.get('authors')
+
+        if not isinstance(authors_to_find, list):
+            return Response({
+                'authors': 'The authors value must be a list of author URLs or IDs',
+                'status': status.HTTP_422_UNPROCESSABLE_ENTITY
+            }, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        elif len(authors_to_find) > settings.FEDERATION_MAX_BATCH_SIZE:
+            return Response({
+                'authors': 'At most %d authors can be asked for at once' % settings.FEDERATION_MAX_BATCH_SIZE,
+                'status': status.HTTP_422_UNPROCESSABLE_ENTITY
+            }, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        author_ids = []
+        for author in authors_to_find:
+            try:
+                author_ids.append(parse_author_id(author))
+            except (AttributeError, TypeError, ValueError):
+                continue
+
+        # Everything the serializer needs, in two queries no matter how many Authors were asked for
+        authors = Author.objects \
+            .filter(id__in=author_ids, node__local=True) \
+            .select_related('node', 'user') \
+            .prefetch_related('friends')
+
+        return Response({
+            "query": "authors",
+            "authors": AuthorSerializer(authors, context={'request': request}, many=True).data
+        }, status=status.HTTP_200_OK)
+
     @detail_route(methods=["GET"])
     def author_friends(self, request, pk=None):
         """
@@ -169,15 +237,7 @@ class AuthorViewSet(viewsets.ReadOnlyModelViewSet):
                 'status': status.HTTP_422_UNPROCESSABLE_ENTITY
             }, status.HTTP_422_UNPROCESSABLE_ENTITY)
 
-        authors_uuids_to_find = list()
-        for author_url in authors_to_find:
-            try:
-                author_url_uuid = Author.get_id_from_uri(author_url)
-                authors_uuids_to_find.append(author_url_uuid)
-            except Exception as e:
-                logging.error(e)
-                logging.error("Could not parse the UUID of the given author URL for %s!" % author_url)
-                continue
+        authors_uuids_to_find = parse_author_uris(authors_to_find).values()
 
         friendships = Author.friends.through.objects.filter(
             from_author_id=pk,
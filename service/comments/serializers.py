@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 
 from service.authors.serializers import UnknownAuthorSerializer, SimpleAuthorSerializer
@@ -7,6 +8,14 @@ from social.app.models.comment import Comment
 from social.app.models.post import Post
 from social.app.models.post import Author
 from social.app.models.node import Node
+from social.app.models.noderegistry import node_registry
+
+
+def get_node_or_404(service_url):
+    try:
+        return node_registry.get_by_service_url(service_url)
+    except Node.DoesNotExist:
+        raise Http404("No Node with service URL %s." % service_url)
 
 
 # For viewing comments at API endpoint
@@ -47,7 +56,7 @@ class CreateCommentSerializer(serializers.Serializer):
         # Get this from the request
 
         remote_node_host = data["comment"]["author"]["host"]
-        remote_node = get_object_or_404(Node, service_url=remote_node_host)
+        remote_node = get_node_or_404(remote_node_host)
         anonymous_node = remote_node is None or not remote_node.is_authenticated
 
         if not anonymous_node and not remote_node.share_posts:
@@ -108,7 +117,7 @@ class CreateCommentSerializer(serializers.Serializer):
 
         # Need to add remote node as foreign key
         remote_node_host = author_data["host"]
-        remote_node = get_object_or_404(Node, service_url=remote_node_host)
+        remote_node = get_node_or_404(remote_node_host)
 
         print author_data
         remote_display_name = author_data["displayName"]
@@ -8,9 +8,10 @@ from social.app.models.post import Post
 from service.authentication.node_basic import NodeBasicAuthentication
 from service.comments.pagination import CommentsPagination
 from service.comments.serializers import CommentSerializer, CreateCommentSerializer
+from service.conditional import ConditionalGetMixin
 
 
-class CommentsViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, viewsets.GenericViewSet):
+class CommentsViewSet(ConditionalGetMixin, mixins.ListModelMixin, mixins.CreateModelMixin, viewsets.GenericViewSet):
     authentication_classes = (NodeBasicAuthentication,)
     permission_classes = (IsAuthenticated,)
 
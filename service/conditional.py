@@ -0,0 +1,84 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from social.app.models.contentversion import ContentVersion, get_content_versions
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        super(NotModified, self).__init__()
+        self.response = response
+
+
+class ConditionalGetMixin(object):
+    """
+    Answers conditional GETs with a 304 Not Modified when the peer's copy is still current, without querying or
+    serializing anything but the ContentVersions of content_scopes. Full responses get ETag and Last-Modified headers
+    for the peer to send back next time.
+
+    The ETag covers everything else a response varies by: its URL (including the page and ordering), its media type,
+    and what the remote node is allowed to see.
+    """
+    # What the responses of the view are built from, see ContentVersion
+    content_scopes = (ContentVersion.POSTS,)
+
+    etag = None
+    last_modified = None
+    content_versions = None
+
+    def initial(self, request, *args, **kwargs):
+        super(ConditionalGetMixin, self).initial(request, *args, **kwargs)
+
+        if request.method not in ('GET', 'HEAD'):
+            return
+
+        (self.etag, self.last_modified) = self.get_validators(request)
+
+        # GZipMiddleware adds ;gzip to the ETags of the responses it compresses, and that's what peers send back
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            request.META['HTTP_IF_NONE_MATCH'] = if_none_match.replace(';gzip"', '"')
+
+        response = get_conditional_response(request, etag=self.etag, last_modified=self.last_modified)
+        if response is not None:
+            raise NotModified(response)
+
+    def get_validators(self, request):
+        versions = self.content_versions = get_content_versions(self.content_scopes)
+
+        remote_node = request.user
+        if remote_node is None or not remote_node.is_authenticated:
+            permissions = 'anonymous'
+        else:
+            permissions = '%s:%s:%s' % (remote_node.id, remote_node.share_posts, remote_node.share_images)
+
+        key = '\n'.join([request.build_absolute_uri(), request.accepted_media_type, permissions] +
+                        ['%s:%d' % (version.scope, version.version) for version in versions])
+        etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+        changed_at = [version.changed_at_timestamp() for version in versions if version.changed_at is not None]
+        last_modified = max(changed_at) if changed_at else None
+
+        return etag, last_modified
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+
+        return super(ConditionalGetMixin, self).handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super(ConditionalGetMixin, self).finalize_response(request, response, *args, **kwargs)
+
+        if self.etag is not None and response.status_code in (200, 304):
+            response['ETag'] = quote_etag(self.etag)
+            if self.last_modified is not None:
+                response['Last-Modified'] = http_date(self.last_modified)
+
+            # Peers have to check back with us before reusing their copy, and it's only good for them
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Authorization',))
+
+        return response
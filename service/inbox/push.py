@@ -0,0 +1,84 @@
+import urlparse
+
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete
+
+from social.app.models.author import Author
+from social.app.models.noderegistry import node_registry
+from social.app.models.post import Post
+
+
+def connect_signals():
+    post_save.connect(on_post_saved, sender=Post, dispatch_uid='inbox_push_post_saved')
+    pre_delete.connect(on_post_deleted, sender=Post, dispatch_uid='inbox_push_post_deleted')
+
+
+def on_post_saved(sender, instance, created, **kwargs):
+    if instance.author.get_node().local:
+        action = "create" if created else "update"
+        transaction.on_commit(lambda: push_post(instance.id, instance.author_id, action))
+
+
+def on_post_deleted(sender, instance, **kwargs):
+    if instance.author.get_node().local:
+        # Worked out while the Post is still there to check
+        node_ids = get_nodes_that_know_of(instance.id)
+        transaction.on_commit(lambda: push_post(instance.id, instance.author_id, "delete", node_ids))
+
+
+def get_nodes_that_know_of(post_id):
+    """
+    Returns the IDs of the nodes that asked for pushes and either may see the Post now or were pushed it before.
+    """
+    from service.posts.views import get_local_posts
+    from social.app.models.outbox import OutboundDelivery
+
+    pushed_to = set(OutboundDelivery.objects
+                    .filter(kind=OutboundDelivery.INBOX, target_id=post_id)
+                    .values_list('node_id', flat=True))
+
+    return set(node.id for node in node_registry.get_remote() if node.push_posts and (
+        node.id in pushed_to or get_local_posts(node).filter(id=post_id).exists()))
+
+
+def push_post(post_id, author_id, action, node_ids=None):
+    """
+    Tells every node that asked for pushes (Node.push_posts) that one of our Posts changed, by queueing up a POST to
+    their inbox. Only the Post's URI is sent, so they fetch it through /posts/{post_id} like they would when
+    polling, and a burst of edits is only delivered once.
+
+    Only nodes allowed to see the Post are told about it. Deletes go to the nodes in node_ids, see
+    get_nodes_that_know_of().
+    """
+    from service.posts.views import get_local_posts
+    from social.app.models.outbox import OutboundDelivery
+
+    try:
+        author = Author.objects.select_related('node').get(id=author_id)
+    except Author.DoesNotExist:
+        # The Post was deleted along with its Author
+        return
+
+    post_uri = urlparse.urljoin(author.node.service_url, "posts/%s" % post_id)
+
+    for node in [node for node in node_registry.get_remote() if node.push_posts]:
+        if action == "delete":
+            if node.id not in (node_ids or ()):
+                # They never knew about it, and its ID is none of their business
+                continue
+        elif not get_local_posts(node).filter(id=post_id).exists():
+            # They aren't allowed to see it, so they don't need to know about it
+            continue
+
+        key_action = "delete" if action == "delete" else "update"
+        OutboundDelivery.enqueue(
+            node=node,
+            kind=OutboundDelivery.INBOX,
+            url=urlparse.urljoin(node.service_url, "inbox"),
+            payload={
+                "query": "inbox",
+                "items": [{"type": "post", "action": action, "id": post_uri}],
+            },
+            author=author,
+            target_id=post_id,
+            idempotency_key="%s:%s:%s:%s" % (OutboundDelivery.INBOX, key_action, node.id, post_id))
@@ -0,0 +1,40 @@
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from service.comments.serializers import NewCommentSerializer
+
+
+class InboxItemSerializer(serializers.Serializer):
+    TYPE_CHOICES = ("post", "comment")
+    ACTION_CHOICES = ("create", "update", "delete")
+
+    type = serializers.ChoiceField(choices=TYPE_CHOICES)
+    action = serializers.ChoiceField(choices=ACTION_CHOICES)
+
+    # The URI or UUID of the Post (or Comment) the item is about
+    id = serializers.CharField(required=False)
+    # Either the full Post, as returned by /posts/{post_id}, or the URI of the Post a Comment is on
+    post = serializers.JSONField(required=False)
+    comment = NewCommentSerializer(required=False)
+
+    def validate(self, data):
+        if data["type"] == "post":
+            if "id" not in data and not isinstance(data.get("post"), dict):
+                raise ValidationError("Post items need either an id or the full post.")
+        else:
+            if not isinstance(data.get("post"), basestring):
+                raise ValidationError("Comment items need the URI of the post they're on.")
+
+            if data["action"] == "delete":
+                if "id" not in data:
+                    raise ValidationError("Deleted comment items need the id of the comment.")
+            elif "comment" not in data:
+                raise ValidationError("Created or updated comment items need the full comment.")
+
+        return data
+
+
+# For pushing changes to the API endpoint /service/inbox/
+class InboxSerializer(serializers.Serializer):
+    query = serializers.CharField(default="inbox")
+    items = InboxItemSerializer(many=True)
@@ -0,0 +1,195 @@
+import logging
+import uuid
+
+from django.db import transaction
+from rest_framework import views, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from service.authentication.node_basic import NodeBasicAuthentication
+from service.inbox.serializers import InboxSerializer
+from social.app.models.author import Author
+from social.app.models.comment import Comment
+from social.app.models.node import Node
+from social.app.models.noderegistry import node_registry
+from social.app.models.post import Post, save_remote_post
+
+
+class InboxView(views.APIView):
+    authentication_classes = (NodeBasicAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    serializer_class = InboxSerializer
+
+    def post(self, request, *args, **kwargs):
+        """
+        Accepts a batch of new, updated and deleted Posts and Comments from a remote node, so it doesn't have to
+        wait for us to poll its /posts/ endpoints.
+
+        Posts and Comments can only be pushed by the node their Authors belong to (for Posts), or by the node the
+        Post they're on belongs to (for Comments).
+
+        ### Expected Input
+            {
+                "query": "inbox", # Must be equal to "inbox". (required)
+                "items": [
+                    {
+                        "type": "post", # Either "post" or "comment". (required)
+                        "action": "update", # Either "create", "update", or "delete". (required)
+                        "post": {...} # The full Post, as returned by /posts/{post_id}. (optional)
+                    },
+                    {
+                        "type": "post",
+                        "action": "create",
+                        "id": "http://127.0.0.1:5454/posts/de305d54-75b4-431b-adb2-eb6b9e546013" # Without the
+                            # full Post, we'll fetch it from your node in the background.
+                    },
+                    {
+                        "type": "comment",
+                        "action": "create",
+                        "post": "http://127.0.0.1:5454/posts/de305d54-75b4-431b-adb2-eb6b9e546013", # (required)
+                        "comment": {...} # The full Comment, as sent to /posts/{post_id}/comments. (required,
+                            # unless deleting)
+                    },
+                    {
+                        "type": "comment",
+                        "action": "delete",
+                        "post": "http://127.0.0.1:5454/posts/de305d54-75b4-431b-adb2-eb6b9e546013",
+                        "id": "9537c473-343e-41dd-a3f8-851684f3eb26"
+                    }
+                ]
+            }
+
+        ### Example Successful Response
+        Items are handled one at a time, so one bad item doesn't reject the rest of the batch.
+
+            {
+                "query": "inbox",
+                "results": [
+                    {"status": "saved"},
+                    {"status": "queued"},
+                    {"status": "saved"},
+                    {"status": "error", "detail": "Comments can only be pushed by the node of the post they're on."}
+                ]
+            }
+        """
+        remote_node = request.user
+
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = []
+        queued_post_ids = []
+        for item in serializer.validated_data["items"]:
+            try:
+                with transaction.atomic():
+                    if item["type"] == "post":
+                        result = process_post_item(remote_node, item, queued_post_ids)
+                    else:
+                        result = process_comment_item(remote_node, item)
+            except InboxItemRejected as e:
+                result = {"status": "error", "detail": str(e)}
+            except (KeyError, ValueError, AttributeError, TypeError) as e:
+                logging.warn("Could not process inbox item %s from %s: %s" % (item, remote_node, e))
+                result = {"status": "error", "detail": "Malformed item."}
+
+            results.append(result)
+
+        if queued_post_ids:
+            schedule_post_refresh(remote_node, queued_post_ids)
+
+        return Response({"query": "inbox", "results": results}, status=status.HTTP_200_OK)
+
+
+class InboxItemRejected(Exception):
+    pass
+
+
+def parse_id(value, model=Post):
+    # Should be a URI per the spec, but we're being generous and also accepting a straight UUID
+    if value.startswith('http'):
+        return uuid.UUID(str(model.get_id_from_uri(value)))
+
+    return uuid.UUID(value)
+
+
+def process_post_item(remote_node, item, queued_post_ids):
+    post_json = item.get("post")
+
+    if isinstance(post_json, dict):
+        post_id = parse_id(post_json["id"])
+        author_id = parse_id(post_json["author"]["id"], model=Author)
+    else:
+        post_id = parse_id(item["id"])
+        author_id = None
+
+    if Post.objects.filter(id=post_id).exclude(author__node=remote_node).exists() or \
+            (author_id and Author.objects.filter(id=author_id).exclude(node=remote_node).exists()):
+        raise InboxItemRejected("Posts can only be pushed by the node of their author.")
+
+    if item["action"] == "delete":
+        Post.objects.filter(id=post_id, author__node=remote_node).delete()
+        return {"status": "deleted"}
+
+    if isinstance(post_json, dict):
+        save_remote_post(remote_node, post_json)
+        return {"status": "saved"}
+
+    queued_post_ids.append(post_id)
+    return {"status": "queued"}
+
+
+def schedule_post_refresh(remote_node, post_ids):
+    from background_task.tasks import TaskSchedule
+    from social.tasks import refresh_remote_posts
+
+    # Every post in the batch is fetched with one request to the remote node's posts/batch, and a burst of edits to
+    # the same post only needs to be fetched once
+    post_ids = sorted(set(str(post_id) for post_id in post_ids))
+    refresh_remote_posts(str(remote_node.id), post_ids, schedule={'action': TaskSchedule.CHECK_EXISTING})
+
+
+def process_comment_item(remote_node, item):
+    post_id = parse_id(item["post"])
+
+    try:
+        post = Post.objects.get(id=post_id, author__node=remote_node)
+    except Post.DoesNotExist:
+        raise InboxItemRejected("Comments can only be pushed by the node of the post they're on.")
+
+    if item["action"] == "delete":
+        Comment.objects.filter(id=parse_id(item["id"]), post=post).delete()
+        return {"status": "deleted"}
+
+    comment_json = item["comment"]
+    author_json = comment_json["author"]
+    author_id = parse_id(author_json["url"], model=Author)
+
+    try:
+        author = Author.objects.get(id=author_id)
+    except Author.DoesNotExist:
+        # The comment may be by an author from a third node
+        try:
+            author_node = node_registry.get_by_service_url(author_json["host"])
+        except Node.DoesNotExist:
+            raise InboxItemRejected("The comment's author is from a node we don't know about.")
+
+        author = Author.objects.create(
+            id=author_id,
+            node=author_node,
+            displayName=author_json.get("displayName", ""),
+            github=author_json.get("github", ""))
+
+    if author.node.local:
+        raise InboxItemRejected("Comments by our own authors can't be pushed by other nodes.")
+
+    comment = Comment.objects.filter(id=comment_json["id"]).first()
+    if comment is None:
+        comment = Comment(id=comment_json["id"], post=post, author=author)
+    elif comment.post_id != post.id or comment.author_id != author.id:
+        # Knowing a comment's ID isn't enough to take it over
+        raise InboxItemRejected("A comment with that ID already exists on another post or by another author.")
+
+    comment.comment = comment_json["comment"]
+    comment.published = comment_json["published"]
+    comment.save()
+    return {"status": "saved"}
@@ -120,7 +120,9 @@ class InternalAPIViewSet(viewsets.GenericViewSet):
         Internal endpoint used by the website's Author detail page to allow the currently logged in Author to send a 
         friend request to another Author.
         
-        If the target author is remote, it sends a request to the remote Node's `/friendrequest/` endpoint.
+        If the target author is remote, a request to the remote Node's `/friendrequest/` endpoint is queued up, and
+        `202 Accepted` is returned with `"pending": true`. The friend request is recorded once the remote Node has
+        received it.
         
         For local AJAX use only.
         
@@ -166,21 +168,18 @@ class InternalAPIViewSet(viewsets.GenericViewSet):
                 {"detail": "Unactivated authors cannot be friend requested."},
                 status=status.HTTP_403_FORBIDDEN)
 
-        if target.node.local:
-            current_author.add_friend_request(target)
-        else:
-            r = target.node.post_friend_request(request, current_author, target)
+        friend_requested_author = reverse("service:author-detail", kwargs={'pk': target.id}, request=request)
 
-            if 200 <= r.status_code < 300:
-                # Success!
-                current_author.add_friend_request(target)
-            else:
-                return Response(
-                    {"detail": "Remote friend request failed."},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
+        if not target.node.local:
+            # The request is sent to the remote node in the background, and only recorded here once they've got it
+            target.node.post_friend_request(request, current_author, target)
+
+            return Response(
+                {"friend_requested_author": friend_requested_author, "pending": True},
+                status=status.HTTP_202_ACCEPTED)
+
+        current_author.add_friend_request(target)
 
         return Response(
-            {"friend_requested_author": reverse("service:author-detail", kwargs={'pk': target.id},
-                                                request=request)},
+            {"friend_requested_author": friend_requested_author},
             status=status.HTTP_200_OK)
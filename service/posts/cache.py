@@ -0,0 +1,56 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from service.conditional import ConditionalGetMixin
+from social.app.models.contentversion import get_content_versions
+
+
+class SharedListCacheMixin(ConditionalGetMixin):
+    """
+    Shares the serialized pages of a listing of local Posts between every remote node that's allowed to see the same
+    Posts, so N nodes polling the same page cost one serialization.
+
+    Pages are cached under the ContentVersions they were built from, so any change to a Post, Comment or Author
+    makes them stale without having to find and delete them.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not settings.SERVICE_POSTS_CACHE_TIMEOUT:
+            return super(SharedListCacheMixin, self).list(request, *args, **kwargs)
+
+        key = self.get_list_cache_key(request)
+        data = cache.get(key)
+
+        if data is not None:
+            return Response(data)
+
+        response = super(SharedListCacheMixin, self).list(request, *args, **kwargs)
+
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.SERVICE_POSTS_CACHE_TIMEOUT)
+
+        return response
+
+    def get_list_cache_key(self, request):
+        # Usually already looked up to answer conditional requests
+        versions = self.content_versions or get_content_versions(self.content_scopes)
+
+        # The time of the change is included in case the versions are ever reset, e.g. by restoring the database
+        key = '\n'.join([request.build_absolute_uri(), get_permission_profile(request.user)] +
+                        ['%s:%d:%s' % (version.scope, version.version, version.changed_at) for version in versions])
+        return 'service:posts:' + hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def get_permission_profile(remote_node):
+    """
+    Returns what get_local_posts() decides which Posts a remote node can see by, which is all that its responses
+    vary by.
+    """
+    if remote_node is None or not remote_node.is_authenticated:
+        return 'anonymous'
+
+    return 'posts=%s;images=%s' % (remote_node.share_posts, remote_node.share_images)
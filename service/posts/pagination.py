@@ -1,5 +1,6 @@
 import urlparse
 
+from django.conf import settings
 from rest_framework import pagination
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
@@ -38,3 +39,11 @@ class PostsPagination(pagination.PageNumberPagination):
             "previous": self.get_previous_link(),
             "posts": data
         })
+
+
+class BatchPostsPagination(PostsPagination):
+    """
+    Puts every Post asked for in a batch, along with their images, on a single page.
+    """
+    page_size = 2 * settings.FEDERATION_MAX_BATCH_SIZE
+    page_size_query_param = None
@@ -1,19 +1,28 @@
+import logging
+import uuid
+
 import requests
+from django.conf import settings
 from django.db.models import Q
 from rest_framework import viewsets, views, generics, mixins, status, filters
 from rest_framework.decorators import list_route
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 
 from service.authentication.node_basic import NodeBasicAuthentication
-from service.posts.pagination import PostsPagination
+from service.conditional import ConditionalGetMixin
+from service.posts.cache import SharedListCacheMixin
+from service.posts.pagination import PostsPagination, BatchPostsPagination
 from service.posts.serializers import PostSerializer, FOAFCheckPostSerializer
 from social.app.models.author import Author
 from social.app.models.node import Node
+from social.app.models.noderegistry import node_registry
 from social.app.models.post import Post
+from social.app.models.utils import bounded_map
 
 
-class PublicPostsList(generics.ListAPIView):
+class PublicPostsList(SharedListCacheMixin, generics.ListAPIView):
     """
     Returns all local Posts set to public visibility.
     
@@ -43,7 +52,7 @@ class PublicPostsList(generics.ListAPIView):
 
 
 # Defined as a ViewSet so a custom function can be defined to get around schema weirdness -- see all_posts()
-class AllPostsViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class AllPostsViewSet(SharedListCacheMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     pagination_class = PostsPagination
     serializer_class = PostSerializer
     authentication_classes = (NodeBasicAuthentication,)
@@ -71,8 +80,8 @@ class AllPostsViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
         return self.list(request, *args, **kwargs)
 
 
-class SpecificPostsViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin,
-                           viewsets.GenericViewSet):
+class SpecificPostsViewSet(ConditionalGetMixin, mixins.ListModelMixin, mixins.CreateModelMixin,
+                           mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     pagination_class = PostsPagination
     authentication_classes = (NodeBasicAuthentication,)
     permission_classes = (IsAuthenticated,)
@@ -241,8 +250,6 @@ class SpecificPostsViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixin
 
         return_post = False
 
-        verified_requester_friends = []
-
         if post.author.friends_with(requesting_author):
             return_post = True
         elif remote_node.local:
@@ -251,52 +258,13 @@ class SpecificPostsViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixin
                     return_post = True
                     break
         else:
-            # Need to first verify with requesting_author's node, according to spec
-            for author_uri in author_dict["friends"]:
-                friends = remote_node.get_if_two_authors_are_friends(requesting_author_id, author_uri)
-                if friends:
-                    verified_requester_friends.append(author_uri)
-
-            for requester_friend_uri in verified_requester_friends:
-
-                (host, requester_friend_id) = Author.parse_uri(requester_friend_uri)
-
-                try:
-                    requester_friend_node = Node.objects.get(host=host)
-                except Node.DoesNotExist:
-                    # We aren't connected with this Author's node, so not much we can do with it
-                    continue
-
-                if requester_friend_node.local:
-                    # Easy mode! We already know the requester and this friend are friends according to requester's node
-                    # So now we just check if we agree locally
-
-                    requester_friend = Author.objects.get(id=requester_friend_id)
-                    return_post = \
-                        post.author.friends_with(requester_friend) \
-                        and requester_friend.friends_with(requesting_author)
-
-                elif requester_friend_node == requesting_author.node:
-                    # The requester and the friend in the middle are from the same non-local node
-
-                    requester_friend = requester_friend_node.create_or_update_remote_author(requester_friend_id)
-
-                    return_post = \
-                        post.author.friends_with(requester_friend) \
-                        and requester_friend_node.get_if_two_authors_are_friends(requester_friend.id,
-                                                                                 post.author_id)
-                else:
-                    # The requester and the friend in the middle are from different non-local nodes
-                    requester_friend = requester_friend_node.create_or_update_remote_author(requester_friend_id)
-
-                    return_post = \
-                        post.author.friends_with(requester_friend) \
-                        and requester_friend_node.get_if_two_authors_are_friends(requester_friend.id, post.author_id) \
-                        and requester_friend_node.get_if_two_authors_are_friends(requester_friend_id,
-                                                                                 requesting_author.author_id)
-                if return_post:
-                    # We've got at least one FOAF connection, and that's good enough
-                    break
+            # Need to first verify with requesting_author's node, according to spec. All of the requester's claimed
+            # friends are checked with a single request.
+            verified_requester_friends = remote_node.get_verified_friends(requesting_author_id, author_dict["friends"])
+            post_author_uri = reverse("service:author-detail", kwargs={'pk': post.author_id}, request=request)
+
+            return_post = is_foaf_through_verified_friends(
+                post.author, post_author_uri, requesting_author, author_dict["id"], verified_requester_friends)
 
         if return_post:
             self.action = "retrieve"
@@ -306,7 +274,7 @@ class SpecificPostsViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixin
                             status=status.HTTP_403_FORBIDDEN)
 
 
-class AuthorPostsView(generics.ListAPIView):
+class AuthorPostsView(SharedListCacheMixin, generics.ListAPIView):
     """
     Returns all local Posts set to non-server-only visibility written by a single local Author.
     
@@ -332,6 +300,131 @@ class AuthorPostsView(generics.ListAPIView):
         return get_local_posts(remote_node).filter(author__id=author_id)
 
 
+class BatchPostsView(generics.ListAPIView):
+    pagination_class = BatchPostsPagination
+    serializer_class = PostSerializer
+    authentication_classes = (NodeBasicAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    filter_backends = (filters.OrderingFilter,)
+    ordering = ('-published',)
+
+    def get_queryset(self):
+        remote_node = self.request.user
+        post_ids = self.get_post_ids()
+
+        return get_local_posts(remote_node) \
+            .filter(Q(id__in=post_ids) | Q(parent_post__id__in=post_ids)) \
+            .select_related('author__node') \
+            .prefetch_related('comments__author__node', 'categories', 'visible_to_author')
+
+    def get_post_ids(self):
+        post_ids = []
+
+        for post_id in self.request.data["posts"]:
+            try:
+                # Should be a URI per the spec, but we're being generous and also accepting a straight UUID
+                post_ids.append(uuid.UUID(Post.get_id_from_uri(post_id) if post_id.startswith('http') else post_id))
+            except (AttributeError, TypeError, ValueError):
+                continue
+
+        return post_ids
+
+    def post(self, request, *args, **kwargs):
+        """
+        Returns the local Posts with the specified IDs or URIs that the current remote node is allowed to see, along
+        with their attached images, like `GET /service/posts/{post_id}` does for a single Post. Posts that aren't
+        found are left out of the response.
+
+        ### Example Input
+
+            {
+                "query": "posts", # Must be set to "posts". (required)
+                # Array of Post URIs or IDs, at most FEDERATION_MAX_BATCH_SIZE of them (required, may be empty)
+                "posts": [
+                    "http://127.0.0.1:8000/service/posts/ab9105af-ba92-41c1-b722-2aaa088a323a",
+                    "d10a7f31-10ed-4567-a93d-e3e80356b9ab",
+                    "..."
+                ]
+            }
+
+        ### Example Successful Response
+        See `GET /service/posts/{post_id}`.
+        """
+        if request.data.get('query') != 'posts':
+            return Response({
+                'query': 'Expected a query key of \'posts\'',
+                'status': status.HTTP_422_UNPROCESSABLE_ENTITY
+            }, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        posts = request.data.get('posts')
+
+        if not isinstance(posts, list):
+            return Response({
+                'posts': 'The posts value must be a list of post URLs or IDs',
+                'status': status.HTTP_422_UNPROCESSABLE_ENTITY
+            }, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        elif len(posts) > settings.FEDERATION_MAX_BATCH_SIZE:
+            return Response({
+                'posts': 'At most %d posts can be asked for at once' % settings.FEDERATION_MAX_BATCH_SIZE,
+                'status': status.HTTP_422_UNPROCESSABLE_ENTITY
+            }, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        return self.list(request, *args, **kwargs)
+
+
+def is_foaf_through_verified_friends(post_author, post_author_uri, requesting_author, requesting_author_uri,
+                                     verified_requester_friend_uris):
+    """
+    Returns whether the remote requesting_author is a friend of a friend of the local post_author, through any of the
+    friends the requester's node has already confirmed.
+
+    The checks against remote friends' nodes are independent of each other, so they're made concurrently.
+    """
+    remote_checks = []
+
+    for requester_friend_uri in verified_requester_friend_uris:
+        (host, requester_friend_id) = Author.parse_uri(requester_friend_uri)
+
+        try:
+            requester_friend_node = node_registry.get_by_host(host)
+        except Node.DoesNotExist:
+            # We aren't connected with this Author's node, so not much we can do with it
+            continue
+
+        if not post_author.friends.filter(id=requester_friend_id).exists():
+            # Whatever anyone else says, we need to agree the friend in the middle is a friend of the post's author
+            continue
+
+        if requester_friend_node.local:
+            # Easy mode! We already know the requester and this friend are friends according to requester's node
+            # So now we just check if we agree locally
+            if requesting_author.friends.filter(id=requester_friend_id).exists():
+                return True
+        else:
+            # If the friend in the middle is from a different non-local node than the requester, that node also
+            # needs to confirm the friendship with the requester
+            remote_checks.append((
+                requester_friend_node,
+                requester_friend_id,
+                requester_friend_node != requesting_author.node))
+
+    def check_remote_friend(remote_check):
+        (requester_friend_node, requester_friend_id, check_requester) = remote_check
+
+        try:
+            return requester_friend_node.are_friends(requester_friend_id, post_author_uri) and (
+                not check_requester or requester_friend_node.are_friends(requester_friend_id, requesting_author_uri))
+        except requests.exceptions.RequestException as e:
+            logging.error(e)
+            return False
+
+    for (requester_friend_node, requester_friend_id, check_requester) in remote_checks:
+        # Make sure what we know about each node is loaded here, rather than from the threads below
+        requester_friend_node.get_capabilities()
+
+    return any(bounded_map(check_remote_friend, remote_checks, settings.FEDERATION_MAX_CONCURRENT_REQUESTS))
+
+
 def get_local_posts(remote_node, public_only=False):
     anonymous_node = remote_node is None or not remote_node.is_authenticated
 
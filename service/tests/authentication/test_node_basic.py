@@ -0,0 +1,64 @@
+from django.test import TestCase
+from rest_framework.exceptions import AuthenticationFailed
+
+from service.authentication.node_basic import NodeBasicAuthentication, verified_credentials
+from social.app.models.node import Node
+
+
+class NodeBasicAuthenticationTestCase(TestCase):
+    def setUp(self):
+        verified_credentials.invalidate()
+
+        self.node = Node.objects.create(name='Remote Node', host='http://www.remote.com/',
+                                        service_url='http://www.remote.com/service/',
+                                        incoming_username='remote', incoming_password='password')
+        self.authentication = NodeBasicAuthentication()
+
+        self.checks = 0
+        self.real_check = Node.check_incoming_password
+
+        def counting_check(node, raw_password):
+            self.checks += 1
+            return self.real_check(node, raw_password)
+
+        Node.check_incoming_password = counting_check
+
+    def tearDown(self):
+        Node.check_incoming_password = self.real_check
+
+    def test_passwords_are_stored_hashed(self):
+        node = Node.objects.get(id=self.node.id)
+
+        self.assertNotEqual(node.incoming_password, 'password')
+        self.assertTrue(node.check_incoming_password('password'))
+
+        # Saving again doesn't hash the hash
+        node.save()
+        self.assertTrue(Node.objects.get(id=self.node.id).check_incoming_password('password'))
+
+    def test_verified_passwords_are_not_checked_again(self):
+        for _ in range(3):
+            (node, auth) = self.authentication.authenticate_credentials('remote', 'password')
+            self.assertEqual(node.id, self.node.id)
+
+        self.assertEqual(self.checks, 1)
+
+    def test_wrong_passwords_are_rejected(self):
+        self.authentication.authenticate_credentials('remote', 'password')
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials('remote', 'wrong')
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials('nobody', 'password')
+
+    def test_changing_the_password_forgets_the_old_one(self):
+        self.authentication.authenticate_credentials('remote', 'password')
+
+        self.node.incoming_password = 'new password'
+        self.node.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_credentials('remote', 'password')
+
+        self.authentication.authenticate_credentials('remote', 'new password')
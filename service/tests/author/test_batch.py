@@ -0,0 +1,71 @@
+import base64
+import uuid
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from social.app.models.node import Node
+
+
+class AuthorBatchTestCase(APITestCase):
+    def setUp(self):
+        node = Node.objects.create(name="Test", host="http://www.local.com/",
+                                   service_url="http://www.local.com/service/", local=True)
+
+        self.authorized_node = Node.objects.create(name='Remote Node', host='http://www.remote.com/',
+                                                   service_url='http://www.remote.com/service/', local=False,
+                                                   incoming_username='remote', incoming_password='password', )
+
+        self.authors = []
+        for name in ("adam", "bob", "chris"):
+            author = User.objects.create_user(name, name + "@test.com", "pass").profile
+            author.node = node
+            author.save()
+            self.authors.append(author)
+
+        self.authors[0].friends.add(self.authors[1])
+
+        self.url = reverse('service:author-batch')
+        self.headers = {
+            'HTTP_AUTHORIZATION': 'Basic ' + base64.b64encode(
+                '{}:{}'.format(self.authorized_node.incoming_username,
+                               'password')),
+        }
+
+    def lookup(self, authors):
+        return self.client.post(self.url, {"query": "authors", "authors": authors}, format='json', **self.headers)
+
+    def test_authors_are_found_by_uri_or_id(self):
+        (adam, bob, chris) = self.authors
+        response = self.lookup([
+            "http://www.local.com/service/author/%s" % adam.id,
+            str(bob.id),
+            str(uuid.uuid4()),
+            "not an author",
+        ])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["query"], "authors")
+
+        authors = dict((author["displayName"], author) for author in response.data["authors"])
+        self.assertEqual(set(authors.keys()), {adam.displayName, bob.displayName})
+        self.assertEqual(len(authors[adam.displayName]["friends"]), 1)
+
+    def test_queries_do_not_grow_with_the_batch(self):
+        # Warm up the node registry, so it doesn't count against either lookup
+        self.lookup([])
+
+        with self.assertNumQueries(2):
+            self.lookup([str(self.authors[0].id)])
+
+        with self.assertNumQueries(2):
+            self.lookup([str(author.id) for author in self.authors])
+
+    def test_bad_requests_are_rejected(self):
+        response = self.client.post(self.url, {"query": "friends", "authors": []}, format='json', **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        response = self.lookup(str(self.authors[0].id))
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
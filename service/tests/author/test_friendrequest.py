@@ -1,9 +1,12 @@
+import requests
 from django.contrib.auth.models import User
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from social.app.models.author import Author
 from social.app.models.node import Node
+from social.app.models.outbox import OutboundDelivery
 
 
 class AuthorFriendRequestTestCase(APITestCase):
@@ -100,3 +103,73 @@ class AuthorFriendRequestTestCase(APITestCase):
         self.assertTrue(self.author.has_outgoing_friend_request_for(self.target))
         self.assertTrue(self.target.has_incoming_friend_request_from(self.author))
         self.assertTrue(self.author.follows(self.target))
+
+    def request_remote_author(self):
+        remote_node = Node.objects.create(name="Remote", host="http://www.remote.com/",
+                                          service_url="http://www.remote.com/service/", incoming_username="remote")
+        self.target.node = remote_node
+        self.target.activated = True
+        self.target.save()
+
+        self.author.activated = True
+        self.author.save()
+
+        self.client.login(username="test1", password="pass1")
+        return self.client.post(self.url)
+
+    def test_requesting_a_remote_author_is_delivered_in_the_background(self):
+        response = self.request_remote_author()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(response.data["pending"])
+
+        # Sending it again while it's pending doesn't queue it twice
+        self.client.post(self.url)
+
+        delivery = OutboundDelivery.objects.get(author=self.author)
+        self.assertEqual(delivery.kind, OutboundDelivery.FRIEND_REQUEST)
+        self.assertEqual(delivery.status, OutboundDelivery.PENDING)
+        self.assertFalse(self.author.has_outgoing_friend_request_for(self.target))
+
+        delivery.on_delivered()
+
+        self.assertTrue(self.author.has_outgoing_friend_request_for(self.target))
+        self.assertTrue(self.author.follows(self.target))
+
+    def test_deliveries_are_sent_like_our_other_requests_to_the_node(self):
+        self.request_remote_author()
+        sent_headers = []
+
+        def fake_post(url, **kwargs):
+            sent_headers.append(kwargs["headers"])
+            response = requests.Response()
+            response.status_code = 200
+            response._content = '{}'
+            return response
+
+        real_post = requests.post
+        requests.post = fake_post
+        try:
+            OutboundDelivery.objects.get(author=self.author).deliver()
+        finally:
+            requests.post = real_post
+
+        self.assertEqual(sent_headers[0]["Accept-Encoding"], "gzip, deflate")
+        self.assertIn("Idempotency-Key", sent_headers[0])
+        self.assertEqual(OutboundDelivery.objects.get(author=self.author).status, OutboundDelivery.DELIVERED)
+        self.assertTrue(self.author.has_outgoing_friend_request_for(self.target))
+
+    def test_deliveries_are_not_marked_delivered_without_the_change_on_our_end(self):
+        self.request_remote_author()
+
+        def add_friend_request(author, target):
+            raise ValueError()
+
+        real_add_friend_request = Author.add_friend_request
+        Author.add_friend_request = add_friend_request
+        try:
+            with self.assertRaises(ValueError):
+                OutboundDelivery.objects.get(author=self.author).on_delivered()
+        finally:
+            Author.add_friend_request = real_add_friend_request
+
+        self.assertEqual(OutboundDelivery.objects.get(author=self.author).status, OutboundDelivery.PENDING)
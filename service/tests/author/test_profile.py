@@ -33,7 +33,7 @@ class AuthorProfileTestCase(APITestCase):
         self.headers = {
             'HTTP_AUTHORIZATION': 'Basic ' + base64.b64encode(
                 '{}:{}'.format(self.authorized_node.incoming_username,
-                               self.authorized_node.incoming_password)),
+                               'password')),
         }
 
     def test_get_author_profile(self):
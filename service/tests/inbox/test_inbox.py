@@ -0,0 +1,182 @@
+import base64
+import uuid
+
+from background_task.models import Task
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from social.app.models.author import Author
+from social.app.models.comment import Comment
+from social.app.models.node import Node
+from social.app.models.outbox import OutboundDelivery
+from social.app.models.post import Post
+
+
+class InboxTestCase(APITestCase):
+    def setUp(self):
+        self.local_node = Node.objects.create(name="Test", host="http://www.local.com/",
+                                              service_url="http://www.local.com/service/", local=True)
+
+        self.remote_node = Node.objects.create(name='Remote Node', host='http://www.remote.com/',
+                                               service_url='http://www.remote.com/service/', local=False,
+                                               incoming_username='remote', incoming_password='password')
+
+        self.adam = User.objects.create_user("adam", "adam@test.com", "pass1").profile
+        self.adam.node = self.local_node
+        self.adam.save()
+
+        self.remote_author_id = uuid.uuid4()
+        self.post_id = uuid.uuid4()
+
+        self.url = reverse("service:inbox")
+        self.headers = {
+            'HTTP_AUTHORIZATION': 'Basic ' + base64.b64encode(
+                '{}:{}'.format(self.remote_node.incoming_username, 'password')),
+        }
+
+    def post_json(self, post_id=None, author_id=None):
+        return {
+            "id": "http://www.remote.com/service/posts/%s" % (post_id or self.post_id),
+            "title": "Pushed",
+            "description": "Pushed to our inbox",
+            "content": "Hello",
+            "contentType": "text/plain",
+            "visibility": "PUBLIC",
+            "published": "2017-04-11T06:44:18.709000Z",
+            "author": {
+                "id": "http://www.remote.com/service/author/%s" % (author_id or self.remote_author_id),
+                "host": "http://www.remote.com/service/",
+                "displayName": "Remote Author",
+            },
+        }
+
+    def push(self, *items):
+        return self.client.post(self.url, {"query": "inbox", "items": list(items)}, format='json', **self.headers)
+
+    def test_pushing_without_auth_fails(self):
+        response = self.client.post(self.url, {"query": "inbox", "items": []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def comment_item(self, comment_id, comment="First!"):
+        return {
+            "type": "comment",
+            "action": "create",
+            "post": "http://www.remote.com/service/posts/%s" % self.post_id,
+            "comment": {
+                "id": str(comment_id),
+                "comment": comment,
+                "contentType": "text/markdown",
+                "published": "2017-04-11T06:45:18.709000Z",
+                "author": {
+                    "id": "http://www.remote.com/service/author/%s" % self.remote_author_id,
+                    "host": "http://www.remote.com/service/",
+                    "url": "http://www.remote.com/service/author/%s" % self.remote_author_id,
+                    "displayName": "Remote Author",
+                },
+            },
+        }
+
+    def test_pushing_a_batch_of_posts_and_comments(self):
+        comment_id = uuid.uuid4()
+        response = self.push(
+            {"type": "post", "action": "create", "post": self.post_json()},
+            self.comment_item(comment_id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result["status"] for result in response.data["results"]], ["saved", "saved"])
+
+        post = Post.objects.get(id=self.post_id)
+        self.assertEqual(post.author.node, self.remote_node)
+        self.assertEqual(Comment.objects.get(id=comment_id).post, post)
+
+        response = self.push({"type": "post", "action": "delete", "id": str(self.post_id)})
+        self.assertEqual(response.data["results"], [{"status": "deleted"}])
+        self.assertFalse(Post.objects.filter(id=self.post_id).exists())
+
+    def test_pushing_just_the_post_id_fetches_it_later(self):
+        item = {"type": "post", "action": "update", "id": "http://www.remote.com/service/posts/%s" % self.post_id}
+        response = self.push(item, item)
+
+        self.assertEqual([result["status"] for result in response.data["results"]], ["queued", "queued"])
+        self.assertEqual(Task.objects.filter(task_name="social.tasks.refresh_remote_posts").count(), 1)
+
+    def test_pushing_another_nodes_post_is_rejected(self):
+        local_post = Post.objects.create(author=self.adam, title="Local", description="Local", content="Local",
+                                         content_type="text/plain", visibility="PUBLIC")
+
+        response = self.push(
+            {"type": "post", "action": "update", "post": self.post_json(post_id=local_post.id)},
+            {"type": "post", "action": "create", "post": self.post_json(author_id=self.adam.id)},
+            {"type": "post", "action": "delete", "id": str(local_post.id)})
+
+        self.assertEqual([result["status"] for result in response.data["results"]], ["error", "error", "error"])
+        self.assertEqual(Post.objects.get(id=local_post.id).title, "Local")
+        self.assertFalse(Post.objects.filter(id=self.post_id).exists())
+        self.assertFalse(Author.objects.filter(id=self.remote_author_id).exists())
+
+    def test_pushing_a_comment_cannot_take_over_another(self):
+        other_node = Node.objects.create(name='Other Node', host='http://www.other.com/',
+                                         service_url='http://www.other.com/service/', local=False,
+                                         incoming_username='other')
+        other_author = Author.objects.create(node=other_node, displayName="Other Author")
+        other_post = Post.objects.create(author=other_author, title="Other", description="Other", content="Other",
+                                         content_type="text/plain", visibility="PUBLIC")
+        other_comment = Comment.objects.create(post=other_post, author=other_author, comment="Mine")
+
+        response = self.push(
+            {"type": "post", "action": "create", "post": self.post_json()},
+            self.comment_item(other_comment.id, comment="Not anymore"))
+
+        self.assertEqual([result["status"] for result in response.data["results"]], ["saved", "error"])
+        other_comment = Comment.objects.get(id=other_comment.id)
+        self.assertEqual(other_comment.post, other_post)
+        self.assertEqual(other_comment.comment, "Mine")
+
+
+# Pushes are queued once the Post is committed, which never happens inside a TestCase's transaction
+class InboxPushTestCase(APITransactionTestCase):
+    def setUp(self):
+        local_node = Node.objects.create(name="Test", host="http://www.local.com/",
+                                         service_url="http://www.local.com/service/", local=True)
+
+        Node.objects.create(name='Remote Node', host='http://www.remote.com/',
+                            service_url='http://www.remote.com/service/', local=False,
+                            incoming_username='remote', incoming_password='password')
+
+        self.subscribed_node = Node.objects.create(name='Other Node', host='http://www.other.com/',
+                                                   service_url='http://www.other.com/service/', local=False,
+                                                   incoming_username='other', incoming_password='password',
+                                                   push_posts=True)
+
+        self.adam = User.objects.create_user("adam", "adam@test.com", "pass1").profile
+        self.adam.node = local_node
+        self.adam.save()
+
+    def test_local_posts_are_pushed_to_subscribed_nodes(self):
+        post = Post.objects.create(author=self.adam, title="Local", description="Local", content="Local",
+                                   content_type="text/plain", visibility="PUBLIC")
+        post.title = "Edited"
+        post.save()
+
+        # The remote node didn't ask for pushes, and the edit is folded into the pending delivery
+        delivery = OutboundDelivery.objects.get(kind=OutboundDelivery.INBOX)
+        self.assertEqual(delivery.node, self.subscribed_node)
+        self.assertEqual(delivery.url, "http://www.other.com/service/inbox")
+        self.assertEqual(delivery.target_id, post.id)
+
+    def test_deletes_are_only_pushed_to_nodes_that_could_see_the_post(self):
+        server_only = Post.objects.create(author=self.adam, title="Local", description="Local", content="Local",
+                                          content_type="text/plain", visibility="SERVERONLY")
+        server_only.delete()
+        self.assertFalse(OutboundDelivery.objects.filter(kind=OutboundDelivery.INBOX).exists())
+
+        public = Post.objects.create(author=self.adam, title="Local", description="Local", content="Local",
+                                     content_type="text/plain", visibility="PUBLIC")
+        public_id = public.id
+        public.delete()
+
+        delivery = OutboundDelivery.objects.get(kind=OutboundDelivery.INBOX, idempotency_key__contains=':delete:')
+        self.assertEqual(delivery.node, self.subscribed_node)
+        self.assertEqual(delivery.target_id, public_id)
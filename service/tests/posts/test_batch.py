@@ -0,0 +1,80 @@
+import base64
+import uuid
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from social.app.models.node import Node
+from social.app.models.post import Post
+
+
+class PostBatchTestCase(APITestCase):
+    def setUp(self):
+        node = Node.objects.create(name="Test", host="http://www.local.com/",
+                                   service_url="http://www.local.com/service/", local=True)
+
+        self.authorized_node = Node.objects.create(name='Remote Node', host='http://www.remote.com/',
+                                                   service_url='http://www.remote.com/service/', local=False,
+                                                   incoming_username='remote', incoming_password='password', )
+
+        self.adam = User.objects.create_user("adam", "adam@test.com", "pass").profile
+        self.adam.node = node
+        self.adam.save()
+
+        self.image = Post.objects.create(author=self.adam, title="Image", description="Image", content="",
+                                         content_type="image/png;base64", visibility="PUBLIC")
+        self.posts = [
+            Post.objects.create(author=self.adam, title="Post %d" % x, description="Description %d" % x,
+                                content="Content %d" % x, content_type="text/plain", visibility=visibility)
+            for (x, visibility) in enumerate(("PUBLIC", "FRIENDS", "SERVERONLY"))
+        ]
+        self.posts[0].child_post = self.image
+        self.posts[0].save()
+
+        self.url = reverse('service:posts-batch')
+        self.headers = {
+            'HTTP_AUTHORIZATION': 'Basic ' + base64.b64encode(
+                '{}:{}'.format(self.authorized_node.incoming_username,
+                               'password')),
+        }
+
+    def lookup(self, posts):
+        return self.client.post(self.url, {"query": "posts", "posts": posts}, format='json', **self.headers)
+
+    def test_visible_posts_and_their_images_are_returned(self):
+        (public, friends, server_only) = self.posts
+        response = self.lookup([
+            "http://www.local.com/service/posts/%s" % public.id,
+            str(friends.id),
+            str(server_only.id),
+            str(uuid.uuid4()),
+            "not a post",
+        ])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["query"], "posts")
+        self.assertEqual(set(post["title"] for post in response.data["posts"]),
+                         {public.title, friends.title, self.image.title})
+
+    def test_node_image_sharing_is_respected(self):
+        self.authorized_node.share_images = False
+        self.authorized_node.save()
+
+        response = self.lookup([str(self.posts[0].id)])
+        self.assertEqual([post["title"] for post in response.data["posts"]], [self.posts[0].title])
+
+    def test_bad_queries_are_rejected(self):
+        response = self.client.post(self.url, {"query": "authors", "posts": []}, format='json', **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        response = self.client.post(self.url, {"query": "posts", "posts": "nope"}, format='json', **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        response = self.lookup([str(uuid.uuid4()) for _ in range(101)])
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_unauthenticated_nodes_are_rejected(self):
+        response = self.client.post(self.url, {"query": "posts", "posts": []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,69 @@
+import base64
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from social.app.models.comment import Comment
+from social.app.models.node import Node
+from social.app.models.post import Post
+
+
+class SharedListCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        node = Node.objects.create(name="Test", host="http://www.local.com/",
+                                   service_url="http://www.local.com/service/", local=True)
+
+        self.first_node = Node.objects.create(name='First Node', host='http://www.first.com/',
+                                              service_url='http://www.first.com/service/',
+                                              incoming_username='first', incoming_password='password')
+        self.second_node = Node.objects.create(name='Second Node', host='http://www.second.com/',
+                                               service_url='http://www.second.com/service/',
+                                               incoming_username='second', incoming_password='password')
+        self.imageless_node = Node.objects.create(name='Imageless Node', host='http://www.imageless.com/',
+                                                  service_url='http://www.imageless.com/service/',
+                                                  incoming_username='imageless', incoming_password='password',
+                                                  share_images=False)
+
+        self.adam = User.objects.create_user("adam", "adam@test.com", "pass").profile
+        self.adam.node = node
+        self.adam.save()
+
+        self.post = Post.objects.create(author=self.adam, title="Post", description="Description",
+                                        content="Content", content_type="text/plain", visibility="PUBLIC")
+        Post.objects.create(author=self.adam, title="Image", description="Image", content="",
+                            content_type="image/png;base64", visibility="PUBLIC")
+
+        self.url = reverse('service:all-posts-list')
+
+    def get(self, node):
+        return self.client.get(self.url, HTTP_AUTHORIZATION='Basic ' + base64.b64encode(
+            '{}:{}'.format(node.incoming_username, 'password')))
+
+    def test_nodes_with_the_same_permissions_share_pages(self):
+        first_response = self.get(self.first_node)
+
+        with self.assertNumQueries(1):
+            second_response = self.get(self.second_node)
+
+        self.assertEqual(second_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(second_response.data, first_response.data)
+
+    def test_nodes_with_other_permissions_get_their_own_pages(self):
+        self.get(self.first_node)
+
+        response = self.get(self.imageless_node)
+        self.assertEqual([post["title"] for post in response.data["posts"]], ["Post"])
+
+    def test_writes_make_pages_stale(self):
+        self.get(self.first_node)
+
+        Comment.objects.create(comment="Hi", author=self.adam, post=self.post)
+
+        response = self.get(self.second_node)
+        post = [post for post in response.data["posts"] if post["title"] == "Post"][0]
+        self.assertEqual(len(post["comments"]), 1)
@@ -0,0 +1,115 @@
+import base64
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from social.app.models.author import Author
+from social.app.models.comment import Comment
+from social.app.models.node import Node
+from social.app.models.post import Post
+
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        node = Node.objects.create(name="Test", host="http://www.local.com/",
+                                   service_url="http://www.local.com/service/", local=True)
+
+        self.authorized_node = Node.objects.create(name='Remote Node', host='http://www.remote.com/',
+                                                   service_url='http://www.remote.com/service/', local=False,
+                                                   incoming_username='remote', incoming_password='password', )
+        self.other_node = Node.objects.create(name='Other Node', host='http://www.other.com/',
+                                              service_url='http://www.other.com/service/', local=False,
+                                              incoming_username='other', incoming_password='password',
+                                              share_images=False)
+
+        self.adam = User.objects.create_user("adam", "adam@test.com", "pass").profile
+        self.adam.node = node
+        self.adam.save()
+
+        self.post = Post.objects.create(author=self.adam, title="Post", description="Description",
+                                        content="Content", content_type="text/plain", visibility="PUBLIC")
+
+    def get(self, url, node=None, **headers):
+        node = node or self.authorized_node
+        headers['HTTP_AUTHORIZATION'] = 'Basic ' + base64.b64encode(
+            '{}:{}'.format(node.incoming_username, 'password'))
+
+        return self.client.get(url, **headers)
+
+    def test_unchanged_posts_are_not_sent_again(self):
+        url = reverse('service:public-posts-list')
+
+        response = self.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        response = self.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_gzipped_responses_are_not_sent_again(self):
+        self.post.content = "Content " * 1000
+        self.post.save()
+        url = reverse('service:post-detail', kwargs={'pk': self.post.id})
+
+        response = self.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+        response = self.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_not_modified_takes_no_work(self):
+        url = reverse('service:post-detail', kwargs={'pk': self.post.id})
+        etag = self.get(url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_writes_change_the_etag(self):
+        url = reverse('service:post-detail', kwargs={'pk': self.post.id})
+        etag = self.get(url)['ETag']
+
+        Comment.objects.create(comment="Hi", author=self.adam, post=self.post)
+
+        response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        self.post.categories.create(name="news")
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_what_the_node_may_see(self):
+        url = reverse('service:all-posts-list')
+
+        self.assertNotEqual(self.get(url)['ETag'], self.get(url, node=self.other_node)['ETag'])
+        self.assertNotEqual(self.get(url)['ETag'], self.get(url + '?ordering=title')['ETag'])
+
+    def test_author_endpoints_track_author_changes(self):
+        url = reverse('service:author-detail', kwargs={'pk': self.adam.id})
+        etag = self.get(url)['ETag']
+
+        # Posting doesn't change anything about the Author
+        Post.objects.create(author=self.adam, title="Another", description="Another", content="Another",
+                            content_type="text/plain", visibility="PUBLIC")
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.adam.user.first_name = "Adam"
+        self.adam.user.save()
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_remote_content_does_not_change_the_etag(self):
+        url = reverse('service:post-detail', kwargs={'pk': self.post.id})
+        etag = self.get(url)['ETag']
+
+        remote_author = Author.objects.create(node=self.authorized_node, displayName="Remote")
+        remote_post = Post.objects.create(author=remote_author, title="Remote", description="Remote",
+                                          content="Remote", content_type="text/plain", visibility="PUBLIC")
+        remote_post.categories.create(name="news")
+        self.authorized_node.save()
+
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
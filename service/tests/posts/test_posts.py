@@ -215,7 +215,7 @@ class PostsTestCase(APITestCase):
         self.headers = {
             'HTTP_AUTHORIZATION': 'Basic ' + base64.b64encode(
                 '{}:{}'.format(self.authorized_node.incoming_username,
-                               self.authorized_node.incoming_password)),
+                               'password')),
         }
 
     def test_service_posts_have_correct_response_as_authorized_user(self):
@@ -251,6 +251,16 @@ class PostsTestCase(APITestCase):
             # Assert the key values where possible
             self.assertEqual(data['query'], query_value)
 
+    def test_service_posts_are_gzipped_when_accepted(self):
+        url = self.urls["posts"]
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate', **self.headers)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        response = self.client.get(url, **self.headers)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
     def test_service_posts_have_correct_response_as_anonymous_user(self):
         for key, url in self.urls.items():
             response = self.client.get(url)
@@ -5,12 +5,14 @@ import service.authors.views
 import service.friendrequest.views
 import service.posts.views
 import service.comments.views
+import service.inbox.views
 
 import service.internal.authors.views
 
 # ViewSet methods are mapped to URLs manually to get around issue where the API schema wouldn't show all available
 # endpoints, causing problems in Swagger
 author_urls = [
+    url(r'^batch/?$', service.authors.views.AuthorViewSet.as_view({'post': 'authors_batch'}), name='author-batch'),
     url(r'^(?P<pk>[0-9a-fA-F-\\-]+)/?$',
         service.authors.views.AuthorViewSet.as_view({'get': 'retrieve'}),
         name='author-detail'),
@@ -52,7 +54,9 @@ service_urls = [
     url(r'^posts/(?P<pk>[0-9a-fA-F-]+)/comments/?$',
         service.comments.views.CommentsViewSet.as_view({'get': 'list', 'post': 'create'}),
         name='post-comments-list'),
+    url(r'^inbox/?$', service.inbox.views.InboxView.as_view(), name='inbox'),
     url(r'^posts/?$', service.posts.views.PublicPostsList.as_view(), name='public-posts-list'),
+    url(r'^posts/batch/?$', service.posts.views.BatchPostsView.as_view(), name='posts-batch'),
     url(r'^posts/(?P<pk>[0-9a-fA-F-]+)/?$',
         service.posts.views.SpecificPostsViewSet.as_view({'get': 'retrieve', 'post': 'create'}),
         name='post-detail'),
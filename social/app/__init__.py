@@ -0,0 +1 @@
+default_app_config = 'social.app.apps.SocialAppConfig'
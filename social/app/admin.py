@@ -2,8 +2,13 @@ from django.contrib import admin
 
 from social.app.models.author import Author
 from social.app.models.comment import Comment
+from social.app.models.contentversion import ContentVersion
 from social.app.models.node import Node
+from social.app.models.nodecapabilities import NodeCapabilities
+from social.app.models.outbox import OutboundDelivery
 from social.app.models.post import Post
+from social.app.models.remotefriendlist import RemoteFriendList
+from social.app.models.transferstats import NodeTransferStats
 
 admin.site.register(Node)
 admin.site.register(Author)
@@ -20,3 +25,42 @@ class CommentAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Comment, CommentAdmin)
+
+
+class RemoteFriendListAdmin(admin.ModelAdmin):
+    list_display = ('author', 'refreshed_at', 'is_fresh', 'refresh_lag', 'last_error')
+    readonly_fields = ('refreshed_at', 'stale_since', 'last_error')
+
+
+admin.site.register(RemoteFriendList, RemoteFriendListAdmin)
+
+
+class OutboundDeliveryAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'node', 'author', 'status', 'attempts', 'next_attempt_at', 'created_at', 'delivered_at')
+    list_filter = ('status', 'kind', 'node')
+
+
+admin.site.register(OutboundDelivery, OutboundDeliveryAdmin)
+
+
+class NodeCapabilitiesAdmin(admin.ModelAdmin):
+    list_display = ('node', 'author_trailing_slash', 'supports_size_param', 'supports_friends_search',
+                    'supports_author_batch', 'supports_post_batch', 'headerless_posts', 'supports_gzip', 'updated_at')
+
+
+admin.site.register(NodeCapabilities, NodeCapabilitiesAdmin)
+
+
+class NodeTransferStatsAdmin(admin.ModelAdmin):
+    list_display = ('node', 'responses', 'compressed_responses', 'wire_bytes', 'content_bytes', 'compression_ratio',
+                    'bytes_saved')
+
+
+admin.site.register(NodeTransferStats, NodeTransferStatsAdmin)
+
+
+class ContentVersionAdmin(admin.ModelAdmin):
+    list_display = ('scope', 'version', 'changed_at')
+
+
+admin.site.register(ContentVersion, ContentVersionAdmin)
@@ -1,5 +1,19 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class SocialAppConfig(AppConfig):
     name = 'social.app'
+
+    def ready(self):
+        post_migrate.connect(bootstrap_local_node, sender=self, dispatch_uid='bootstrap_local_node')
+
+
+def bootstrap_local_node(sender, **kwargs):
+    from django.conf import settings
+
+    from social.app.models.noderegistry import ensure_local_node
+
+    # Done here rather than on each worker's first request, so workers starting up don't race to write it
+    if settings.LOCAL_NODE_URL:
+        ensure_local_node(settings.LOCAL_NODE_URL)
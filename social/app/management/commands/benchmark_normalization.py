@@ -0,0 +1,80 @@
+import copy
+import timeit
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from social.app.models.normalize import verify_posts_endpoint_output, is_url, is_uuid
+from social.app.models.uri import get_post_id_from_uri
+
+
+def make_page(posts, comments, authors, uuid_author_ids=False):
+    """
+    Builds a synthetic /posts/ page, with its posts and comments written by a pool of authors like a real page would
+    be.
+    """
+    author_pool = []
+    for _ in range(authors):
+        author_id = uuid.uuid4()
+        author_url = "http://remote.example.com/service/author/%s" % author_id
+        author_pool.append({
+            "id": str(author_id) if uuid_author_ids else author_url,
+            "host": "http://remote.example.com/service/",
+            "displayName": "Author",
+            "url": author_url,
+        })
+
+    page = []
+    for i in range(posts):
+        page.append({
+            "id": "http://remote.example.com/service/posts/%s" % uuid.uuid4(),
+            "title": "Post %d" % i,
+            "author": dict(author_pool[i % authors]),
+            "comments": [
+                {
+                    "id": str(uuid.uuid4()),
+                    "comment": "Comment %d" % j,
+                    "author": dict(author_pool[(i + j) % authors]),
+                }
+                for j in range(comments)
+            ],
+        })
+
+    return {"query": "posts", "count": posts, "size": posts, "posts": page}
+
+
+class Command(BaseCommand):
+    help = 'Measures how long it takes to normalize large synthetic pages of remote posts, per post'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000, help='Posts per page - default is 1000')
+        parser.add_argument('--comments', type=int, default=5, help='Comments per post - default is 5')
+        parser.add_argument('--authors', type=int, default=50, help='Distinct authors per page - default is 50')
+        parser.add_argument('--repeat', type=int, default=5, help='Pages to normalize per run - default is 5')
+
+    def handle(self, *args, **options):
+        posts = options['posts']
+        repeat = options['repeat']
+
+        for uuid_author_ids in (False, True):
+            page = make_page(posts, options['comments'], options['authors'], uuid_author_ids)
+            pages = [copy.deepcopy(page) for _ in range(repeat * 2)]
+
+            def clear_caches():
+                for fn in (is_url, is_uuid, get_post_id_from_uri):
+                    fn.cache.clear()
+
+            def normalize_cold():
+                clear_caches()
+                verify_posts_endpoint_output("benchmark", pages.pop())
+
+            def normalize_warm():
+                verify_posts_endpoint_output("benchmark", pages.pop())
+
+            cold = timeit.timeit(normalize_cold, number=repeat)
+            warm = timeit.timeit(normalize_warm, number=repeat)
+
+            self.stdout.write("%s author IDs, %d posts x %d comments per page:" % (
+                "UUID" if uuid_author_ids else "URL", posts, options['comments']))
+            self.stdout.write("  cold caches: %.1f us per post" % (cold / (repeat * posts) * 1e6))
+            self.stdout.write("  warm caches: %.1f us per post" % (warm / (repeat * posts) * 1e6))
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from social.app.models.noderegistry import ensure_local_node
+
+
+class Command(BaseCommand):
+    help = "Creates or updates the Node that represents this server. Also done after every migrate."
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', nargs='?', default=settings.LOCAL_NODE_URL,
+                            help="Base URL of this server, e.g. http://127.0.0.1:8000/. Defaults to LOCAL_NODE_URL.")
+
+    def handle(self, *args, **options):
+        if not options['url']:
+            raise CommandError("No URL given, and LOCAL_NODE_URL isn't set.")
+
+        node = ensure_local_node(options['url'])
+        self.stdout.write("Local node is %s" % node)
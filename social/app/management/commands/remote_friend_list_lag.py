@@ -0,0 +1,12 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from social.app.models.remotefriendlist import get_refresh_lag_stats
+
+
+class Command(BaseCommand):
+    help = "Prints how far behind the local mirrors of remote Authors' friend lists are, for monitoring."
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(get_refresh_lag_stats(), sort_keys=True))
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-19 14:52
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0017_merge_20170410_2327'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RemoteFriendList',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='remote_friend_list', serialize=False, to='app.Author')),
+                ('friend_ids_json', models.TextField(default=b'[]')),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+                ('stale_since', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default=b'')),
+            ],
+        ),
+    ]
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-19 14:54
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0018_remotefriendlist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundDelivery',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[(b'comment', b'Comment'), (b'friendrequest', b'Friend Request'), (b'friendrequestaccept', b'Friend Request Acceptance')], max_length=32)),
+                ('url', models.URLField(max_length=1024)),
+                ('payload', models.TextField()),
+                ('idempotency_key', models.CharField(max_length=255, unique=True)),
+                ('target_id', models.UUIDField()),
+                ('status', models.CharField(choices=[(b'pending', b'Pending'), (b'sending', b'Sending'), (b'delivered', b'Delivered'), (b'failed', b'Failed')], db_index=True, default=b'pending', max_length=16)),
+                ('attempts', models.IntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default=b'')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbound_deliveries', to='app.Author')),
+                ('node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.Node')),
+            ],
+            options={
+                'ordering': ('created_at',),
+                'verbose_name_plural': 'outbound deliveries',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-19 14:57
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0019_outbounddelivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='node',
+            name='push_posts',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='outbounddelivery',
+            name='kind',
+            field=models.CharField(choices=[(b'comment', b'Comment'), (b'friendrequest', b'Friend Request'), (b'friendrequestaccept', b'Friend Request Acceptance'), (b'inbox', b'Inbox Push')], max_length=32),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-19 15:06
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0020_node_push_posts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NodeCapabilities',
+            fields=[
+                ('node', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='capabilities', serialize=False, to='app.Node')),
+                ('author_trailing_slash', models.NullBooleanField()),
+                ('supports_size_param', models.NullBooleanField()),
+                ('supports_friends_search', models.NullBooleanField()),
+                ('headerless_posts', models.NullBooleanField()),
+                ('supports_gzip', models.NullBooleanField()),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'node capabilities',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-19 15:08
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0021_nodecapabilities'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NodeTransferStats',
+            fields=[
+                ('node', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='transfer_stats', serialize=False, to='app.Node')),
+                ('responses', models.BigIntegerField(default=0)),
+                ('compressed_responses', models.BigIntegerField(default=0)),
+                ('wire_bytes', models.BigIntegerField(default=0)),
+                ('content_bytes', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'node transfer stats',
+            },
+        ),
+    ]
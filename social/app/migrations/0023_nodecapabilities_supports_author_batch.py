@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-19 15:10
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0022_nodetransferstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nodecapabilities',
+            name='supports_author_batch',
+            field=models.NullBooleanField(),
+        ),
+    ]
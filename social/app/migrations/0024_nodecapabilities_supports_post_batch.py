@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-19 15:12
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0023_nodecapabilities_supports_author_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nodecapabilities',
+            name='supports_post_batch',
+            field=models.NullBooleanField(),
+        ),
+    ]
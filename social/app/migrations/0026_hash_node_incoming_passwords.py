@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-19 15:21
+from __future__ import unicode_literals
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import migrations
+
+
+def hash_incoming_passwords(apps, schema_editor):
+    Node = apps.get_model('app', 'Node')
+
+    for node in Node.objects.all():
+        try:
+            identify_hasher(node.incoming_password)
+        except ValueError:
+            node.incoming_password = make_password(node.incoming_password)
+            node.save(update_fields=['incoming_password'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0025_contentversion'),
+    ]
+
+    operations = [
+        # There's no getting the plain text back, so going back leaves them hashed
+        migrations.RunPython(hash_incoming_passwords, migrations.RunPython.noop)
+    ]
@@ -1,10 +1,12 @@
 import urlparse
 import uuid
-import re
 
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 
 from datetime import datetime
 
@@ -14,6 +16,8 @@ from django.utils import timezone
 from rest_framework.reverse import reverse
 
 from social.app.models.node import Node
+from social.app.models.noderegistry import node_registry
+from social.app.models.uri import get_author_id_from_uri, get_author_uri, parse_author_uri
 
 
 class Author(models.Model):
@@ -102,11 +106,20 @@ class Author(models.Model):
         else:
             raise Exception("Attempted to accept a friend request that does not exist.")
 
+    def get_node(self):
+        """
+        Returns this Author's Node from the NodeRegistry, which saves loading it from the database.
+        """
+        try:
+            return node_registry.get(self.node_id)
+        except Node.DoesNotExist:
+            return self.node
+
     def get_short_json(self, request):
         """
         Note: doesn't actually return JSON, just a Dict
         """
-        node = self.node
+        node = self.get_node()
 
         if node.local:
             uri = reverse("service:author-detail", kwargs={'pk': self.id}, request=request)
@@ -125,30 +138,20 @@ class Author(models.Model):
 
     @classmethod
     def get_id_from_uri(cls, uri):
-        return cls.parse_uri(uri)[1]
+        return get_author_id_from_uri(uri)
 
     @classmethod
     def parse_uri(cls, uri):
-        match = re.match(r'^(?P<host>(https?://(.+)/))author/(?P<pk>[0-9a-fA-F-]+)/?', uri)
-        return match.group('host'), uuid.UUID(match.group('pk'))
+        return parse_author_uri(uri)
 
     def get_uri(self):
-        return Author.get_uri_from_host_and_uuid(self.node.host, self.id)
+        return Author.get_uri_from_host_and_uuid(self.get_node().host, self.id)
 
     # This method cannot have the same name as get_uri as overloading
     # attributes is not directly supported in Python
     @staticmethod
     def get_uri_from_host_and_uuid(host_url, id):
-        if host_url[:-1] != '/':
-            host_url += '/'
-
-        if type(id) is not uuid.UUID:
-            id = uuid.UUID(id)
-
-        if host_url.startswith("http") is False:
-            host_url = "http://" + host_url
-
-        return host_url + 'author/' + str(id)
+        return get_author_uri(host_url, id)
 
     required_fields = {'id', 'url', 'host', 'displayName', 'github'}
 
@@ -162,7 +165,7 @@ def create_profile(sender, **kwargs):
     if kwargs["created"]:
         # Creating a new User populates a new Author, if not already set
         author = Author(user=user)
-        author.node = Node.objects.get(local=True)
+        author.node = node_registry.get_local()
         author.save()
     else:
         author = user.profile
@@ -195,7 +198,62 @@ post_save.connect(update_profile, sender=Author)
 def get_associated_author(user):
     if user.is_staff or user.username == "api":
         return None
-    return Author.objects.get_or_create(user=user)[0]
+
+    # Remembered on the User, which is loaded anew for every request, so a request looks its Author up at most once
+    try:
+        return user._profile_cache
+    except AttributeError:
+        pass
+
+    try:
+        author = Author.objects.select_related('node').get(user=user)
+    except Author.DoesNotExist:
+        author = Author.objects.get_or_create(user=user)[0]
+
+    user._profile_cache = author
+    return author
 
 
 User.profile = property(get_associated_author)
+
+
+def is_activated(user):
+    """
+    Returns whether the server admin has approved the Author of user. If the cache is shared by every process, that's
+    remembered in it for AUTH_ACTIVATION_CACHE_TIMEOUT seconds once they have, so checking it on every page costs no
+    queries.
+
+    Only approvals are cached, so someone waiting on one gets in as soon as it's given.
+    """
+    remember = can_remember_activation()
+    key = get_activation_cache_key(user.id)
+    if remember and cache.get(key):
+        return True
+
+    author = user.profile
+    if author is None or not author.activated:
+        return False
+
+    if remember:
+        cache.set(key, True, settings.AUTH_ACTIVATION_CACHE_TIMEOUT)
+    return True
+
+
+def can_remember_activation():
+    # With a cache in each process, taking an approval back would only forget it in the process that saved the Author,
+    # and the others would keep letting the user in
+    return settings.AUTH_ACTIVATION_CACHE_TIMEOUT > 0 and not isinstance(caches['default'], LocMemCache)
+
+
+def get_activation_cache_key(user_id):
+    return 'author:activated:%s' % user_id
+
+
+def forget_activation(sender, instance, **kwargs):
+    # The admin may have just taken the approval back
+    if instance.user_id is not None:
+        cache.delete(get_activation_cache_key(instance.user_id))
+
+
+post_save.connect(forget_activation, sender=Author, dispatch_uid='forget_activation_on_save')
+post_delete.connect(forget_activation, sender=Author, dispatch_uid='forget_activation_on_delete')
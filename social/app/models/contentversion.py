@@ -0,0 +1,161 @@
+import calendar
+
+from django.contrib.auth.models import User
+from django.db import models
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, m2m_changed, pre_migrate, post_migrate
+from django.utils import timezone
+
+from social.app.models.author import Author
+from social.app.models.comment import Comment
+from social.app.models.node import Node
+from social.app.models.post import Post
+
+
+class ContentVersion(models.Model):
+    """
+    Counts the changes made to one kind of content served by the service API, and when the last one was made.
+
+    The service API builds its ETags and Last-Modified headers from these, so it can tell a peer its copy is still
+    current without building the response first. Bumped by the signal handlers below whenever the content changes.
+    """
+    POSTS = "posts"
+    AUTHORS = "authors"
+
+    SCOPE_CHOICES = [
+        (POSTS, "Posts and Comments"),
+        (AUTHORS, "Authors and their friends"),
+    ]
+
+    scope = models.CharField(max_length=32, primary_key=True, choices=SCOPE_CHOICES)
+    version = models.BigIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return '%s version %d' % (self.get_scope_display(), self.version)
+
+    def changed_at_timestamp(self):
+        return calendar.timegm(self.changed_at.utctimetuple())
+
+
+# Data migrations can change content before the ContentVersion table exists, and nothing is being served meanwhile
+_migrating = [False]
+
+
+def bump_content_versions(*scopes):
+    """
+    Records a change to the given scopes. Runs in the same transaction as the change itself.
+    """
+    if _migrating[0]:
+        return
+
+    now = timezone.now()
+
+    for scope in scopes:
+        updated = ContentVersion.objects.filter(scope=scope).update(version=F('version') + 1, changed_at=now)
+
+        if not updated:
+            ContentVersion.objects.get_or_create(scope=scope, defaults={'version': 1, 'changed_at': now})
+
+
+def get_content_versions(scopes):
+    """
+    Returns the ContentVersion of each of the given scopes, in order. Scopes that have never changed get an unsaved
+    one at version 0.
+    """
+    versions = dict((version.scope, version) for version in ContentVersion.objects.filter(scope__in=scopes))
+
+    return [versions.get(scope) or ContentVersion(scope=scope, changed_at=None) for scope in scopes]
+
+
+def migration_started(sender, **kwargs):
+    _migrating[0] = True
+
+
+def migration_finished(sender, **kwargs):
+    _migrating[0] = False
+
+
+def is_local_author(author):
+    return author is not None and author.get_node().local
+
+
+def is_local_content(instance):
+    """
+    Returns whether instance is served by our service API. Remote Posts, Authors and Nodes are only cached here, so
+    refreshing them doesn't make anything a peer has fetched from us stale.
+    """
+    if isinstance(instance, Node):
+        return instance.local
+    if isinstance(instance, Author):
+        return is_local_author(instance)
+    if isinstance(instance, Post):
+        return is_local_author(instance.author)
+    if isinstance(instance, Comment):
+        # Comments from remote Authors are served along with the local Post they're on
+        return is_local_author(instance.post.author)
+    return True
+
+
+# Every local change UPDATEs the same ContentVersion row, so concurrent writers wait on each other until they commit.
+# Remote content is by far most of what gets written, and skipping it keeps the row cold.
+def posts_changed(sender, instance, **kwargs):
+    if is_local_content(instance):
+        bump_content_versions(ContentVersion.POSTS)
+
+
+def posts_and_authors_changed(sender, instance, **kwargs):
+    if is_local_content(instance):
+        bump_content_versions(ContentVersion.POSTS, ContentVersion.AUTHORS)
+
+
+def post_relations_changed(sender, instance, action, **kwargs):
+    # Sent both before and after the change, so only count it once. Changes made from the Category's or the Author's
+    # side can touch any Post
+    if action.startswith('post_') and (not isinstance(instance, Post) or is_local_content(instance)):
+        bump_content_versions(ContentVersion.POSTS)
+
+
+def author_friends_changed(sender, instance, action, pk_set=None, **kwargs):
+    if not action.startswith('post_'):
+        return
+
+    # Friendships are symmetrical, so one between a local and a remote Author shows up in the local one's friends
+    if (is_local_content(instance)
+            or (pk_set and Author.objects.filter(id__in=pk_set, node__local=True).exists())
+            or action == 'post_clear'):
+        bump_content_versions(ContentVersion.AUTHORS)
+
+
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # Logging in only touches last_login, which isn't served by the API
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+
+    # Only local Authors have Users
+    bump_content_versions(ContentVersion.AUTHORS)
+
+
+for model in (Post, Comment):
+    post_save.connect(posts_changed, sender=model, dispatch_uid='bump_content_versions_on_%s_save' % model.__name__)
+    post_delete.connect(posts_changed, sender=model,
+                        dispatch_uid='bump_content_versions_on_%s_delete' % model.__name__)
+
+# Posts include their Author, and their Node's URL
+for model in (Author, Node):
+    post_save.connect(posts_and_authors_changed, sender=model,
+                      dispatch_uid='bump_content_versions_on_%s_save' % model.__name__)
+    post_delete.connect(posts_and_authors_changed, sender=model,
+                        dispatch_uid='bump_content_versions_on_%s_delete' % model.__name__)
+
+post_save.connect(user_changed, sender=User, dispatch_uid='bump_content_versions_on_User_save')
+
+m2m_changed.connect(post_relations_changed, sender=Post.categories.through,
+                    dispatch_uid='bump_content_versions_on_post_categories_change')
+m2m_changed.connect(post_relations_changed, sender=Post.visible_to_author.through,
+                    dispatch_uid='bump_content_versions_on_post_visible_to_change')
+m2m_changed.connect(author_friends_changed, sender=Author.friends.through,
+                    dispatch_uid='bump_content_versions_on_author_friends_change')
+
+pre_migrate.connect(migration_started, dispatch_uid='pause_content_versions_while_migrating')
+post_migrate.connect(migration_finished, dispatch_uid='resume_content_versions_after_migrating')
@@ -0,0 +1,266 @@
+import base64
+import binascii
+import errno
+import hashlib
+import json
+import logging
+import os
+import re
+import stat
+import tempfile
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.structures import CaseInsensitiveDict
+
+# Response headers kept with a cached body, for whoever reads the response we rebuild from it. requests has already
+# decoded the body, so Content-Encoding and Content-Length no longer describe it
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+MAX_AGE_PATTERN = re.compile(r'max-age\s*=\s*"?(\d+)')
+
+# When the cache outgrows its limit, least recently used responses are removed until it's down to this fraction of it
+EVICTION_TARGET = 0.9
+
+
+class HTTPCache(object):
+    """
+    Remembers the responses remote nodes give to our GETs, so we can ask for them again with If-None-Match and
+    If-Modified-Since, and reuse them as-is while their Cache-Control max-age says they're fresh.
+
+    Responses are kept as files in one directory, so they're shared by every worker on the machine and survive
+    restarts. Once the directory holds more than max_bytes, the least recently used ones are removed. Files are
+    used instead of the database so requests made from bounded_map() threads don't each need a connection.
+
+    Whatever is in the directory ends up in what we serve and store, so it's only used if it belongs to us and nobody
+    else can write to it.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        # Our running guess at the size of the directory, None until it has been measured
+        self._estimated_bytes = None
+        # Whether the directory is safe to use, None until it has been checked
+        self._usable = None
+
+    def get(self, url, auth, headers, send):
+        """
+        Returns the response to a GET of url, calling send(url, headers) to make the request if the cached response
+        (if any) needs to be fetched or revalidated. Responses served from the cache come back as 200s.
+        """
+        if not self.max_bytes or not self._check_directory():
+            return send(url, headers)
+
+        key = get_cache_key(url, auth)
+        entry = self._read(key)
+
+        if entry is not None and entry['expires_at'] > time.time():
+            self._touch(key)
+            return make_response(url, entry)
+
+        if entry is not None:
+            headers = dict(headers)
+            if entry['headers'].get('ETag'):
+                headers['If-None-Match'] = entry['headers']['ETag']
+            if entry['headers'].get('Last-Modified'):
+                headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+
+        response = send(url, headers)
+
+        if entry is not None and response.status_code == requests.codes.not_modified:
+            # Still current, and the 304 may come with new validators or a new max-age
+            for header in ('ETag', 'Last-Modified', 'Cache-Control'):
+                if header in response.headers:
+                    entry['headers'][header] = response.headers[header]
+
+            entry['expires_at'] = time.time() + get_max_age(entry['headers'].get('Cache-Control', ''))
+            self._write(key, entry)
+            return make_response(url, entry)
+
+        self._store(key, url, response)
+        return response
+
+    def _store(self, key, url, response):
+        cache_control = response.headers.get('Cache-Control', '').lower()
+        max_age = get_max_age(cache_control)
+        has_validators = 'ETag' in response.headers or 'Last-Modified' in response.headers
+
+        if response.status_code != requests.codes.ok or 'no-store' in cache_control or \
+                not (has_validators or max_age):
+            # Whatever we had is no good anymore, and there's nothing worth keeping in its place
+            self._delete(key)
+            return
+
+        self._write(key, {
+            'url': url,
+            'headers': dict((header, response.headers[header]) for header in STORED_HEADERS
+                            if header in response.headers),
+            'encoding': response.encoding,
+            'body': response.content,
+            'expires_at': time.time() + max_age,
+        })
+
+    def _check_directory(self):
+        """
+        Creates the directory if it's missing, and returns whether it's private to us.
+        """
+        if self._usable is not None:
+            return self._usable
+
+        try:
+            os.makedirs(self.directory, 0o700)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                logging.warn("Could not create the HTTP cache directory %s: %s" % (self.directory, e))
+                return False
+
+        try:
+            info = os.lstat(self.directory)
+        except OSError as e:
+            logging.warn("Could not check the HTTP cache directory %s: %s" % (self.directory, e))
+            return False
+
+        if not stat.S_ISDIR(info.st_mode):
+            problem = "is not a directory"
+        elif hasattr(os, 'getuid') and info.st_uid != os.getuid():
+            problem = "belongs to another user"
+        elif stat.S_IMODE(info.st_mode) & 0o077:
+            problem = "can be used by other users, it should have mode 0700"
+        else:
+            problem = None
+
+        if problem:
+            logging.warn("Not caching responses from remote nodes: %s %s" % (self.directory, problem))
+
+        self._usable = problem is None
+        return self._usable
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _read(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                entry = json.loads(f.read().decode('utf-8'))
+            entry['body'] = base64.b64decode(entry['body'])
+            return entry
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                logging.warn("Could not read cached response %s: %s" % (key, e))
+        except (ValueError, KeyError, TypeError, binascii.Error) as e:
+            logging.warn("Discarding unreadable cached response %s: %s" % (key, e))
+            self._delete(key)
+
+        return None
+
+    def _write(self, key, entry):
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory, 0o700)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                logging.warn("Could not create the HTTP cache directory %s: %s" % (self.directory, e))
+                return
+
+        # The body may not be text, so it's stored in base64
+        data = dict(entry, body=base64.b64encode(entry['body']).decode('ascii'))
+
+        try:
+            # Written under another name first, so nobody reads a half-written response
+            (fd, temp_path) = tempfile.mkstemp(dir=self.directory, prefix='.')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(data).encode('utf-8'))
+            size = os.path.getsize(temp_path)
+            os.rename(temp_path, self._path(key))
+        except (IOError, OSError) as e:
+            logging.warn("Could not cache the response from %s: %s" % (entry['url'], e))
+            return
+
+        with self._lock:
+            if self._estimated_bytes is not None:
+                self._estimated_bytes += size
+            needs_eviction = self._estimated_bytes is None or self._estimated_bytes > self.max_bytes
+
+        if needs_eviction:
+            self.evict()
+
+    def _touch(self, key):
+        try:
+            # Marks it as recently used, see evict()
+            os.utime(self._path(key), None)
+        except OSError:
+            pass
+
+    def _delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def evict(self):
+        """
+        Measures the cache, and removes the least recently used responses if it's over max_bytes.
+        """
+        files = []
+        for name in os.listdir(self.directory):
+            if name.startswith('.'):
+                # Still being written
+                continue
+
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Removed by another process while we were looking
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for (mtime, size, path) in files)
+
+        if total_bytes > self.max_bytes:
+            for (mtime, size, path) in sorted(files):
+                if total_bytes <= self.max_bytes * EVICTION_TARGET:
+                    break
+
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total_bytes -= size
+
+        with self._lock:
+            self._estimated_bytes = total_bytes
+
+
+def get_cache_key(url, auth):
+    # Different credentials can be shown different things at the same URL
+    return hashlib.sha1(('%s\n%s' % (url, ':'.join(auth or ()))).encode('utf-8')).hexdigest()
+
+
+def get_max_age(cache_control):
+    cache_control = cache_control.lower()
+    if 'no-cache' in cache_control or 'no-store' in cache_control:
+        return 0
+
+    match = MAX_AGE_PATTERN.search(cache_control)
+    return int(match.group(1)) if match else 0
+
+
+def make_response(url, entry):
+    response = requests.Response()
+    response.status_code = requests.codes.ok
+    response.reason = 'OK'
+    response.url = url
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response.encoding = entry['encoding']
+    response._content = entry['body']
+    return response
+
+
+# Shared by every Node in this process
+http_cache = HTTPCache(settings.FEDERATION_HTTP_CACHE_DIR, settings.FEDERATION_HTTP_CACHE_MAX_BYTES)
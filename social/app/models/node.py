@@ -1,15 +1,37 @@
+import copy
 import logging
 import urllib
 import urlparse
-import re
 import uuid
 
 import requests
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+from django.core.cache import cache
 from django.db import models
-from requests import HTTPError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from requests import HTTPError, RequestException
 from rest_framework.reverse import reverse
 
-from social.app.models.utils import is_valid_url, is_valid_uuid
+from social.app.models.httpcache import http_cache
+from social.app.models.normalize import normalize_author, verify_posts_endpoint_output
+from social.app.models.singleflight import outbound_requests, shared_do
+from social.app.models.uri import get_host_from_uri, parse_author_uris
+from social.app.models.utils import is_valid_url, bounded_map
+
+# Spelled out, even though requests asks for compressed responses by default, so it doesn't get lost
+REQUEST_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+# Responses at least this long (in bytes) are expected to come back compressed from nodes that support gzip
+GZIP_PROBE_MIN_LENGTH = 1024
+
+# What nodes answer with when they don't have an endpoint, or don't allow the method on it
+UNSUPPORTED_STATUS_CODES = (requests.codes.not_found, requests.codes.method_not_allowed,
+                            requests.codes.not_implemented)
 
 
 class Node(models.Model):
@@ -28,20 +50,107 @@ class Node(models.Model):
     share_images = models.BooleanField(default=True)
     share_posts = models.BooleanField(default=True)
 
+    # Whether this node wants to be told about changes to our posts via its /inbox endpoint, instead of polling
+    push_posts = models.BooleanField(default=False)
+
     incoming_username = models.CharField(unique=True, default='social', blank=True, max_length=512)
+    # Stored hashed, like User passwords. Plain text set here (e.g. through the admin) is hashed on save.
     incoming_password = models.CharField(default='password', blank=True, max_length=512)
 
     def __str__(self):
         return '%s (%s; %s)' % (self.name, self.host, self.service_url)
 
+    def save(self, *args, **kwargs):
+        self.incoming_password = hash_incoming_password(self.incoming_password)
+        super(Node, self).save(*args, **kwargs)
+
+    def check_incoming_password(self, raw_password):
+        """
+        Returns whether raw_password is the password this node uses to connect to us. Deliberately slow, see
+        NodeBasicAuthentication for how that's kept off the path of most requests.
+        """
+        return check_password(raw_password, self.incoming_password)
+
+    def _get(self, url):
+        # Answered from our copy of the last response when the node says it hasn't changed
+        return http_cache.get(url, self.auth(), REQUEST_HEADERS, self._send_get)
+
+    def _send_get(self, url, headers):
+        response = requests.get(url, auth=self.auth(), headers=headers)
+        self._record_transfer(response)
+        return response
+
+    def _record_transfer(self, response):
+        from social.app.models.transferstats import record_response
+
+        record_response(self, response)
+
+    def get_capabilities(self):
+        """
+        Returns this node's NodeCapabilities, creating a blank one if we haven't learned anything about it yet.
+        """
+        from social.app.models.nodecapabilities import NodeCapabilities
+
+        try:
+            return self.capabilities
+        except NodeCapabilities.DoesNotExist:
+            (capabilities, created) = NodeCapabilities.objects.get_or_create(node=self)
+            self.capabilities = capabilities
+            return capabilities
+
+    def _learn_gzip(self, response):
+        if response.headers.get('Content-Encoding') == 'gzip':
+            self.get_capabilities().learn('supports_gzip', True)
+        elif len(response.content) >= GZIP_PROBE_MIN_LENGTH:
+            # Small responses often aren't worth compressing, so only count ones big enough that they should've been
+            self.get_capabilities().learn('supports_gzip', False)
+
+    def _learn_post_format(self, response, json):
+        from social.app.models.post import Post
+
+        # Pages of posts are the biggest responses we get, so they're where compression shows up
+        self._learn_gzip(response)
+
+        if isinstance(json, dict) and all(keys in json for keys in Post.required_header_fields):
+            self.get_capabilities().learn('headerless_posts', False)
+        elif all(keys in json for keys in Post.required_fields):
+            self.get_capabilities().learn('headerless_posts', True)
+
+    def _post(self, url, json, headers=None, timeout=None):
+        response = requests.post(url, json=json, auth=self.auth(), headers=dict(REQUEST_HEADERS, **(headers or {})),
+                                 timeout=timeout)
+        self._record_transfer(response)
+        return response
+
     def _get_author(self, author_id):
         url = urlparse.urljoin(self.service_url, "author/" + str(author_id))
-        response = requests.get(url, auth=self.auth())
-        if response.status_code != 200:
-            # Attempt trailing slash (required for salty-plains-60914)
-            response = requests.get(url + '/', auth=self.auth())
+        # Several users opening the same remote Author at once only need one round trip between them
+        (response, shared) = outbound_requests.do(url, self._fetch_author, url)
         return response
 
+    def _fetch_author(self, url):
+        capabilities = self.get_capabilities()
+        trailing_slash = capabilities.author_trailing_slash
+
+        # Go with whichever form worked last time, or without the slash if we don't know yet
+        response = self._get(url + '/' if trailing_slash else url)
+
+        if response.status_code == 200:
+            capabilities.learn('author_trailing_slash', bool(trailing_slash))
+            return response
+
+        if trailing_slash is not None and response.status_code == requests.codes.not_found:
+            # The form we know works says there's no such Author, so the other one won't find it either
+            return response
+
+        # Attempt the other form (the trailing slash is required for salty-plains-60914)
+        other_response = self._get(url if trailing_slash else url + '/')
+
+        if other_response.status_code == 200:
+            capabilities.learn('author_trailing_slash', not trailing_slash)
+
+        return other_response
+
     def auth(self):
         return self.username, self.password
 
@@ -50,20 +159,44 @@ class Node(models.Model):
 
     def get_post(self, post_id):
         url = urlparse.urljoin(self.service_url, "posts/" + str(post_id))
-        response = requests.get(url, auth=self.auth())
+        (json, shared) = shared_do(url, self._fetch_post, url)
+
+        # Callers modify the returned posts in place, so everyone waiting on this fetch gets their own copy
+        return copy.deepcopy(json)
+
+    def _fetch_post(self, url):
+        response = self._get(url)
         response.raise_for_status()
-        return verify_posts_endpoint_output(url, response.json())
 
-    def get_post_comments(self, post_uuid):
+        json = response.json()
+        self._learn_post_format(response, json)
+        return verify_posts_endpoint_output(url, json)
+
+    def get_post_comments(self, post_uuid, concurrent=True):
         """
         Returns a list of dicts that represents all of the Comments fetched for a particular remote Post,
         traversing pagination if required.
+
+        If concurrent is set and the first page's links follow our own page-number style, the remaining pages are
+        fetched at the same time (at most FEDERATION_MAX_CONCURRENT_REQUESTS at once). Otherwise, we fall back to
+        following the next links one page at a time.
         """
         base_url = urlparse.urljoin(self.service_url, "posts/%s/comments" % str(post_uuid))
-        json = requests.get(base_url, auth=self.auth()).json()
+        json = self._get(base_url).json()
 
         all_comments = json["comments"]
 
+        if concurrent and 'next' in json and is_valid_url(json['next']):
+            page_urls = get_remaining_page_urls(json['next'], json)
+
+            if page_urls is not None:
+                pages = bounded_map(self._get_comments_page, page_urls, settings.FEDERATION_MAX_CONCURRENT_REQUESTS)
+
+                for page in pages:
+                    all_comments += page
+
+                return all_comments
+
         while True:
             # Depending on how the other server interpreted the spec, a lack of a next page is rendered as either
             # the next field not existing, or the next field being set to an empty value, so we gotta check for both
@@ -72,14 +205,17 @@ class Node(models.Model):
             else:
                 break
 
-            json = requests.get(next_url, auth=self.auth()).json()
+            json = self._get(next_url).json()
             all_comments += json["comments"]
 
         return all_comments
 
+    def _get_comments_page(self, url):
+        return self._get(url).json()["comments"]
+
     def get_author_friends(self, author_id):
         url = urlparse.urljoin(self.service_url, "author/%s/friends" % str(author_id))
-        response = requests.get(url, auth=self.auth())
+        response = self._get(url)
         response.raise_for_status()
         return verify_friends_of_endpoint_output(url, response.json())
 
@@ -95,34 +231,146 @@ class Node(models.Model):
                + "author/" + str(first_author_id)
                + "/friends/" + second_author_host + str(second_author_id))
 
-        return requests.get(url, auth=(self.username, self.password)).json()["friends"]
+        return self._get(url).json()["friends"]
+
+    def get_verified_friends(self, author_id, author_uris):
+        """
+        Returns the subset of author_uris that this node says are friends with its Author with id author_id.
+
+        All of the URIs are checked with a single request to this node's author/{id}/friends search (falling back to
+        checking them one by one if the node doesn't support it), and the answers are cached for
+        FEDERATION_FRIENDSHIP_CACHE_TIMEOUT seconds.
+        """
+        verified_uris = []
+        unknown_uris = []
+        author_ids = parse_author_uris(author_uris)
+
+        for author_uri in author_uris:
+            if author_uri not in author_ids:
+                continue
+
+            friends = cache.get(self._friendship_cache_key(author_id, author_ids[author_uri]))
+            if friends is None:
+                unknown_uris.append(author_uri)
+            elif friends:
+                verified_uris.append(author_uri)
+
+        if not unknown_uris:
+            return verified_uris
+
+        capabilities = self.get_capabilities()
+        new_verified_uris = None
+
+        if capabilities.supports_friends_search is not False:
+            try:
+                friend_ids = self.search_author_friends(author_id, unknown_uris)
+                new_verified_uris = [author_uri for author_uri in unknown_uris
+                                     if author_ids[author_uri] in friend_ids]
+                capabilities.learn('supports_friends_search', True)
+            except (RequestException, ValueError, KeyError) as e:
+                logging.warn("Friends search failed on %s (%s). Checking friends one at a time instead."
+                             % (self.host, e))
+
+                response = getattr(e, 'response', None)
+                if (response is None and not isinstance(e, RequestException)) or \
+                        (response is not None and response.status_code in UNSUPPORTED_STATUS_CODES):
+                    # It's not that the node is having trouble, it just doesn't do friend searches
+                    capabilities.learn('supports_friends_search', False)
+
+        if new_verified_uris is None:
+            new_verified_uris = [author_uri for author_uri in unknown_uris
+                                 if self.get_if_authors_are_friends(author_id, author_uri)]
+
+        for author_uri in unknown_uris:
+            cache.set(self._friendship_cache_key(author_id, author_ids[author_uri]), author_uri in new_verified_uris,
+                      settings.FEDERATION_FRIENDSHIP_CACHE_TIMEOUT)
+
+        return verified_uris + new_verified_uris
+
+    def are_friends(self, author_id, other_author_uri):
+        """
+        Returns whether this node says its Author with id author_id and the Author at other_author_uri are friends.
+        """
+        return len(self.get_verified_friends(author_id, [other_author_uri])) > 0
+
+    def search_author_friends(self, author_id, author_uris):
+        """
+        Returns the set of IDs of the Authors in author_uris that are friends with this node's Author with id
+        author_id, according to a POST to author/{id}/friends.
+        """
+        url = urlparse.urljoin(self.service_url, "author/%s/friends" % str(author_id))
+        response = self._post(url, {
+            "query": "friends",
+            "author": str(author_id),
+            "authors": author_uris,
+        })
+        response.raise_for_status()
+
+        return set(parse_author_uris(response.json()["authors"]).values())
+
+    def _friendship_cache_key(self, author_id, other_author_id):
+        return 'friends:%s:%s:%s' % (self.id, author_id, other_author_id)
 
     def get_author_posts(self):
         url = urlparse.urljoin(self.service_url, 'author/posts')
-        response = requests.get(url, auth=self.auth())
+        response = self._get(url)
         response.raise_for_status()
-        return verify_posts_endpoint_output(url, response.json())
+
+        json = response.json()
+        self._learn_post_format(response, json)
+        return verify_posts_endpoint_output(url, json)
 
     @classmethod
     def get_host_from_uri(cls, uri):
-        p = '(?:http.*://)?(?P<host>[^:/ ]+).?(?P<port>[0-9]*).*'
-        m = re.search(p, uri)
-        return m.group('host')
+        return get_host_from_uri(uri)
 
     '''
     Get all the public posts, traversing through the 'next' link as well, if present.
     '''
 
     def get_all_public_posts(self, size=50):
+        return list(self.iter_public_posts_pages(size=size))
+
+    def iter_public_posts_pages(self, size=50, max_pages=None):
+        """
+        Yields each page of /service/posts in turn, only requesting the next page once the caller asks for it, so
+        only one page needs to be held in memory at a time.
+
+        Stops after max_pages pages, if given.
+        """
         posts_json = self.get_public_posts(size=size)
-        all_posts_jsons = [posts_json]
-        while True:
+        pages = 1
+        yield posts_json
+
+        while max_pages is None or pages < max_pages:
             if 'next' in posts_json and is_valid_url(posts_json['next']):
                 posts_json = self.get_public_posts(next_url=posts_json['next'])
-                all_posts_jsons.append(posts_json)
+                pages += 1
+                yield posts_json
             else:
                 break
-        return all_posts_jsons
+
+    def iter_public_posts(self, size=50, max_pages=None, max_age=None):
+        """
+        Yields a list of the post dicts on each page of /service/posts, as they're fetched.
+
+        If max_age (a timedelta) is given, posts published longer ago than that are left out, and no more pages are
+        requested once a whole page of them has been seen, as the listing is ordered newest first.
+        """
+        cutoff = timezone.now() - max_age if max_age is not None else None
+
+        for posts_json in self.iter_public_posts_pages(size=size, max_pages=max_pages):
+            posts = posts_json.get('posts', [])
+
+            if cutoff is None:
+                yield posts
+                continue
+
+            recent_posts = [post for post in posts if not is_published_before(post, cutoff)]
+            yield recent_posts
+
+            if posts and not recent_posts:
+                break
 
     '''
     Get all the posts from /service/posts
@@ -131,6 +379,12 @@ class Node(models.Model):
     '''
 
     def get_public_posts(self, page=1, size=50, next_url=None):
+        capabilities = self.get_capabilities()
+
+        if capabilities.supports_size_param is False:
+            # They'll send their own page size no matter what, so don't bother asking
+            size = None
+
         if next_url is None:
             url = urlparse.urljoin(self.service_url, "posts")
             params = dict()
@@ -144,9 +398,19 @@ class Node(models.Model):
         else:
             url = next_url
 
-        response = requests.get(url, auth=self.auth())
+        response = self._get(url)
         response.raise_for_status()
-        return verify_posts_endpoint_output(url, response.json())
+
+        json = response.json()
+        self._learn_post_format(response, json)
+
+        if next_url is None and size is not None and isinstance(json, dict) and 'size' in json:
+            if json['size'] == size:
+                capabilities.learn('supports_size_param', True)
+            elif len(json.get('posts', [])) > size:
+                capabilities.learn('supports_size_param', False)
+
+        return verify_posts_endpoint_output(url, json)
 
     def create_or_update_remote_post(self, post_uuid):
         try:
@@ -158,6 +422,9 @@ class Node(models.Model):
             else:
                 raise
 
+        return self._save_remote_post_from_page(post_uuid, json)
+
+    def _save_remote_post_from_page(self, post_uuid, json):
         # Even when fetching a single post, we get a "paginated" view of it
         # So, let's go find our post in here
         for post_json in json["posts"]:
@@ -204,6 +471,76 @@ class Node(models.Model):
         # instead of a 404
         return None
 
+    def create_or_update_remote_posts(self, post_ids):
+        """
+        Like create_or_update_remote_post(), but for many Posts at once. They're fetched through this node's
+        posts/batch endpoint, FEDERATION_MAX_BATCH_SIZE at a time, falling back to fetching them one by one if the
+        node doesn't have it.
+
+        Returns the Posts that were found, including any images attached to them, and the set of IDs the node said
+        are gone: those left out of a well-formed batch response, or answered with a 404.
+        """
+        from social.app.models.post import save_remote_post
+
+        post_ids = list(post_ids)
+        capabilities = self.get_capabilities()
+        posts = []
+        gone_ids = set()
+
+        if capabilities.supports_post_batch is not False:
+            try:
+                for start in range(0, len(post_ids), settings.FEDERATION_MAX_BATCH_SIZE):
+                    batch_ids = post_ids[start:start + settings.FEDERATION_MAX_BATCH_SIZE]
+                    # A response we can't make sense of has no "posts", which mustn't be taken to mean they're gone
+                    batch_posts = [save_remote_post(self, post_json)
+                                   for post_json in self.get_posts(batch_ids)["posts"]]
+
+                    posts += batch_posts
+                    gone_ids.update(set(batch_ids) - set(post.id for post in batch_posts))
+
+                capabilities.learn('supports_post_batch', True)
+                return posts, gone_ids
+            except (RequestException, ValueError, KeyError) as e:
+                logging.warn("Batch post lookup failed on %s (%s). Looking them up one at a time instead."
+                             % (self.host, e))
+
+                response = getattr(e, 'response', None)
+                if (response is None and not isinstance(e, RequestException)) or \
+                        (response is not None and response.status_code in UNSUPPORTED_STATUS_CODES):
+                    # It's not that the node is having trouble, it just doesn't do batches
+                    capabilities.learn('supports_post_batch', False)
+
+        found_ids = set(post.id for post in posts)
+        for post_id in post_ids:
+            if post_id in found_ids or post_id in gone_ids:
+                continue
+
+            try:
+                result = self._save_remote_post_from_page(post_id, self.get_post(post_id))
+            except HTTPError as e:
+                if e.response.status_code == requests.codes.not_found:
+                    gone_ids.add(post_id)
+                    continue
+                raise
+
+            if result is not None:
+                posts.append(result[0])
+
+        return posts, gone_ids
+
+    def get_posts(self, post_ids):
+        """
+        Returns the Posts with the given IDs, and their images, according to a POST to posts/batch.
+        """
+        url = urlparse.urljoin(self.service_url, "posts/batch")
+        response = self._post(url, {
+            "query": "posts",
+            "posts": [urlparse.urljoin(self.service_url, "posts/%s" % post_id) for post_id in post_ids],
+        })
+        response.raise_for_status()
+
+        return verify_posts_endpoint_output(url, response.json())
+
     def create_or_update_remote_author(self, author_id):
         response = self._get_author(author_id)
 
@@ -216,12 +553,68 @@ class Node(models.Model):
             else:
                 raise
 
-        json = response.json()
+        return self.save_remote_author(response.json())
 
-        if 'id' in json and 'url' in json:
-            if is_valid_url(json['id']) == False and is_valid_uuid(json['id']):
-                json['id'] = json['url']
-                logging.warn("The post author ID is a UUID and not a URL. Changed the field to the given URL.")
+    def create_or_update_remote_authors(self, author_ids, one_by_one=True):
+        """
+        Like create_or_update_remote_author(), but for many Authors at once. They're fetched through this node's
+        author/batch endpoint, FEDERATION_MAX_BATCH_SIZE at a time, falling back to fetching them one by one if the
+        node doesn't have it (unless one_by_one is False). Returns the Authors that were found.
+        """
+        author_ids = list(author_ids)
+        capabilities = self.get_capabilities()
+        authors = []
+
+        if capabilities.supports_author_batch is not False:
+            try:
+                for start in range(0, len(author_ids), settings.FEDERATION_MAX_BATCH_SIZE):
+                    batch_ids = author_ids[start:start + settings.FEDERATION_MAX_BATCH_SIZE]
+                    authors += [self.save_remote_author(author_json)
+                                for author_json in self.get_authors(batch_ids)]
+
+                capabilities.learn('supports_author_batch', True)
+                return authors
+            except (RequestException, ValueError, KeyError) as e:
+                logging.warn("Batch author lookup failed on %s (%s). Looking them up one at a time instead."
+                             % (self.host, e))
+
+                response = getattr(e, 'response', None)
+                if (response is None and not isinstance(e, RequestException)) or \
+                        (response is not None and response.status_code in UNSUPPORTED_STATUS_CODES):
+                    # It's not that the node is having trouble, it just doesn't do batches
+                    capabilities.learn('supports_author_batch', False)
+
+        if not one_by_one:
+            return authors
+
+        found_ids = set(author.id for author in authors)
+        for author_id in author_ids:
+            if author_id not in found_ids:
+                author = self.create_or_update_remote_author(author_id)
+                if author is not None:
+                    authors.append(author)
+
+        return authors
+
+    def get_authors(self, author_ids):
+        """
+        Returns the profiles of the Authors with the given IDs, according to a POST to author/batch.
+        """
+        url = urlparse.urljoin(self.service_url, "author/batch")
+        response = self._post(url, {
+            "query": "authors",
+            "authors": [urlparse.urljoin(self.service_url, "author/%s" % author_id) for author_id in author_ids],
+        })
+        response.raise_for_status()
+
+        return response.json()["authors"]
+
+    def save_remote_author(self, json):
+        """
+        Creates or updates one of this node's Authors from their profile, as returned by author/{id}.
+        """
+        if 'id' in json and 'url' in json and normalize_author(json):
+            logging.warn("The post author ID is a UUID and not a URL. Changed the field to the given URL.")
 
         from social.app.models.author import Author
         (author, created) = Author.objects.update_or_create(
@@ -256,16 +649,23 @@ class Node(models.Model):
 
     is_authenticated = property(get_is_authenticated)
 
-    def post_friend_request(self, request, local_author, remote_author):
+    def post_friend_request(self, request, local_author, remote_author, accept=False):
+        """
+        Queues up a friend request from local_author to remote_author (or, if accept is set, local_author's
+        acceptance of remote_author's friend request) to be sent to this node, and returns the OutboundDelivery.
+        """
+        from social.app.models.outbox import OutboundDelivery
+
         if remote_author.node != self or self.local:
             raise Exception("Target's node must be the same remote node.")
 
         current_author_uri = reverse("service:author-detail", kwargs={'pk': local_author.id}, request=request)
         target_author_uri = urlparse.urljoin(self.service_url, 'author/' + str(remote_author.id))
+        kind = OutboundDelivery.FRIEND_REQUEST_ACCEPT if accept else OutboundDelivery.FRIEND_REQUEST
 
-        return requests.post(
-            urlparse.urljoin(self.service_url, "friendrequest"),
-            json={
+        return OutboundDelivery.enqueue(
+            self, kind, urlparse.urljoin(self.service_url, "friendrequest"),
+            {
                 "query": "friendrequest",
                 "author": {
                     "id": current_author_uri,
@@ -280,55 +680,69 @@ class Node(models.Model):
                     "url": target_author_uri,
                 }
             },
-            auth=self.auth())
-
-
-def verify_posts_endpoint_output(url, json):
-    from social.app.models.post import Post
-    if all(keys in json for keys in Post.required_header_fields):
-        for post in json['posts']:
-            # Exceptional case converts a given URL to its UUID as per the specification
-            if is_valid_url(post['id']):
-                try:
-                    uuid = Post.get_id_from_uri(post['id'])
-                    post['id'] = uuid
-                except Exception as e:
-                    logging.error(e)
-                    logging.error('We received a post with a URL in the ID field; ' +
-                                  'however {} does not appear to contain a valid UUID.'.format(json['id']))
-
-            if is_valid_url(post['author']['id']) == False and is_valid_uuid(post['author']['id']):
-                post['author']['id'] = post['author']['url']
-                logging.warn("The post author ID is a UUID and not a URL. Changed the field to the given URL.")
-
-            for comment in post['comments']:
-                if is_valid_url(comment['author']['id']) == False and is_valid_uuid(comment['author']['id']):
-                    comment['author']['id'] = comment['author']['url']
-                    logging.warn(
-                        "The post comment author ID is a UUID and not a URL. " +
-                        "Changed the field to the given URL.")
+            author=local_author,
+            target_id=remote_author.id,
+            idempotency_key="%s:%s:%s" % (kind, local_author.id, remote_author.id))
 
-        return json
-    else:
-        # This exceptional case supports groups that give us a single post instead
-        if all(keys in json for keys in Post.required_fields):
-            if type(json) is dict:
-                json = [json]
-
-            logging.warn(
-                'We received the post details without a header! ' +
-                'Added a header to correct the response to the specification.')
-
-            return verify_posts_endpoint_output(url, {
-                'query': 'posts',
-                'size': 50,
-                'count': 1,
-                'posts': json,
-            })
-        logging.warn(
-            "%s did not conform to the expected response format! Returning an empty list of posts!"
-            % url)
-        return {}
+
+def hash_incoming_password(password):
+    """
+    Returns the hash of password, or password itself if it's already been hashed.
+    """
+    try:
+        identify_hasher(password)
+        return password
+    except ValueError:
+        return make_password(password)
+
+
+def get_remaining_page_urls(next_url, json):
+    """
+    Given the next link of the first page of a paginated response, and that response, returns the URLs of every
+    page after the first, or None if they can't be worked out from the next link.
+
+    Only links of the form ...?page=2[&size=N] (i.e. what Django REST Framework gives out) are supported, since
+    other servers could be using links that don't map onto page numbers.
+    """
+    count = json.get('count')
+    size = json.get('size')
+
+    if not isinstance(count, (int, long)) or not isinstance(size, (int, long)) or size <= 0:
+        return None
+
+    parts = urlparse.urlparse(next_url)
+    query = urlparse.parse_qsl(parts.query, keep_blank_values=True)
+
+    if [value for (key, value) in query if key == 'page'] != ['2']:
+        return None
+
+    last_page = (count + size - 1) // size
+    page_urls = []
+
+    for page in range(2, last_page + 1):
+        page_query = [(key, str(page) if key == 'page' else value) for (key, value) in query]
+        page_urls.append(urlparse.urlunparse(parts._replace(query=urllib.urlencode(page_query))))
+
+    return page_urls
+
+
+def is_published_before(post_json, cutoff):
+    """
+    Returns True if the post dict was published before the cutoff datetime. Posts without a parsable published date
+    are treated as recent.
+    """
+    try:
+        published = parse_datetime(post_json['published'])
+    except (KeyError, TypeError, ValueError):
+        return False
+
+    if published is None:
+        return False
+
+    if timezone.is_naive(published):
+        published = timezone.make_aware(published, timezone.utc)
+
+    return published < cutoff
 
 
 def verify_friends_of_endpoint_output(url, json):
@@ -0,0 +1,63 @@
+import logging
+
+from django.db import models
+from django.utils import timezone
+
+from social.app.models.node import Node
+from social.app.models.utils import defer_to_caller
+
+
+class NodeCapabilities(models.Model):
+    """
+    What we've learned about how a remote node's API differs from the spec, from its responses so far.
+
+    Each field is null until we've seen a response that settles it. Node uses these to make each request in the
+    form the remote node wants on the first try.
+    """
+    node = models.OneToOneField(
+        Node,
+        primary_key=True,
+        related_name='capabilities',
+        on_delete=models.CASCADE
+    )
+
+    # Whether author/{id} only works with a trailing slash
+    author_trailing_slash = models.NullBooleanField()
+    # Whether the size query parameter of /posts/ is honoured
+    supports_size_param = models.NullBooleanField()
+    # Whether POSTing to author/{id}/friends works
+    supports_friends_search = models.NullBooleanField()
+    # Whether Authors can be looked up in bulk through author/batch
+    supports_author_batch = models.NullBooleanField()
+    # Whether Posts can be looked up in bulk through posts/batch
+    supports_post_batch = models.NullBooleanField()
+    # Whether single posts are sent without the paginated header around them
+    headerless_posts = models.NullBooleanField()
+    # Whether responses come back gzipped
+    supports_gzip = models.NullBooleanField()
+
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name_plural = "node capabilities"
+
+    def __str__(self):
+        return 'Capabilities of %s' % self.node.host
+
+    def learn(self, capability, value):
+        """
+        Records the value of a capability, saving it only if it differs from what we already knew.
+        """
+        if getattr(self, capability) == value:
+            return
+
+        logging.info("Learned that %s of %s is %s." % (capability, self.node.host, value))
+
+        setattr(self, capability, value)
+        self.updated_at = timezone.now()
+
+        # Only touch this one field, as other threads could be learning other things about the node at the same time
+        defer_to_caller(NodeCapabilities.objects.filter(node_id=self.node_id).update, **{
+            capability: value,
+            'updated_at': self.updated_at,
+        })
@@ -0,0 +1,132 @@
+import threading
+import time
+import urlparse
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+from social.app.models.node import Node
+
+
+class _Snapshot(object):
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.by_id = dict((node.id, node) for node in nodes)
+        self.by_host = dict((node.host, node) for node in nodes)
+        self.by_service_url = dict((node.service_url, node) for node in nodes)
+        self.by_incoming_username = dict((node.incoming_username, node) for node in nodes)
+        self.local = [node for node in nodes if node.local]
+        self.remote = [node for node in nodes if not node.local]
+        self.loaded_at = time.time()
+
+
+class NodeRegistry(object):
+    """
+    Every Node, loaded once per process so looking one up is a dict read instead of a query.
+
+    The registry is reloaded on the next lookup after any Node is saved or deleted in this process. Changes made by
+    other processes are picked up within FEDERATION_NODE_REGISTRY_TIMEOUT seconds.
+
+    The same Node instances are handed out to every caller, so treat them as read-only; fetch a fresh copy from the
+    database before changing one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def _get_snapshot(self):
+        snapshot = self._snapshot
+
+        if snapshot is None or time.time() - snapshot.loaded_at > settings.FEDERATION_NODE_REGISTRY_TIMEOUT:
+            with self._lock:
+                if self._snapshot is snapshot:
+                    self._snapshot = _Snapshot(list(Node.objects.select_related('capabilities')))
+                snapshot = self._snapshot
+
+        return snapshot
+
+    def invalidate(self):
+        # Waits out any reload that's in progress, so it can't put back what it read before the change
+        with self._lock:
+            self._snapshot = None
+
+    def _get(self, index, key):
+        try:
+            return getattr(self._get_snapshot(), index)[key]
+        except KeyError:
+            raise Node.DoesNotExist("No Node with %s %s." % (index[3:], key))
+
+    def get(self, node_id):
+        return self._get('by_id', node_id)
+
+    def get_by_host(self, host):
+        return self._get('by_host', host)
+
+    def get_by_service_url(self, service_url):
+        return self._get('by_service_url', service_url)
+
+    def get_by_incoming_username(self, incoming_username):
+        return self._get('by_incoming_username', incoming_username)
+
+    def get_local(self):
+        """
+        Returns the Node that represents this server, see ensure_local_node().
+        """
+        local = self._get_snapshot().local
+
+        if not local:
+            raise Node.DoesNotExist("No local Node.")
+        if len(local) > 1:
+            raise Node.MultipleObjectsReturned("More than one local Node found.")
+
+        return local[0]
+
+    def get_remote(self):
+        return list(self._get_snapshot().remote)
+
+
+# Shared by everything in this process
+node_registry = NodeRegistry()
+
+
+def ensure_local_node(base_url):
+    """
+    Makes sure the Node that represents this server exists and is reachable at base_url (e.g. http://127.0.0.1:8000/),
+    and returns it. Nothing is written unless something changed.
+    """
+    host = urlparse.urlparse(base_url).netloc
+    service_url = urlparse.urljoin(base_url.rstrip('/') + '/', "service/")
+
+    try:
+        node = node_registry.get_local()
+        if node.host == host and node.service_url == service_url:
+            return node
+    except Node.DoesNotExist:
+        pass
+
+    nodes = Node.objects.filter(local=True)
+
+    if len(nodes) == 0:
+        node = Node(name="Local", host=host, service_url=service_url, local=True)
+    elif len(nodes) == 1:
+        node = nodes[0]
+        node.host = host
+        node.service_url = service_url
+    else:
+        raise RuntimeError("More than one local node found in Nodes table. Please fix before continuing.")
+
+    node.save()
+    return node
+
+
+def invalidate_node_registry(sender, **kwargs):
+    node_registry.invalidate()
+
+    # Another thread could reload the registry before the change is committed, so do it again once it is
+    transaction.on_commit(node_registry.invalidate)
+
+
+post_save.connect(invalidate_node_registry, sender=Node, dispatch_uid='invalidate_node_registry_on_save')
+post_delete.connect(invalidate_node_registry, sender=Node, dispatch_uid='invalidate_node_registry_on_delete')
@@ -0,0 +1,112 @@
+import logging
+import re
+import uuid
+
+from django.core.exceptions import ValidationError
+
+from social.app.models.uri import get_post_id_from_uri
+from social.app.models.utils import lru_memoize, url_validator
+
+# Remote pages repeat the same handful of authors over and over, so this comfortably covers several large pages
+ID_CACHE_SIZE = 10000
+
+# URLValidator only accepts these schemes, so anything else can be turned away without running it
+URL_SCHEME_PATTERN = re.compile(r'^(?:https?|ftps?)://', re.IGNORECASE)
+
+
+@lru_memoize(ID_CACHE_SIZE)
+def is_url(value):
+    if not isinstance(value, basestring) or URL_SCHEME_PATTERN.match(value) is None:
+        return False
+
+    try:
+        url_validator(value)
+        return True
+    except ValidationError:
+        return False
+
+
+@lru_memoize(ID_CACHE_SIZE)
+def is_uuid(value):
+    try:
+        uuid.UUID(value)
+        return True
+    except (AttributeError, TypeError, ValueError):
+        return False
+
+
+def normalize_author(author_json):
+    """
+    Swaps a bare UUID in the author's id field for their URI, which is what the spec asks for. Returns True if the
+    field was changed.
+    """
+    author_id = author_json['id']
+
+    if not is_url(author_id) and is_uuid(author_id):
+        author_json['id'] = author_json['url']
+        return True
+
+    return False
+
+
+def verify_posts_endpoint_output(url, json):
+    """
+    Checks that json looks like a response from a /posts/ endpoint, and fixes up the common ways remote nodes stray
+    from the spec, in place. Returns the fixed up json, or an empty dict if it couldn't be made sense of.
+
+    Every post, author and comment is visited once, and the checks on their IDs are memoized, since the same IDs
+    come back on every page and every poll.
+    """
+    from social.app.models.post import Post
+
+    if not all(keys in json for keys in Post.required_header_fields):
+        # This exceptional case supports groups that give us a single post instead
+        if not all(keys in json for keys in Post.required_fields):
+            logging.warn(
+                "%s did not conform to the expected response format! Returning an empty list of posts!"
+                % url)
+            return {}
+
+        if type(json) is dict:
+            json = [json]
+
+        logging.warn(
+            'We received the post details without a header! ' +
+            'Added a header to correct the response to the specification.')
+
+        json = {
+            'query': 'posts',
+            'size': 50,
+            'count': 1,
+            'posts': json,
+        }
+
+    fixed_post_authors = 0
+    fixed_comment_authors = 0
+
+    for post in json['posts']:
+        # Exceptional case converts a given URL to its UUID as per the specification
+        if is_url(post['id']):
+            try:
+                post['id'] = get_post_id_from_uri(post['id'])
+            except AttributeError:
+                logging.error('We received a post with a URL in the ID field; ' +
+                              'however {} does not appear to contain a valid UUID.'.format(post['id']))
+
+        if normalize_author(post['author']):
+            fixed_post_authors += 1
+
+        for comment in post['comments']:
+            if normalize_author(comment['author']):
+                fixed_comment_authors += 1
+
+    # Warn once per response, rather than once for every post and comment on what could be a very large page
+    if fixed_post_authors:
+        logging.warn("%d post author IDs from %s were UUIDs and not URLs. Changed the fields to the given URLs."
+                     % (fixed_post_authors, url))
+
+    if fixed_comment_authors:
+        logging.warn("%d post comment author IDs from %s were UUIDs and not URLs. "
+                     "Changed the fields to the given URLs." % (fixed_comment_authors, url))
+
+    return json
@@ -0,0 +1,238 @@
+import json
+import logging
+import uuid
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from social.app.models.author import Author
+from social.app.models.node import Node
+
+
+class OutboundDelivery(models.Model):
+    """
+    A POST to a remote node that's delivered by a background task, retrying with exponential backoff, instead of
+    being made while the user waits on the response.
+
+    Whatever the action changes locally (e.g. saving the Comment) is only done once the remote node accepts it.
+    """
+    COMMENT = "comment"
+    FRIEND_REQUEST = "friendrequest"
+    FRIEND_REQUEST_ACCEPT = "friendrequestaccept"
+    INBOX = "inbox"
+
+    KIND_CHOICES = [
+        (COMMENT, "Comment"),
+        (FRIEND_REQUEST, "Friend Request"),
+        (FRIEND_REQUEST_ACCEPT, "Friend Request Acceptance"),
+        (INBOX, "Inbox Push"),
+    ]
+
+    PENDING = "pending"
+    SENDING = "sending"
+    DELIVERED = "delivered"
+    FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENDING, "Sending"),
+        (DELIVERED, "Delivered"),
+        (FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    node = models.ForeignKey(Node, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    url = models.URLField(max_length=1024)
+    # JSON body of the POST
+    payload = models.TextField()
+
+    # Identifies the action, so repeating it while it's still being delivered doesn't queue it twice.
+    # Also sent to the remote node in the Idempotency-Key header.
+    idempotency_key = models.CharField(max_length=255, unique=True)
+
+    # The local Author the action was taken by, and the ID of what it was taken on (a Post or an Author)
+    author = models.ForeignKey(Author, on_delete=models.CASCADE, related_name='outbound_deliveries')
+    target_id = models.UUIDField()
+
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(default='', blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ('created_at',)
+        verbose_name_plural = "outbound deliveries"
+
+    def __str__(self):
+        return '%s to %s (%s)' % (self.get_kind_display(), self.node.host, self.get_status_display())
+
+    def is_pending(self):
+        return self.status in (OutboundDelivery.PENDING, OutboundDelivery.SENDING)
+
+    @classmethod
+    def enqueue(cls, node, kind, url, payload, author, target_id, idempotency_key):
+        """
+        Saves a delivery and schedules it to be sent as soon as possible. If the same action is already waiting to be
+        delivered, that delivery is returned instead.
+        """
+        (delivery, created) = cls.objects.get_or_create(
+            idempotency_key=idempotency_key,
+            defaults={
+                'node': node,
+                'kind': kind,
+                'url': url,
+                'payload': json.dumps(payload),
+                'author': author,
+                'target_id': target_id,
+            })
+
+        if not created:
+            if delivery.is_pending():
+                return delivery
+
+            # The action was delivered (or given up on) before, and is now being taken again
+            delivery.node = node
+            delivery.url = url
+            delivery.payload = json.dumps(payload)
+            delivery.status = OutboundDelivery.PENDING
+            delivery.attempts = 0
+            delivery.next_attempt_at = timezone.now()
+            delivery.last_error = ''
+            delivery.delivered_at = None
+            delivery.save()
+
+        delivery.schedule()
+        return delivery
+
+    def schedule(self, delay=None):
+        from social.tasks import deliver_outbound
+
+        deliver_outbound(str(self.id), schedule=delay or 0)
+
+    def deliver(self):
+        """
+        Makes one attempt at sending this delivery, called by the deliver_outbound background task.
+        """
+        now = timezone.now()
+        sending_timeout = now - timedelta(seconds=settings.FEDERATION_OUTBOX_SENDING_TIMEOUT)
+
+        if self.status == OutboundDelivery.SENDING and self.last_attempt_at > sending_timeout:
+            # Someone else is on it
+            return
+
+        if self.status not in (OutboundDelivery.PENDING, OutboundDelivery.SENDING):
+            return
+
+        with transaction.atomic():
+            # Claims of deliveries to the same node wait on each other, so two workers can't both see room for one
+            # more delivery and go over the limit together
+            list(Node.objects.select_for_update().filter(id=self.node_id).values_list('id', flat=True))
+
+            in_flight = OutboundDelivery.objects \
+                .filter(node=self.node_id, status=OutboundDelivery.SENDING, last_attempt_at__gt=sending_timeout) \
+                .count()
+
+            if in_flight >= settings.FEDERATION_OUTBOX_MAX_IN_FLIGHT_PER_NODE:
+                claimed = None
+            else:
+                # Claim it, making sure no other worker got to it first
+                claimed = OutboundDelivery.objects \
+                    .filter(id=self.id, status=self.status, attempts=self.attempts) \
+                    .update(status=OutboundDelivery.SENDING, last_attempt_at=now, attempts=F('attempts') + 1)
+
+        if claimed is None:
+            # Don't pile onto a node that's already busy with our other deliveries
+            self.schedule(delay=settings.FEDERATION_OUTBOX_BUSY_RETRY_DELAY)
+            return
+
+        if not claimed:
+            return
+
+        self.status = OutboundDelivery.SENDING
+        self.last_attempt_at = now
+        self.attempts += 1
+
+        try:
+            response = self.node._post(
+                self.url,
+                json.loads(self.payload),
+                headers={'Idempotency-Key': self.idempotency_key},
+                timeout=settings.FEDERATION_OUTBOX_REQUEST_TIMEOUT)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            self.on_attempt_failed(e)
+            return
+
+        self.on_delivered()
+
+    def on_attempt_failed(self, error):
+        self.last_error = str(error)
+
+        response = getattr(error, 'response', None)
+        permanent = response is not None and 400 <= response.status_code < 500 and response.status_code not in (
+            requests.codes.request_timeout, requests.codes.too_many_requests)
+
+        if permanent or self.attempts >= settings.FEDERATION_OUTBOX_MAX_ATTEMPTS:
+            logging.error("Giving up on delivering %s after %d attempts: %s" % (self, self.attempts, error))
+            self.status = OutboundDelivery.FAILED
+            self.save()
+            return
+
+        backoff = min(settings.FEDERATION_OUTBOX_BASE_RETRY_DELAY * (2 ** (self.attempts - 1)),
+                      settings.FEDERATION_OUTBOX_MAX_RETRY_DELAY)
+        logging.warn("Delivering %s failed (%s). Retrying in %d seconds." % (self, error, backoff))
+
+        self.status = OutboundDelivery.PENDING
+        self.next_attempt_at = timezone.now() + timedelta(seconds=backoff)
+        self.save()
+        self.schedule(delay=backoff)
+
+    def on_delivered(self):
+        # Marked delivered only along with the change on our end, so a failure to make it leaves the delivery to be
+        # sent again once it's timed out, instead of losing it
+        with transaction.atomic():
+            self.status = OutboundDelivery.DELIVERED
+            self.delivered_at = timezone.now()
+            self.last_error = ''
+            self.save()
+
+            # Now that the remote node has it, make the matching change on our end
+            if self.kind == OutboundDelivery.COMMENT:
+                from social.app.models.comment import Comment
+
+                comment_json = json.loads(self.payload)["comment"]
+                Comment.objects.update_or_create(
+                    id=comment_json["id"],
+                    defaults={
+                        'post_id': self.target_id,
+                        'author': self.author,
+                        'comment': comment_json["comment"],
+                        'published': comment_json["published"],
+                    })
+            elif self.kind == OutboundDelivery.FRIEND_REQUEST:
+                target = Author.objects.get(id=self.target_id)
+                if not self.author.has_outgoing_friend_request_for(target) and not self.author.friends_with(target):
+                    self.author.add_friend_request(target)
+            elif self.kind == OutboundDelivery.FRIEND_REQUEST_ACCEPT:
+                target = Author.objects.get(id=self.target_id)
+                if self.author.has_incoming_friend_request_from(target):
+                    self.author.accept_friend_request(target)
+
+
+def get_pending_deliveries(author, kind):
+    """
+    Returns the IDs of what author has taken an action of the given kind on that hasn't been delivered yet.
+    """
+    return set(OutboundDelivery.objects
+               .filter(author=author, kind=kind, status__in=[OutboundDelivery.PENDING, OutboundDelivery.SENDING])
+               .values_list('target_id', flat=True))
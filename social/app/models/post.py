@@ -1,21 +1,20 @@
 import logging
-import re
 import urlparse
 import uuid
 
 import CommonMark
 import datetime
-import requests
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Q
 from django.utils.timezone import now
 from django.urls import reverse
-from requests import HTTPError
 
 from social.app.models.author import Author
 from social.app.models.authorlink import AuthorLink
 from social.app.models.category import Category
-from social.app.models.node import Node
+from social.app.models.noderegistry import node_registry
+from social.app.models.remotefriendlist import RemoteFriendList
+from social.app.models.uri import get_post_id_from_uri, parse_author_id
 from social.app.models.utils import is_valid_url
 
 
@@ -192,6 +191,12 @@ class Post(models.Model):
         return len(self.visible_to_author.filter(uri=author_uri)) > 0
 
     def save_remote_comment(self, request, comment):
+        """
+        Queues up the Comment to be sent to the remote Post's node, returning the OutboundDelivery. The Comment is
+        only saved locally once the remote node has accepted it.
+        """
+        from social.app.models.outbox import OutboundDelivery
+
         remote_node = self.author.node
         if remote_node.local:
             raise Exception("save_remote_comment() only saves remote Comments.")
@@ -209,15 +214,16 @@ class Post(models.Model):
         }
 
         url = urlparse.urljoin(remote_node.service_url, "posts/%s/comments" % self.id)
-        response = requests.post(url, json=json, auth=remote_node.auth())
-        response.raise_for_status()
 
-        comment.save()
+        return OutboundDelivery.enqueue(
+            remote_node, OutboundDelivery.COMMENT, url, json,
+            author=comment.author,
+            target_id=self.id,
+            idempotency_key="comment:%s" % comment.id)
 
     @classmethod
     def get_id_from_uri(cls, uri):
-        match = re.match(r'^(.+)//(.+)/posts/(?P<pk>[0-9a-z\\-]+)', uri)
-        return match.group('pk')
+        return get_post_id_from_uri(uri)
 
     required_header_fields = {'query', 'count', 'size', 'posts'}
     required_fields = {'title', 'source', 'origin', 'description', 'contentType', 'content', 'author',
@@ -246,32 +252,15 @@ def get_all_friend_posts(user):
 
 
 def get_all_foaf_posts(author):
-    friends_list = set(f.id for f in author.friends.all())
+    friends = list(author.friends.all())
+    friends_list = set(f.id for f in friends)
     foafs = set()
 
-    for friend in friends_list:
-        friend_obj = Author.objects.get(pk=friend)
-        # check if anyone we follow is in 2's friends. if so then return their id
-
-        # Remote author
-        if not friend_obj.node.local:
-            # make call to that remote author's friend api
-            try:
-                friends_json = friend_obj.node.get_author_friends(friend_obj.id)
-
-                authors_json = friends_json["authors"]
-                for author_id in authors_json:
-                    if author_id.startswith('http'):
-                        author_id = Author.get_id_from_uri(author_id)
-                    remote_author = Author.objects.filter(Q(followed_authors__id=author_id))
-                    if remote_author is not None:
-                        foafs.add(author_id)
-            except HTTPError as e:
-                logging.error(e)
-                logging.warn(
-                    'Skipping the retrieval of friends for ' + str(friend_obj.id) + ' in node ' + friend_obj.node.host)
+    # Read from our mirrors of the remote friends' friends, which get refreshed in the background
+    foafs.update(RemoteFriendList.get_friend_ids(friend for friend in friends if not friend.get_node().local))
 
-        # Either way, check local author's friends
+    for friend_obj in friends:
+        # Friendships we know of here count too, for remote friends as well as local ones
         new_foafs = set(ff.id for ff in friend_obj.friends.all())
         foafs.update(new_foafs)
     foafs.update(friends_list)
@@ -302,51 +291,21 @@ def get_all_local_private_posts():
 
 # This gets all remote posts from:
 # /service/posts
-def get_remote_node_posts():
-    node_posts = list()
-    for node in Node.objects.filter(local=False):
+def get_remote_node_posts(max_pages=None, max_age=None):
+    """
+    Saves the public posts of every remote node to the DB.
+
+    Each node's posts are streamed in and saved one page at a time, so memory use is bounded by a single page
+    rather than the node's whole history. See Node.iter_public_posts() for max_pages and max_age.
+    """
+    for node in node_registry.get_remote():
         try:
-            json_payloads_list = node.get_all_public_posts()
-            for json_payload in json_payloads_list:
-                if len(json_payload) == 0:
-                    continue
-
-                for post_json in json_payload['posts']:
-                    author_json = post_json['author']
-
-                    # 'id' should be a URI per the spec, but we're being generous and also accepting a straight UUID
-                    if author_json['id'].startswith('http'):
-                        remote_author_id = Author.get_id_from_uri(author_json['id'])
-                    else:
-                        remote_author_id = uuid.UUID(author_json['id'])
-
-                    # Add remote author to DB
-                    author, created = Author.objects.update_or_create(
-                        id=remote_author_id,
-                        defaults={
-                            'node': node,
-                            'displayName': author_json['displayName'],
-                        }
-                    )
-                    if post_json['id'].startswith('http'):
-                        post_id = uuid.UUID(Post.get_id_from_uri(post_json['id']))
-                    else:
-                        post_id = uuid.UUID(post_json['id'])
-
-                    # Add remote post to DB
-                    post, created = Post.objects.update_or_create(
-                        id=post_id,
-                        defaults={
-                            'title': post_json['title'],
-                            'description': post_json['description'],
-                            'author': author,
-                            'published': post_json['published'],
-                            'content': post_json['content'],
-                            'content_type': post_json['contentType'],
-                            'visibility': post_json['visibility'],
-                        }
-                    )
-                    node_posts.append(post)
+            for posts_json in node.iter_public_posts(max_pages=max_pages, max_age=max_age):
+                fetch_unknown_remote_authors(node, posts_json)
+
+                with transaction.atomic():
+                    for post_json in posts_json:
+                        save_remote_post(node, post_json)
 
         except Exception, e:
             logging.error(e)
@@ -354,12 +313,83 @@ def get_remote_node_posts():
             continue
 
 
+def fetch_unknown_remote_authors(node, posts_json):
+    """
+    Fetches the full profiles of the authors of a page of a remote node's posts that we haven't seen before, in one
+    batch if there are several of them. The posts only come with the author's name.
+
+    Nodes without author/batch are left alone, as asking for each profile separately would cost a request per
+    author; save_remote_post() makes do with what the posts say about their authors.
+    """
+    if node.get_capabilities().supports_author_batch is False:
+        return
+
+    author_ids = set()
+    for post_json in posts_json:
+        try:
+            author_ids.add(parse_author_id(post_json['author']['id']))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            continue
+
+    unknown_ids = author_ids - set(Author.objects.filter(id__in=author_ids).values_list('id', flat=True))
+
+    if len(unknown_ids) < 2:
+        # One new author doesn't need a batch, and save_remote_post() will add them either way
+        return
+
+    try:
+        node.create_or_update_remote_authors(unknown_ids, one_by_one=False)
+    except Exception as e:
+        logging.warn("Could not fetch the authors of the posts from %s: %s" % (node.host, e))
+
+
+def save_remote_post(node, post_json):
+    """
+    Creates or updates the remote post described by post_json, along with its author, and returns it.
+    """
+    author_json = post_json['author']
+
+    # 'id' should be a URI per the spec, but we're being generous and also accepting a straight UUID
+    if author_json['id'].startswith('http'):
+        remote_author_id = Author.get_id_from_uri(author_json['id'])
+    else:
+        remote_author_id = uuid.UUID(author_json['id'])
+
+    # Add remote author to DB
+    author, created = Author.objects.update_or_create(
+        id=remote_author_id,
+        defaults={
+            'node': node,
+            'displayName': author_json['displayName'],
+        }
+    )
+    if post_json['id'].startswith('http'):
+        post_id = uuid.UUID(Post.get_id_from_uri(post_json['id']))
+    else:
+        post_id = uuid.UUID(post_json['id'])
+
+    # Add remote post to DB
+    post, created = Post.objects.update_or_create(
+        id=post_id,
+        defaults={
+            'title': post_json['title'],
+            'description': post_json['description'],
+            'author': author,
+            'published': post_json['published'],
+            'content': post_json['content'],
+            'content_type': post_json['contentType'],
+            'visibility': post_json['visibility'],
+        }
+    )
+    return post
+
+
 # TODO: get posts from service/author/posts/
 # This gets all remote posts from:
 # /service/author/posts/
 def get_all_remote_node_posts():
     node_posts = list()
-    for node in Node.objects.filter(local=False):
+    for node in node_registry.get_remote():
         try:
             some_json = node.get_author_posts()
             for post_json in some_json['posts']:
@@ -411,7 +441,7 @@ def get_all_remote_node_posts():
 # /service/author/posts/
 def get_all_remote_node_posts():
     node_posts = list()
-    for node in Node.objects.filter(local=False):
+    for node in node_registry.get_remote():
         try:
             some_json = node.get_author_posts()
             for post_json in some_json['posts']:
@@ -0,0 +1,156 @@
+import json
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Min, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from social.app.models.author import Author
+
+
+class RemoteFriendList(models.Model):
+    """
+    Local mirror of a remote Author's friends, as reported by their node's author/{id}/friends endpoint.
+
+    FOAF checks only ever read this mirror; stale or missing entries are refreshed by a background task, so loading a
+    feed never waits on a remote node.
+    """
+    author = models.OneToOneField(
+        Author,
+        primary_key=True,
+        related_name='remote_friend_list',
+        on_delete=models.CASCADE
+    )
+
+    # JSON list of the friends' UUIDs
+    friend_ids_json = models.TextField(default='[]')
+
+    # When the mirror was last successfully refreshed, or null if it never has been
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+    # When the mirror was first found to be missing or stale since its last refresh
+    stale_since = models.DateTimeField(null=True, blank=True)
+
+    last_error = models.TextField(default='', blank=True)
+
+    def __str__(self):
+        return 'Friends of %s' % self.author
+
+    def friend_ids(self):
+        return set(uuid.UUID(friend_id) for friend_id in json.loads(self.friend_ids_json))
+
+    def is_fresh(self):
+        return self.refreshed_at is not None and timezone.now() - self.refreshed_at < get_friend_list_ttl()
+
+    is_fresh.boolean = True
+
+    def refresh_lag(self):
+        """
+        How long this mirror has been waiting for a refresh, or None if it's fresh.
+        """
+        if self.is_fresh():
+            return None
+
+        return timezone.now() - (self.stale_since or self.refreshed_at or timezone.now())
+
+    def refresh(self):
+        """
+        Fetches the Author's friends from their node and saves them to the mirror.
+        """
+        lag = self.refresh_lag()
+
+        try:
+            friends_json = self.author.node.get_author_friends(self.author_id)
+        except Exception as e:
+            self.last_error = str(e)
+            self.save()
+            raise
+
+        friend_ids = []
+        for friend_id in friends_json.get("authors", []):
+            try:
+                # Should be a URI per the spec, but we're being generous and also accepting a straight UUID
+                friend_ids.append(str(Author.get_id_from_uri(friend_id) if friend_id.startswith('http')
+                                      else uuid.UUID(friend_id)))
+            except (AttributeError, ValueError):
+                logging.warn("Could not parse the Author ID out of %s. Skipping it." % friend_id)
+
+        self.friend_ids_json = json.dumps(friend_ids)
+        self.refreshed_at = timezone.now()
+        self.stale_since = None
+        self.last_error = ''
+        self.save()
+
+        logging.info("Refreshed the friends of remote Author %s after a refresh lag of %s." % (self.author_id, lag))
+
+    @classmethod
+    def get_friend_ids(cls, authors):
+        """
+        Returns the mirrored friend IDs of the given remote Authors, all together, which leaves out the ones that have
+        never been fetched.
+
+        Missing and stale mirrors get a background refresh, but only when they're first found that way, or once a TTL
+        has gone by without the refresh getting through. Otherwise reading the mirrors, which is done on every feed
+        load, writes nothing.
+        """
+        from background_task.tasks import TaskSchedule
+        from social.tasks import refresh_remote_friend_list
+
+        authors = list(authors)
+        if not authors:
+            return set()
+
+        friend_lists = cls.objects.filter(author__in=authors)
+        known_ids = set(friend_list.author_id for friend_list in friend_lists)
+
+        now = timezone.now()
+        retry_before = now - get_friend_list_ttl()
+        newly_stale_ids = [friend_list.author_id for friend_list in friend_lists
+                           if not friend_list.is_fresh() and friend_list.stale_since is None]
+        overdue_ids = [friend_list.author_id for friend_list in friend_lists
+                       if not friend_list.is_fresh() and friend_list.stale_since is not None
+                       and friend_list.stale_since < retry_before]
+        missing_ids = [author.id for author in authors if author.id not in known_ids]
+
+        if newly_stale_ids:
+            cls.objects.filter(author__in=newly_stale_ids, stale_since__isnull=True).update(stale_since=now)
+
+        if missing_ids:
+            try:
+                with transaction.atomic():
+                    cls.objects.bulk_create([cls(author_id=author_id, stale_since=now) for author_id in missing_ids])
+            except IntegrityError:
+                # Another feed load got to them first, and scheduled their refreshes
+                missing_ids = []
+
+        for author_id in newly_stale_ids + overdue_ids + missing_ids:
+            # Loading several feeds at once shouldn't queue up several refreshes of the same list
+            refresh_remote_friend_list(str(author_id), schedule={'action': TaskSchedule.CHECK_EXISTING})
+
+        friend_ids = set()
+        for friend_list in friend_lists:
+            friend_ids.update(friend_list.friend_ids())
+        return friend_ids
+
+
+def get_friend_list_ttl():
+    return timedelta(seconds=settings.FEDERATION_FRIEND_LIST_TTL)
+
+
+def get_refresh_lag_stats():
+    """
+    Returns a dict summarizing how far behind the mirrored friend lists are, for monitoring.
+    """
+    fresh_since = timezone.now() - get_friend_list_ttl()
+    stale = Q(refreshed_at__isnull=True) | Q(refreshed_at__lt=fresh_since)
+
+    stats = RemoteFriendList.objects.aggregate(count=Count('author'))
+    stats.update(RemoteFriendList.objects.filter(stale).aggregate(
+        stale=Count('author'), stale_since=Min(Coalesce('stale_since', 'refreshed_at'))))
+
+    stale_since = stats.pop('stale_since')
+    stats["max_refresh_lag"] = (timezone.now() - stale_since).total_seconds() if stale_since else 0
+    return stats
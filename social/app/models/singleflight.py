@@ -0,0 +1,125 @@
+import hashlib
+import sys
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import six
+
+
+class _Call(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exc_info = None
+
+
+class SingleFlight(object):
+    """
+    Collapses concurrent calls that share a key into one call of the wrapped function.
+
+    The first caller for a key (the leader) runs the function; every caller that arrives while it's still running
+    waits for it and gets the same result (or exception). Idea from Go's golang.org/x/sync/singleflight.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Returns a (result, shared) tuple, where shared is True if the result was produced by another caller's call.
+        Results are shared by reference, so callers that mutate them must copy them first.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+
+            if call.exc_info is not None:
+                six.reraise(*call.exc_info)
+
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception:
+            call.exc_info = sys.exc_info()
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        if call.exc_info is not None:
+            six.reraise(*call.exc_info)
+
+        return call.result, False
+
+
+# Shared by every Node in this process
+outbound_requests = SingleFlight()
+
+
+def shared_do(key, fn, *args, **kwargs):
+    """
+    Like SingleFlight.do(), but also collapses identical calls made by other processes, using the Django cache as a
+    lock and as a place to hand the leader's result over to everyone else.
+
+    Only results that can be pickled into the cache (e.g. parsed JSON) may be used with this function. If
+    FEDERATION_SINGLE_FLIGHT_SHARED_TIMEOUT is 0 (the default), this behaves exactly like SingleFlight.do().
+    """
+    timeout = getattr(settings, 'FEDERATION_SINGLE_FLIGHT_SHARED_TIMEOUT', 0)
+
+    if not timeout:
+        return outbound_requests.do(key, fn, *args, **kwargs)
+
+    return outbound_requests.do(key, _shared_call, key, timeout, fn, *args, **kwargs)
+
+
+def _shared_call(key, timeout, fn, *args, **kwargs):
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    lock_key = 'singleflight:lock:' + digest
+
+    # The lock holds the ID of the flight in progress, whose result is published under a key of its own, so callers
+    # that come along after it only ever get the result of a flight they waited on
+    flight = uuid.uuid4().hex
+    if cache.add(lock_key, flight, timeout):
+        try:
+            result = fn(*args, **kwargs)
+            # Only needs to live long enough for the processes currently waiting on us to pick it up
+            cache.set(_get_result_key(digest, flight), result, timeout)
+            return result
+        finally:
+            cache.delete(lock_key)
+
+    flight = cache.get(lock_key)
+    if flight is None:
+        # It landed in the meantime, too early for us to have waited on it
+        return fn(*args, **kwargs)
+
+    # Someone else is fetching this right now, so wait for them to publish their result
+    result_key = _get_result_key(digest, flight)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        time.sleep(0.05)
+        result = cache.get(result_key)
+        if result is not None:
+            return result
+
+        if cache.get(lock_key) != flight:
+            # The other process gave up without a result (e.g. its request failed), so try it ourselves
+            break
+
+    return fn(*args, **kwargs)
+
+
+def _get_result_key(digest, flight):
+    return 'singleflight:result:%s:%s' % (digest, flight)
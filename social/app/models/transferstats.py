@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import models
+from django.db.models import F
+
+from social.app.models.node import Node
+from social.app.models.utils import defer_to_caller
+
+
+class NodeTransferStats(models.Model):
+    """
+    How many bytes a remote node has sent us, before and after decompression.
+    """
+    node = models.OneToOneField(
+        Node,
+        primary_key=True,
+        related_name='transfer_stats',
+        on_delete=models.CASCADE
+    )
+
+    responses = models.BigIntegerField(default=0)
+    compressed_responses = models.BigIntegerField(default=0)
+
+    # Bytes as they came over the network, and once decompressed
+    wire_bytes = models.BigIntegerField(default=0)
+    content_bytes = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "node transfer stats"
+
+    def __str__(self):
+        return 'Transfer stats of %s' % self.node.host
+
+    def compression_ratio(self):
+        return float(self.content_bytes) / self.wire_bytes if self.wire_bytes else 1.0
+
+    def bytes_saved(self):
+        return self.content_bytes - self.wire_bytes
+
+
+def get_wire_length(response):
+    """
+    Returns how many bytes of the requests response came over the network, which is less than its content if it was
+    compressed.
+    """
+    try:
+        # How far urllib3 read into the undecoded body
+        length = response.raw.tell()
+        if length:
+            return length
+    except (AttributeError, IOError, ValueError):
+        pass
+
+    content_length = response.headers.get('Content-Length', '')
+    if content_length.isdigit():
+        return int(content_length)
+
+    return len(response.content)
+
+
+class _PendingStats(object):
+    """
+    Adds up the stats of responses in memory, writing them to the database at most every
+    FEDERATION_TRANSFER_STATS_FLUSH_INTERVAL seconds, so recording one doesn't cost a query.
+
+    Responses are recorded from bounded_map() worker threads too, so the writes go through defer_to_caller().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = time.time()
+
+    def record(self, node, response):
+        wire_length = get_wire_length(response)
+        content_length = len(response.content)
+        compressed = response.headers.get('Content-Encoding', '') in ('gzip', 'deflate')
+
+        with self._lock:
+            totals = self._pending.setdefault(node.id, [0, 0, 0, 0])
+            totals[0] += 1
+            totals[1] += 1 if compressed else 0
+            totals[2] += wire_length
+            totals[3] += content_length
+
+            flush = time.time() - self._last_flush >= settings.FEDERATION_TRANSFER_STATS_FLUSH_INTERVAL
+            if flush:
+                # So the other threads recording meanwhile don't flush as well
+                self._last_flush = time.time()
+
+        if flush:
+            defer_to_caller(self.flush)
+
+    def flush(self):
+        with self._lock:
+            (pending, self._pending) = (self._pending, {})
+            self._last_flush = time.time()
+
+        for (node_id, (responses, compressed_responses, wire_bytes, content_bytes)) in pending.items():
+            try:
+                NodeTransferStats.objects.get_or_create(node_id=node_id)
+                NodeTransferStats.objects.filter(node_id=node_id).update(
+                    responses=F('responses') + responses,
+                    compressed_responses=F('compressed_responses') + compressed_responses,
+                    wire_bytes=F('wire_bytes') + wire_bytes,
+                    content_bytes=F('content_bytes') + content_bytes)
+            except Exception as e:
+                # They're only stats, so don't let them break the request that's being made
+                logging.warn("Could not save the transfer stats of Node %s: %s" % (node_id, e))
+
+
+pending_transfer_stats = _PendingStats()
+
+
+def record_response(node, response):
+    pending_transfer_stats.record(node, response)
+
+
+def flush_transfer_stats():
+    pending_transfer_stats.flush()
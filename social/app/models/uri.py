@@ -0,0 +1,85 @@
+import logging
+import re
+import uuid
+
+from social.app.models.utils import lru_memoize
+
+# Parsed URIs are tiny, and the same authors and posts turn up on every page, poll and friend search
+URI_CACHE_SIZE = 10000
+
+AUTHOR_URI_PATTERN = re.compile(r'^(?P<host>(https?://(.+)/))author/(?P<pk>[0-9a-fA-F-]+)/?')
+POST_URI_PATTERN = re.compile(r'^(.+)//(.+)/posts/(?P<pk>[0-9a-z\\-]+)')
+HOST_PATTERN = re.compile(r'(?:http.*://)?(?P<host>[^:/ ]+).?(?P<port>[0-9]*).*')
+
+
+@lru_memoize(URI_CACHE_SIZE)
+def parse_author_uri(uri):
+    """
+    Returns a (host, UUID) tuple for an Author URI like http://127.0.0.1:8000/service/author/{id}. Raises an
+    AttributeError if uri isn't an Author URI.
+    """
+    match = AUTHOR_URI_PATTERN.match(uri)
+    return match.group('host'), uuid.UUID(match.group('pk'))
+
+
+def get_author_id_from_uri(uri):
+    return parse_author_uri(uri)[1]
+
+
+def parse_author_id(value):
+    """
+    Returns the UUID of an Author given either their URI, which is what the spec asks for, or just the UUID itself.
+    """
+    if value.startswith('http'):
+        return get_author_id_from_uri(value)
+
+    return uuid.UUID(value)
+
+
+def parse_author_uris(uris):
+    """
+    Returns a dict of each of uris that's an Author URI to the UUID in it. The others are logged and left out.
+    """
+    author_ids = dict()
+
+    for uri in uris:
+        try:
+            author_ids[uri] = get_author_id_from_uri(uri)
+        except (AttributeError, TypeError, ValueError):
+            logging.warn("Could not parse the Author ID out of %s. Skipping it." % uri)
+
+    return author_ids
+
+
+@lru_memoize(URI_CACHE_SIZE)
+def get_post_id_from_uri(uri):
+    """
+    Returns the ID in a Post URI like http://127.0.0.1:8000/service/posts/{id}, as a string. Raises an
+    AttributeError if uri isn't a Post URI.
+    """
+    return POST_URI_PATTERN.match(uri).group('pk')
+
+
+@lru_memoize(URI_CACHE_SIZE)
+def get_host_from_uri(uri):
+    return HOST_PATTERN.search(uri).group('host')
+
+
+@lru_memoize(URI_CACHE_SIZE)
+def _get_author_uri(host_and_id):
+    (host_url, author_id) = host_and_id
+
+    if host_url[:-1] != '/':
+        host_url += '/'
+
+    if type(author_id) is not uuid.UUID:
+        author_id = uuid.UUID(author_id)
+
+    if host_url.startswith("http") is False:
+        host_url = "http://" + host_url
+
+    return host_url + 'author/' + str(author_id)
+
+
+def get_author_uri(host_url, author_id):
+    return _get_author_uri((host_url, author_id))
@@ -1,4 +1,8 @@
+import functools
+import threading
 import uuid
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
@@ -13,10 +17,133 @@ def is_valid_uuid(uuid_test):
     return True
 
 
+# Validators compile their regexes on first use, so share one instead of building a new one for every URL
+url_validator = URLValidator()
+
+
 def is_valid_url(url):
-    val = URLValidator()
     try:
-        val(url)
+        url_validator(url)
         return True
     except ValidationError as e:
         return False
+
+
+def bounded_map(fn, items, max_workers):
+    """
+    Calls fn on each of items, running at most max_workers calls at once, and returns the results in the same order
+    as items. Any exception raised by fn is re-raised here.
+
+    Meant for I/O-bound work like requests to remote nodes; the GIL makes it useless for anything CPU-bound. Calls
+    made through defer_to_caller() from the worker threads are run here once they're all done, so the threads never
+    open database connections of their own.
+    """
+    items = list(items)
+
+    if len(items) <= 1 or max_workers <= 1:
+        return [fn(item) for item in items]
+
+    deferred = []
+
+    def call(item):
+        _deferred_calls.pending = deferred
+        try:
+            return fn(item)
+        finally:
+            _deferred_calls.pending = None
+
+    pool = ThreadPool(processes=min(max_workers, len(items)))
+    try:
+        return pool.map(call, items)
+    finally:
+        pool.close()
+        pool.join()
+
+        for (deferred_fn, args, kwargs) in deferred:
+            # Passed up again in case this is itself a bounded_map() worker thread
+            defer_to_caller(deferred_fn, *args, **kwargs)
+
+
+# The calls deferred by the bounded_map() worker thread this is, if it is one
+_deferred_calls = threading.local()
+
+
+def defer_to_caller(fn, *args, **kwargs):
+    """
+    Calls fn(*args, **kwargs), or, from a bounded_map() worker thread, leaves it to bounded_map() to call from the thread that
+    called it. Meant for database writes, which would otherwise leave an unclosed connection behind in each thread.
+    """
+    pending = getattr(_deferred_calls, 'pending', None)
+    if pending is None:
+        fn(*args, **kwargs)
+    else:
+        pending.append((fn, args, kwargs))
+
+
+class LRUCache(object):
+    """
+    A thread-safe dict that holds on to at most maxsize entries, dropping the least recently used ones first.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+
+            # Move it to the most recently used end
+            self._entries[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_missing = object()
+
+
+def lru_memoize(maxsize):
+    """
+    Decorator that caches the results of a function of one hashable argument in an LRUCache, available as the
+    function's cache attribute. Exceptions aren't cached.
+    """
+
+    def decorator(fn):
+        cache = LRUCache(maxsize)
+
+        @functools.wraps(fn)
+        def wrapper(arg):
+            result = cache.get(arg, _missing)
+            if result is _missing:
+                result = fn(arg)
+                cache.set(arg, result)
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
@@ -0,0 +1,248 @@
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+from datetime import timedelta
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+import background_task.tasks
+from background_task.models import Task
+from background_task.models_completed import CompletedTask
+from background_task.supervisor import Supervisor
+from background_task.tasks import DBTaskRunner, Heartbeat, Tasks
+from background_task.wakeup import SocketListener, notify
+
+
+class WakeupTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.settings_override = override_settings(BACKGROUND_TASK_WAKEUP_DIR=self.directory)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.directory)
+
+    def test_idle_workers_are_woken_up(self):
+        listener = SocketListener()
+        self.assertFalse(listener.wait(0.01))
+
+        notify()
+        start = time.time()
+        self.assertTrue(listener.wait(5))
+        self.assertLess(time.time() - start, 1)
+
+        listener.close()
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_workers_only_wake_up_for_their_queue(self):
+        listener = SocketListener(queue='federation')
+        listener.wait(0.01)
+
+        notify('github')
+        self.assertFalse(listener.wait(0.1))
+        notify('federation')
+        self.assertTrue(listener.wait(0.1))
+
+        listener.close()
+
+    def test_sockets_of_dead_workers_are_removed(self):
+        path = os.path.join(self.directory, '1-dead.sock')
+        dead = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        dead.bind(path)
+        dead.close()
+
+        notify()
+        self.assertFalse(os.path.exists(path))
+
+
+class ClaimTestCase(TestCase):
+    def setUp(self):
+        self.tasks = Tasks()
+        self.tasks.background(name='registered')(lambda: None)
+
+        for priority in range(3):
+            Task.objects.new_task('registered', priority=priority).save()
+        Task.objects.new_task('unregistered', priority=10).save()
+
+    def test_tasks_are_claimed_in_batches(self):
+        with self.assertNumQueries(2):
+            claimed = Task.objects.claim('1', ['registered'], limit=2)
+
+        self.assertEqual([task.priority for task in claimed], [2, 1])
+        self.assertEqual(Task.objects.filter(locked_by='1').count(), 2)
+
+        claimed = Task.objects.claim('2', ['registered'], limit=2)
+        self.assertEqual([task.priority for task in claimed], [0])
+
+    @override_settings(BACKGROUND_TASK_CLAIM_BATCH_SIZE=3)
+    def test_workers_run_the_tasks_they_claimed(self):
+        runner = DBTaskRunner()
+
+        first = runner.get_task_to_run(self.tasks)
+        self.assertEqual(first.priority, 2)
+        self.assertTrue(runner.has_claimed_tasks())
+
+        # Another worker took over the next one, after our lock on it expired
+        Task.objects.filter(priority=1).update(locked_by='other', locked_at=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(runner.get_task_to_run(self.tasks).priority, 0)
+        self.assertFalse(runner.has_claimed_tasks())
+
+    @override_settings(BACKGROUND_TASK_RUN_ASYNC=True, BACKGROUND_TASK_ASYNC_THREADS=1)
+    def test_nothing_is_claimed_while_every_thread_is_busy(self):
+        Task.objects.filter(priority=0).update(locked_by='other', locked_at=timezone.now())
+
+        # Only the busy threads are counted
+        with self.assertNumQueries(1):
+            self.assertEqual(Task.objects.claim('1', ['registered']), [])
+
+    def test_workers_have_unique_names(self):
+        runner = DBTaskRunner()
+        name = runner.worker_name
+
+        runner.after_fork()
+        self.assertNotEqual(runner.worker_name, name)
+        self.assertNotEqual(DBTaskRunner().worker_name, runner.worker_name)
+        self.assertLessEqual(len(runner.worker_name), Task._meta.get_field('locked_by').max_length)
+
+        Task.objects.claim(runner.worker_name, ['registered'])
+        self.assertTrue(Task.objects.get(locked_by=runner.worker_name).locked_by_pid_running())
+
+    def test_unrun_tasks_are_released(self):
+        runner = DBTaskRunner()
+        runner.get_task_to_run(self.tasks)
+
+        runner.release_claimed_tasks()
+        self.assertEqual(Task.objects.filter(locked_by=runner.worker_name).count(), 1)
+
+
+@override_settings(MAX_RUN_TIME=60)
+class HeartbeatTestCase(TestCase):
+    def setUp(self):
+        self.task = Task.objects.new_task('registered')
+        self.task.locked_by = '1'
+        self.task.locked_at = timezone.now() - timedelta(seconds=50)
+        self.task.save()
+
+    def test_heartbeats_keep_running_tasks_locked(self):
+        self.assertTrue(Heartbeat(self.task).beat())
+
+        self.assertEqual(Task.objects.release_expired_locks(timezone.now() + timedelta(seconds=30)), 0)
+        self.assertEqual(Task.objects.get(pk=self.task.pk).locked_by, '1')
+
+    def test_tasks_of_dead_workers_are_released(self):
+        self.assertEqual(Task.objects.release_expired_locks(timezone.now() + timedelta(seconds=30)), 1)
+        self.assertEqual(Task.objects.unlocked(timezone.now()).count(), 1)
+
+        # The worker finds out it has lost its lock once its heartbeat comes back
+        logging.disable(logging.CRITICAL)
+        try:
+            self.assertFalse(Heartbeat(self.task).beat())
+        finally:
+            logging.disable(logging.NOTSET)
+
+    def test_tasks_taken_over_while_waiting_are_not_run(self):
+        runs = []
+        tasks = Tasks()
+        tasks.background(name='registered')(lambda: runs.append(1))
+
+        # It waited for a thread for so long that another worker claimed it
+        Task.objects.filter(pk=self.task.pk).update(locked_by='other')
+        logging.disable(logging.CRITICAL)
+        try:
+            tasks.run_task(self.task)
+        finally:
+            logging.disable(logging.NOTSET)
+
+        self.assertEqual(runs, [])
+        self.assertEqual(Task.objects.get(pk=self.task.pk).locked_by, 'other')
+
+    def test_tasks_taken_over_while_running_are_left_to_the_new_worker(self):
+        class LastHeartbeat(Heartbeat):
+            # Beats once more as the task finishes, instead of waiting for the interval
+            def __exit__(self, *exc_info):
+                self.beat()
+                return super(LastHeartbeat, self).__exit__(*exc_info)
+
+        tasks = Tasks()
+        tasks.background(name='registered')(
+            lambda: Task.objects.filter(pk=self.task.pk).update(locked_by='other'))
+
+        background_task.tasks.Heartbeat = LastHeartbeat
+        logging.disable(logging.CRITICAL)
+        try:
+            tasks.run_task(self.task)
+        finally:
+            logging.disable(logging.NOTSET)
+            background_task.tasks.Heartbeat = Heartbeat
+
+        task = Task.objects.get(pk=self.task.pk)
+        self.assertEqual((task.locked_by, task.attempts), ('other', 0))
+        self.assertFalse(CompletedTask.objects.exists())
+
+
+class WritingTaskTestCase(TransactionTestCase):
+    def test_tasks_do_not_run_in_a_transaction(self):
+        # The heartbeat renews the task's lock from its own connection, which mustn't have to wait on the task's writes
+        in_transaction = []
+
+        def write():
+            Task.objects.new_task('written').save()
+            in_transaction.append(connection.in_atomic_block)
+
+        tasks = Tasks()
+        tasks.background(name='writing')(write)
+        Task.objects.new_task('writing').save()
+
+        self.assertTrue(tasks.run_next_task())
+
+        self.assertEqual(in_transaction, [False])
+        self.assertEqual(list(Task.objects.values_list('task_name', flat=True)), ['written'])
+
+
+class SupervisorTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.log = os.path.join(self.directory, 'log')
+        # The crashes are on purpose
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(self.directory)
+
+    def write(self, line):
+        with open(self.log, 'a') as f:
+            f.write(line + '\n')
+
+    def run_worker(self, queue, duration, sleep):
+        self.write('started %s' % queue)
+        if os.path.exists(os.path.join(self.directory, queue)):
+            stopping = []
+            signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+            while not stopping:
+                time.sleep(0.01)
+            self.write('stopped %s' % queue)
+        else:
+            # Crash the first time around
+            open(os.path.join(self.directory, queue), 'w').close()
+            raise ValueError()
+
+    def test_crashed_workers_are_restarted_and_all_are_stopped(self):
+        supervisor = Supervisor(self.run_worker, ['federation', 'github'], duration=1, sleep=0.1)
+        supervisor.restart_delay = 0
+
+        supervisor.run()
+
+        with open(self.log) as f:
+            lines = sorted(f.read().splitlines())
+        self.assertEqual(lines, ['started federation', 'started federation', 'started github', 'started github',
+                                 'stopped federation', 'stopped github'])
+        self.assertEqual(supervisor.workers, {})
@@ -0,0 +1,125 @@
+import base64
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import requests
+from django.test import SimpleTestCase
+
+from social.app.models.httpcache import HTTPCache, get_cache_key
+
+
+def make_response(status_code, body=None, **headers):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(dict((name.replace('_', '-'), value) for (name, value) in headers.items()))
+    response._content = json.dumps(body) if body is not None else ''
+    return response
+
+
+class HTTPCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = HTTPCache(self.directory, 1024 * 1024)
+        self.auth = ("user", "pass")
+        self.sent_headers = []
+        self.responses = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def send(self, url, headers):
+        self.sent_headers.append(headers)
+        return self.responses.pop(0)
+
+    def get(self, url="http://www.remote.com/service/posts"):
+        return self.cache.get(url, self.auth, {'Accept': 'application/json'}, self.send)
+
+    def test_unchanged_responses_are_revalidated(self):
+        self.responses = [make_response(200, {"posts": [1, 2]}, ETag='"abc"'),
+                          make_response(304)]
+
+        self.assertEqual(self.get().json(), {"posts": [1, 2]})
+        self.assertNotIn('If-None-Match', self.sent_headers[0])
+
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"posts": [1, 2]})
+        self.assertEqual(self.sent_headers[1]['If-None-Match'], '"abc"')
+
+    def test_fresh_responses_are_reused_without_asking(self):
+        self.responses = [make_response(200, {"posts": []}, Cache_Control='max-age=60')]
+
+        self.get()
+        self.assertEqual(self.get().json(), {"posts": []})
+        self.assertEqual(len(self.sent_headers), 1)
+
+    def test_uncacheable_responses_are_not_kept(self):
+        self.responses = [make_response(200, {}, ETag='"abc"', Cache_Control='no-store'),
+                          make_response(200, {}),
+                          make_response(200, {})]
+
+        for _ in range(3):
+            self.get()
+
+        self.assertTrue(all('If-None-Match' not in headers for headers in self.sent_headers))
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_entries_are_stored_as_json(self):
+        self.responses = [make_response(200, {"posts": []}, ETag='"abc"', Content_Encoding='gzip')]
+        self.get()
+
+        with open(os.path.join(self.directory, get_cache_key("http://www.remote.com/service/posts", self.auth))) as f:
+            entry = json.load(f)
+
+        self.assertEqual(json.loads(base64.b64decode(entry['body'])), {"posts": []})
+        # requests decoded the body already
+        self.assertNotIn('Content-Encoding', entry['headers'])
+
+    def test_directories_others_can_write_to_are_not_used(self):
+        os.chmod(self.directory, 0o777)
+        self.responses = [make_response(200, {}, Cache_Control='max-age=60'), make_response(200, {})]
+
+        logging.disable(logging.CRITICAL)
+        try:
+            self.get()
+            self.get()
+        finally:
+            logging.disable(logging.NOTSET)
+
+        self.assertEqual(len(self.sent_headers), 2)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_credentials_are_part_of_the_key(self):
+        self.responses = [make_response(200, {}, Cache_Control='max-age=60'), make_response(200, {})]
+
+        self.get()
+        self.auth = ("other", "pass")
+        self.get()
+
+        self.assertEqual(len(self.sent_headers), 2)
+
+    def age(self, url, seconds):
+        path = os.path.join(self.directory, get_cache_key(url, self.auth))
+        os.utime(path, (time.time() - seconds, time.time() - seconds))
+        return os.path.getsize(path)
+
+    def test_least_recently_used_responses_are_evicted(self):
+        urls = ["http://www.remote.com/service/posts/%d" % x for x in range(4)]
+        self.responses = [make_response(200, {"content": "x" * 400}, ETag='"abc"') for _ in urls]
+
+        for (x, url) in enumerate(urls[:3]):
+            self.get(url)
+            size = self.age(url, 30 - x * 10)
+
+        # Room for three and a half responses, with the second one the least recently used
+        self.cache.max_bytes = int(size * 3.5)
+        self.responses.insert(0, make_response(304))
+        self.get(urls[0])
+
+        self.get(urls[3])
+        self.assertEqual(len(os.listdir(self.directory)), 3)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, get_cache_key(urls[1], self.auth))))
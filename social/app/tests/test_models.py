@@ -1,8 +1,13 @@
+import shutil
+import tempfile
+
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
 
-from social.app.models.author import Author
-from social.app.models.node import Node
+from social.app.models.author import Author, is_activated
+from social.app.models.node import Node, get_remaining_page_urls
+from social.app.models.normalize import verify_posts_endpoint_output
 
 
 class NodeTestCase(TestCase):
@@ -40,3 +45,98 @@ class AuthorTestCase(TestCase):
         self.author.followed_authors.add(author)
 
         self.assertTrue(self.author.follows(author))
+
+    def test_profile_is_looked_up_once_per_user_instance(self):
+        user = User.objects.get(username="test1")
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.profile, self.author)
+            self.assertEqual(user.profile.node, self.node)
+
+        # A fresh User, like the one loaded for the next request, looks it up again
+        user = User.objects.get(username="test1")
+        with self.assertNumQueries(1):
+            user.profile
+
+    def test_activation_is_remembered_until_the_author_changes(self):
+        directory = tempfile.mkdtemp()
+        try:
+            shared_cache = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                                        'LOCATION': directory}}
+            with self.settings(CACHES=shared_cache):
+                self.author.activated = True
+                self.author.save()
+
+                self.assertTrue(is_activated(User.objects.get(username="test1")))
+
+                user = User.objects.get(username="test1")
+                with self.assertNumQueries(0):
+                    self.assertTrue(is_activated(user))
+
+                self.author.activated = False
+                self.author.save()
+                self.assertFalse(is_activated(User.objects.get(username="test1")))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_activation_is_not_remembered_in_a_per_process_cache(self):
+        cache.clear()
+        self.author.activated = True
+        self.author.save()
+        self.assertTrue(is_activated(User.objects.get(username="test1")))
+
+        # Another process takes the approval back
+        Author.objects.filter(id=self.author.id).update(activated=False)
+        self.assertFalse(is_activated(User.objects.get(username="test1")))
+
+
+class RemainingPageUrlsTestCase(TestCase):
+    def test_page_number_links_are_expanded(self):
+        json = {"count": 12, "size": 5}
+        urls = get_remaining_page_urls("http://api.socdis.com/posts/1/comments?page=2&size=5", json)
+
+        self.assertEqual(urls, [
+            "http://api.socdis.com/posts/1/comments?page=2&size=5",
+            "http://api.socdis.com/posts/1/comments?page=3&size=5",
+        ])
+
+    def test_nonstandard_links_are_not_expanded(self):
+        json = {"count": 12, "size": 5}
+
+        self.assertIsNone(get_remaining_page_urls("http://api.socdis.com/posts/1/comments?offset=5", json))
+        self.assertIsNone(get_remaining_page_urls("http://api.socdis.com/posts/1/comments?page=2", {"count": 12}))
+
+
+class VerifyPostsEndpointOutputTestCase(TestCase):
+    author_uri = "http://api.socdis.com/author/de305d54-75b4-431b-adb2-eb6b9e546013"
+
+    def post_json(self):
+        return {
+            "title": "Title", "source": "", "origin": "", "description": "", "contentType": "text/plain",
+            "content": "", "categories": [], "count": 1, "size": 5, "published": "2017-04-11T06:44:18.709000Z",
+            "visibility": "PUBLIC", "visibleTo": [], "unlisted": False,
+            "id": "http://api.socdis.com/posts/578e6948-130b-4976-bca1-7785f9ac8dd7",
+            "author": {"id": "de305d54-75b4-431b-adb2-eb6b9e546013", "url": self.author_uri},
+            "comments": [
+                {"author": {"id": "de305d54-75b4-431b-adb2-eb6b9e546013", "url": self.author_uri}},
+            ],
+        }
+
+    def test_ids_are_normalized(self):
+        json = verify_posts_endpoint_output("http://api.socdis.com/posts", {
+            "query": "posts", "count": 1, "size": 50, "posts": [self.post_json()],
+        })
+
+        post = json["posts"][0]
+        self.assertEqual(post["id"], "578e6948-130b-4976-bca1-7785f9ac8dd7")
+        self.assertEqual(post["author"]["id"], self.author_uri)
+        self.assertEqual(post["comments"][0]["author"]["id"], self.author_uri)
+
+    def test_a_post_without_a_header_is_wrapped(self):
+        json = verify_posts_endpoint_output("http://api.socdis.com/posts/1", self.post_json())
+
+        self.assertEqual(json["count"], 1)
+        self.assertEqual(json["posts"][0]["id"], "578e6948-130b-4976-bca1-7785f9ac8dd7")
+
+    def test_unrecognized_output_is_dropped(self):
+        self.assertEqual(verify_posts_endpoint_output("http://api.socdis.com/posts", {"posts": []}), {})
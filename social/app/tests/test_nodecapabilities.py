@@ -0,0 +1,198 @@
+import json
+import threading
+import uuid
+
+import requests
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+
+from social.app.models.author import Author
+from social.app.models.node import Node
+from social.app.models.nodecapabilities import NodeCapabilities
+from social.app.models.post import Post, fetch_unknown_remote_authors
+from social.app.models.transferstats import NodeTransferStats, flush_transfer_stats, record_response
+from social.app.models.utils import bounded_map
+from social.tasks import refresh_remote_posts
+
+
+def make_response(status_code, body=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body or {})
+    return response
+
+
+class NodeCapabilitiesTestCase(TestCase):
+    def setUp(self):
+        self.node = Node.objects.create(name="Remote", host="http://www.remote.com/",
+                                        service_url="http://www.remote.com/service/")
+        self.author_id = uuid.uuid4()
+        self.requested_urls = []
+
+        # Stand in for the remote node, which only serves Authors with a trailing slash
+        self.real_get = requests.get
+        requests.get = self.fake_get
+
+    def tearDown(self):
+        requests.get = self.real_get
+
+    def fake_get(self, url, **kwargs):
+        self.requested_urls.append(url)
+
+        if url.endswith('/'):
+            return make_response(200, {"id": url, "url": url, "displayName": "Remote Author"})
+
+        return make_response(404)
+
+    def test_trailing_slash_is_learned_and_used_first(self):
+        self.assertEqual(self.node.get_author(self.author_id)["displayName"], "Remote Author")
+        self.assertEqual(len(self.requested_urls), 2)
+        self.assertTrue(NodeCapabilities.objects.get(node=self.node).author_trailing_slash)
+
+        self.requested_urls = []
+        node = Node.objects.get(id=self.node.id)
+        node.get_author(self.author_id)
+        self.assertEqual(self.requested_urls, ["http://www.remote.com/service/author/%s/" % self.author_id])
+
+    def test_capabilities_start_out_unknown(self):
+        capabilities = self.node.get_capabilities()
+
+        self.assertIsNone(capabilities.author_trailing_slash)
+        self.assertIsNone(capabilities.supports_friends_search)
+
+    def test_unreachable_friends_search_falls_back_without_being_learned(self):
+        def search_author_friends(author_id, author_uris):
+            raise requests.ConnectionError("Connection refused")
+
+        self.node.search_author_friends = search_author_friends
+        self.node.get_if_authors_are_friends = lambda author_id, author_uri: True
+
+        friend_uri = "http://www.local.com/author/%s" % uuid.uuid4()
+        self.assertEqual(self.node.get_verified_friends(self.author_id, [friend_uri]), [friend_uri])
+        self.assertIsNone(self.node.get_capabilities().supports_friends_search)
+
+    def test_capabilities_learned_in_worker_threads_are_saved_from_the_calling_thread(self):
+        capabilities = self.node.get_capabilities()
+        saving_threads = []
+
+        def learn(capability):
+            capabilities.learn(capability, True)
+            return threading.current_thread()
+
+        def update(queryset, **kwargs):
+            saving_threads.append(threading.current_thread())
+            return real_update(queryset, **kwargs)
+
+        real_update = QuerySet.update
+        QuerySet.update = update
+        try:
+            worker_threads = bounded_map(learn, ['supports_gzip', 'supports_post_batch'], 2)
+        finally:
+            QuerySet.update = real_update
+
+        self.assertNotIn(threading.current_thread(), worker_threads)
+        self.assertEqual(saving_threads, [threading.current_thread()] * 2)
+
+        capabilities = NodeCapabilities.objects.get(node=self.node)
+        self.assertTrue(capabilities.supports_gzip)
+        self.assertTrue(capabilities.supports_post_batch)
+
+    @override_settings(FEDERATION_TRANSFER_STATS_FLUSH_INTERVAL=0)
+    def test_transfer_stats_recorded_in_worker_threads_are_saved_from_the_calling_thread(self):
+        # Start from nothing, without what the other tests left behind
+        flush_transfer_stats()
+        NodeTransferStats.objects.all().delete()
+        saving_threads = []
+
+        def update(queryset, **kwargs):
+            saving_threads.append(threading.current_thread())
+            return real_update(queryset, **kwargs)
+
+        real_update = QuerySet.update
+        QuerySet.update = update
+        try:
+            bounded_map(lambda body: record_response(self.node, make_response(200, body)), [{}, {"a": 1}], 2)
+        finally:
+            QuerySet.update = real_update
+
+        self.assertTrue(saving_threads)
+        self.assertEqual(set(saving_threads), {threading.current_thread()})
+        self.assertEqual(NodeTransferStats.objects.get(node=self.node).responses, 2)
+
+    def test_ingestion_does_not_fetch_authors_one_by_one(self):
+        real_post = requests.post
+        requests.post = lambda url, **kwargs: make_response(404)
+        try:
+            posts_json = [{"author": {"id": "http://www.remote.com/service/author/%s" % uuid.uuid4()}}
+                          for _ in range(3)]
+            fetch_unknown_remote_authors(self.node, posts_json)
+        finally:
+            requests.post = real_post
+
+        self.assertFalse(self.node.get_capabilities().supports_author_batch)
+        self.assertEqual(self.requested_urls, [])
+
+    def test_unreachable_author_batches_fall_back_without_being_learned(self):
+        def post(url, **kwargs):
+            raise requests.ConnectionError("Connection refused")
+
+        real_post = requests.post
+        requests.post = post
+        try:
+            authors = self.node.create_or_update_remote_authors([self.author_id])
+        finally:
+            requests.post = real_post
+
+        self.assertEqual([author.id for author in authors], [self.author_id])
+        self.assertIsNone(self.node.get_capabilities().supports_author_batch)
+
+    def test_unrecognized_batch_responses_do_not_delete_posts(self):
+        author = Author.objects.create(displayName="Remote Author", node=self.node)
+        post = Post.objects.create(author=author, title="Remote", description="Remote", content="Remote",
+                                   content_type="text/plain", visibility="PUBLIC")
+
+        real_post = requests.post
+        requests.post = lambda url, **kwargs: make_response(200, {"unexpected": True})
+        requests.get = lambda url, **kwargs: make_response(500)
+        try:
+            with self.assertRaises(requests.HTTPError):
+                refresh_remote_posts.now(str(self.node.id), [str(post.id)])
+        finally:
+            requests.post = real_post
+
+        self.assertTrue(Post.objects.filter(id=post.id).exists())
+        self.assertIsNot(self.node.get_capabilities().supports_post_batch, True)
+
+    def test_posts_are_deleted_when_the_node_says_they_are_gone(self):
+        author = Author.objects.create(displayName="Remote Author", node=self.node)
+        post = Post.objects.create(author=author, title="Remote", description="Remote", content="Remote",
+                                   content_type="text/plain", visibility="PUBLIC")
+
+        real_post = requests.post
+        requests.post = lambda url, **kwargs: make_response(404)
+        try:
+            refresh_remote_posts.now(str(self.node.id), [str(post.id)])
+        finally:
+            requests.post = real_post
+
+        self.assertFalse(Post.objects.filter(id=post.id).exists())
+
+    def test_unreachable_post_batches_fall_back_without_being_learned(self):
+        author = Author.objects.create(displayName="Remote Author", node=self.node)
+        post = Post.objects.create(author=author, title="Remote", description="Remote", content="Remote",
+                                   content_type="text/plain", visibility="PUBLIC")
+
+        def post_batch(url, **kwargs):
+            raise requests.Timeout("Timed out")
+
+        real_post = requests.post
+        requests.post = post_batch
+        try:
+            refresh_remote_posts.now(str(self.node.id), [str(post.id)])
+        finally:
+            requests.post = real_post
+
+        # Asked for on its own, and the node says it's gone
+        self.assertEqual(len(self.requested_urls), 1)
+        self.assertFalse(Post.objects.filter(id=post.id).exists())
+        self.assertIsNone(self.node.get_capabilities().supports_post_batch)
@@ -0,0 +1,58 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.six import StringIO
+
+from social.app.models.node import Node
+from social.app.models.noderegistry import node_registry, ensure_local_node
+
+
+class NodeRegistryTestCase(TestCase):
+    def setUp(self):
+        self.local_node = Node.objects.create(name="Local", host="http://www.local.com/",
+                                              service_url="http://www.local.com/service/", local=True,
+                                              incoming_username="local")
+        self.remote_node = Node.objects.create(name="Remote", host="http://www.remote.com/",
+                                               service_url="http://www.remote.com/service/",
+                                               incoming_username="remote")
+
+    def test_lookups_are_served_without_queries(self):
+        node_registry.get_local()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(node_registry.get_local(), self.local_node)
+            self.assertEqual(node_registry.get_remote(), [self.remote_node])
+            self.assertEqual(node_registry.get(self.remote_node.id), self.remote_node)
+            self.assertEqual(node_registry.get_by_host("http://www.remote.com/"), self.remote_node)
+            self.assertEqual(node_registry.get_by_service_url("http://www.remote.com/service/"), self.remote_node)
+            self.assertEqual(node_registry.get_by_incoming_username("remote"), self.remote_node)
+
+            with self.assertRaises(Node.DoesNotExist):
+                node_registry.get_by_host("http://www.unknown.com/")
+
+    def test_saving_or_deleting_a_node_reloads_the_registry(self):
+        self.remote_node.host = "http://www.moved.com/"
+        self.remote_node.save()
+        self.assertEqual(node_registry.get_by_host("http://www.moved.com/").id, self.remote_node.id)
+
+        self.remote_node.delete()
+        self.assertEqual(node_registry.get_remote(), [])
+
+
+class EnsureLocalNodeTestCase(TestCase):
+    def test_local_node_is_created_once(self):
+        node = ensure_local_node("http://www.local.com")
+
+        self.assertEqual(node.host, "www.local.com")
+        self.assertEqual(node.service_url, "http://www.local.com/service/")
+
+        node_registry.get_local()
+        with self.assertNumQueries(0):
+            self.assertEqual(ensure_local_node("http://www.local.com/"), node)
+
+    def test_local_node_follows_the_server(self):
+        ensure_local_node("http://www.local.com/")
+        call_command('bootstrap_local_node', 'https://www.moved.com/', stdout=StringIO())
+
+        node = Node.objects.get(local=True)
+        self.assertEqual(node.service_url, "https://www.moved.com/service/")
+        self.assertEqual(node_registry.get_local(), node)
@@ -0,0 +1,61 @@
+import json
+import uuid
+from datetime import timedelta
+
+from background_task.models import Task
+from django.test import TestCase
+from django.utils import timezone
+
+from social.app.models.author import Author
+from social.app.models.node import Node
+from social.app.models.remotefriendlist import RemoteFriendList, get_refresh_lag_stats
+
+
+class RemoteFriendListTestCase(TestCase):
+    def setUp(self):
+        node = Node.objects.create(name="Remote", host="http://www.remote.com/",
+                                   service_url="http://www.remote.com/service/")
+        self.remote_author = Author.objects.create(displayName="Remote Author", node=node)
+        self.friend_id = uuid.uuid4()
+
+    def test_missing_mirror_schedules_a_refresh(self):
+        self.assertEqual(RemoteFriendList.get_friend_ids([self.remote_author]), set())
+        self.assertEqual(Task.objects.filter(task_name="social.tasks.refresh_remote_friend_list").count(), 1)
+
+        # Asking again before the refresh has run doesn't queue it twice
+        RemoteFriendList.get_friend_ids([self.remote_author])
+        self.assertEqual(Task.objects.filter(task_name="social.tasks.refresh_remote_friend_list").count(), 1)
+
+        self.assertIsNotNone(RemoteFriendList.objects.get(author=self.remote_author).refresh_lag())
+
+    def test_fresh_mirror_is_read_without_a_refresh(self):
+        RemoteFriendList.objects.create(author=self.remote_author, refreshed_at=timezone.now(),
+                                        friend_ids_json=json.dumps([str(self.friend_id)]))
+
+        self.assertEqual(RemoteFriendList.get_friend_ids([self.remote_author]), {self.friend_id})
+        self.assertEqual(Task.objects.count(), 0)
+
+    def test_stale_mirror_is_still_read(self):
+        RemoteFriendList.objects.create(author=self.remote_author, refreshed_at=timezone.now() - timedelta(days=1),
+                                        friend_ids_json=json.dumps([str(self.friend_id)]))
+
+        self.assertEqual(RemoteFriendList.get_friend_ids([self.remote_author]), {self.friend_id})
+        self.assertEqual(Task.objects.count(), 1)
+
+        # Until the refresh gets through, reading it again writes nothing
+        with self.assertNumQueries(1):
+            self.assertEqual(RemoteFriendList.get_friend_ids([self.remote_author]), {self.friend_id})
+
+    def test_stale_mirror_is_refreshed_again_when_the_refresh_does_not_get_through(self):
+        RemoteFriendList.objects.create(author=self.remote_author, refreshed_at=timezone.now() - timedelta(days=1),
+                                        stale_since=timezone.now() - timedelta(days=1))
+
+        RemoteFriendList.get_friend_ids([self.remote_author])
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_refresh_lag_is_summarized(self):
+        RemoteFriendList.objects.create(author=self.remote_author, refreshed_at=timezone.now() - timedelta(days=1))
+
+        stats = get_refresh_lag_stats()
+        self.assertEqual((stats["count"], stats["stale"]), (1, 1))
+        self.assertGreaterEqual(stats["max_refresh_lag"], timedelta(days=1).total_seconds())
@@ -0,0 +1,69 @@
+import hashlib
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from social.app.models.singleflight import SingleFlight, shared_do
+
+
+class SingleFlightTestCase(SimpleTestCase):
+    def setUp(self):
+        self.single_flight = SingleFlight()
+        self.calls = 0
+        self.release = threading.Event()
+
+    def slow_fetch(self):
+        self.calls += 1
+        self.release.wait(5)
+        return {"posts": []}
+
+    def test_concurrent_calls_share_one_fetch(self):
+        results = []
+
+        def worker():
+            results.append(self.single_flight.do("http://www.remote.com/service/posts/1", self.slow_fetch))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+
+        # Give every thread a chance to join the in-flight call before letting it finish
+        time.sleep(0.2)
+        self.release.set()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(len([shared for (result, shared) in results if not shared]), 1)
+
+    def test_sequential_calls_fetch_again(self):
+        self.release.set()
+
+        self.single_flight.do("key", self.slow_fetch)
+        self.single_flight.do("key", self.slow_fetch)
+
+        self.assertEqual(self.calls, 2)
+
+    def test_exceptions_are_raised_for_every_caller(self):
+        def failing_fetch():
+            raise ValueError("Remote node is down")
+
+        with self.assertRaises(ValueError):
+            self.single_flight.do("key", failing_fetch)
+
+        self.assertEqual(len(self.single_flight._calls), 0)
+
+    @override_settings(FEDERATION_SINGLE_FLIGHT_SHARED_TIMEOUT=1)
+    def test_shared_calls_only_get_results_of_flights_they_waited_on(self):
+        cache.clear()
+        self.assertEqual(shared_do("key", lambda: "first"), ("first", False))
+
+        # Another process is in the middle of fetching it again, and gives up
+        cache.add('singleflight:lock:' + hashlib.sha1(b"key").hexdigest(), "other", 1)
+
+        self.assertEqual(shared_do("key", lambda: "second"), ("second", False))
+        cache.clear()
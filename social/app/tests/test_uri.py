@@ -0,0 +1,40 @@
+import uuid
+
+from django.test import SimpleTestCase
+
+from social.app.models.author import Author
+from social.app.models.node import Node
+from social.app.models.post import Post
+from social.app.models.uri import parse_author_uri, parse_author_uris
+
+
+class URITestCase(SimpleTestCase):
+    author_id = uuid.UUID("de305d54-75b4-431b-adb2-eb6b9e546013")
+    author_uri = "http://api.socdis.com/service/author/de305d54-75b4-431b-adb2-eb6b9e546013"
+
+    def test_author_uris_are_parsed(self):
+        self.assertEqual(Author.parse_uri(self.author_uri), ("http://api.socdis.com/service/", self.author_id))
+        self.assertEqual(Author.get_id_from_uri(self.author_uri + "/"), self.author_id)
+
+    def test_parsed_author_uris_are_memoized(self):
+        parse_author_uri.cache.clear()
+
+        Author.get_id_from_uri(self.author_uri)
+        Author.get_id_from_uri(self.author_uri)
+
+        self.assertEqual(parse_author_uri.cache.hits, 1)
+        self.assertEqual(parse_author_uri.cache.misses, 1)
+
+    def test_bad_author_uris_still_raise(self):
+        with self.assertRaises(AttributeError):
+            Author.get_id_from_uri("http://api.socdis.com/service/posts/1")
+
+    def test_bulk_parse_skips_bad_uris(self):
+        self.assertEqual(parse_author_uris([self.author_uri, "not a uri"]), {self.author_uri: self.author_id})
+
+    def test_other_uris_are_parsed(self):
+        self.assertEqual(Post.get_id_from_uri("http://api.socdis.com/service/posts/578e6948-130b-4976-bca1"),
+                         "578e6948-130b-4976-bca1")
+        self.assertEqual(Node.get_host_from_uri("http://api.socdis.com:8000/service/"), "api.socdis.com")
+        self.assertEqual(Author.get_uri_from_host_and_uuid("api.socdis.com", str(self.author_id)),
+                         "http://api.socdis.com/author/de305d54-75b4-431b-adb2-eb6b9e546013")
@@ -18,6 +18,8 @@ from social.app.forms.author import FindRemoteAuthorForm
 from social.app.forms.user_profile import UserFormUpdate
 from social.app.models.author import Author
 from social.app.models.node import Node
+from social.app.models.noderegistry import node_registry
+from social.app.models.outbox import OutboundDelivery, get_pending_deliveries
 from social.app.models.post import Post
 from social.app.models.post import (get_all_public_posts, get_all_friend_posts, get_all_foaf_posts,
     get_all_remote_node_posts, get_all_local_private_posts)
@@ -41,7 +43,7 @@ def get_posts_by_author(request, pk):
     current_user = request.user
     author = Author.objects.get(id=pk)
     author_guid = str(pk)
-    current_author = Author.objects.get(user=request.user.id)
+    current_author = current_user.profile
     current_author_guid = str(current_author.id)
     context = dict()
     context['show_add_post_button'] = "false"
@@ -154,7 +156,7 @@ class AuthorListView(generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super(AuthorListView, self).get_context_data(**kwargs)
-        context['show_remote_find_link'] = Node.objects.filter(local=False)
+        context['show_remote_find_link'] = node_registry.get_remote()
         return context
 
 
@@ -172,7 +174,7 @@ class AuthorDetailView(generic.DetailView):
 
         if author is None:
             # No Author found -- so let's go ask our remote Nodes if they've got it
-            for node in Node.objects.filter(local=False):
+            for node in node_registry.get_remote():
                 try:
                     author = node.create_or_update_remote_author(author_id)
                 except HTTPError:
@@ -214,8 +216,14 @@ class AuthorDetailView(generic.DetailView):
 
             context['show_follow_button'] = logged_in_author.can_follow(detail_author)
             context['show_unfollow_button'] = logged_in_author.follows(detail_author)
-            context['show_friend_request_button'] = logged_in_author.can_send_a_friend_request_to(detail_author)
-            context['outgoing_friend_request_for'] = logged_in_author.has_outgoing_friend_request_for(detail_author)
+            # A friend request to a remote author that's still being delivered counts as sent
+            pending_friend_request = detail_author.id in get_pending_deliveries(
+                logged_in_author, OutboundDelivery.FRIEND_REQUEST)
+
+            context['show_friend_request_button'] = \
+                logged_in_author.can_send_a_friend_request_to(detail_author) and not pending_friend_request
+            context['outgoing_friend_request_for'] = \
+                logged_in_author.has_outgoing_friend_request_for(detail_author) or pending_friend_request
             context['incoming_friend_request_from'] = logged_in_author.has_incoming_friend_request_from(detail_author)
             context['is_friends'] = logged_in_author.friends_with(detail_author)
         else:
@@ -244,7 +252,7 @@ def find_remote_author(request):
             author = None
 
             try:
-                node = Node.objects.get(host=host)
+                node = node_registry.get_by_host(host)
                 if node.local:
                     author = Author.objects.get(id=pk)
                 else:
@@ -3,6 +3,7 @@ from django.urls import reverse
 from django.views import generic
 
 from social.app.models.author import Author
+from social.app.models.outbox import OutboundDelivery, get_pending_deliveries
 
 
 class FriendRequestsListView(generic.ListView):
@@ -12,6 +13,12 @@ class FriendRequestsListView(generic.ListView):
     def get_queryset(self):
         return self.request.user.profile.incoming_friend_requests.all()
 
+    def get_context_data(self, **kwargs):
+        context = super(FriendRequestsListView, self).get_context_data(**kwargs)
+        context["pending_acceptances"] = get_pending_deliveries(
+            self.request.user.profile, OutboundDelivery.FRIEND_REQUEST_ACCEPT)
+        return context
+
     def post(self, request):
         logged_in_author = self.request.user.profile
         accepted_friend_requests = request.POST.getlist('accepted_friend_requests')
@@ -22,14 +29,8 @@ class FriendRequestsListView(generic.ListView):
             if new_friend.node.local:
                 logged_in_author.accept_friend_request(new_friend)
             else:
-                r = new_friend.node.post_friend_request(request, logged_in_author, new_friend)
-
-                if 200 <= r.status_code < 300:
-                    # Success!
-                    logged_in_author.accept_friend_request(new_friend)
-                else:
-                    # Server's not working right now, but we still want to accept other requests, so just skip it
-                    pass
+                # Sent to the remote node in the background; the request stays listed as pending until they get it
+                new_friend.node.post_friend_request(request, logged_in_author, new_friend, accept=True)
 
         logged_in_author.save()
 
@@ -18,7 +18,7 @@ from social.app.forms.comment import CommentForm
 from social.app.forms.post import PostForm
 from social.app.models.author import Author
 from social.app.models.comment import Comment
-from social.app.models.node import Node
+from social.app.models.noderegistry import node_registry
 from social.app.models.post import Post
 from social.app.models.post import (get_all_public_posts, get_all_friend_posts, get_all_foaf_posts,
                                     get_remote_node_posts, get_all_remote_node_posts, get_all_local_private_posts)
@@ -61,7 +61,7 @@ def my_stream_posts(request):
     if request.user.is_authenticated():
         user = request.user
 
-        author = Author.objects.get(user=request.user.id)
+        author = user.profile
 
         author_uri = create_author_uri(author)
 
@@ -145,7 +145,7 @@ class PostDetailView(generic.DetailView):
 
         if post is None:
             # No Author found -- so let's go ask our remote Nodes if they've got it
-            for node in Node.objects.filter(local=False):
+            for node in node_registry.get_remote():
                 try:
                     (post, self.comments, self.count) = node.create_or_update_remote_post(post_id)
                 except Exception as e:
@@ -343,6 +343,7 @@ def add_comment_to_post(request, pk):
                 comment.save()
             else:
                 post.save_remote_comment(request, comment)
+                messages.info(request, "Your comment will show up once it has been delivered to the post's server.")
 
             return redirect('app:posts:detail', pk=post.pk)
     else:
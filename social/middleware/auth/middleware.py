@@ -2,7 +2,7 @@ from django.shortcuts import redirect
 from django.urls import reverse
 from django.utils.encoding import iri_to_uri
 
-from social.app.models.author import Author
+from social.app.models.author import is_activated
 
 
 class AuthRequiredMiddleware(object):
@@ -12,10 +12,19 @@ class AuthRequiredMiddleware(object):
     Forces a redirect to the home page on accessing the sign-up page while authenticated.
     """
 
+    def __init__(self):
+        # Worked out once per process instead of on every request
+        self.signed_out_only_paths = frozenset(["accounts/register/"])
+        self.unactivated_paths = frozenset([
+            "logout/",
+            iri_to_uri(reverse('activation_required', args=[])).lstrip('/'),
+        ])
+        self.unactivated_prefixes = ('admin', 'service')
+
     def process_request(self, request):
         path = request.path_info.lstrip('/')
         if request.user.is_authenticated():
-            if any(path == eu for eu in ["accounts/register/"]):
+            if path in self.signed_out_only_paths:
                 return redirect(reverse('app:index'))
 
             # Redirect server admins to the admin app
@@ -25,13 +34,8 @@ class AuthRequiredMiddleware(object):
             elif request.user.username == "api":
                 if not path.startswith('service') and not path.startswith('logout'):
                     return redirect(reverse('docs'))
-            else:
-                user_profile = Author.objects.get(user_id=request.user.id)
-                if not user_profile.activated:
-                    # Redirect users that haven't been approved by the server admin
-                    if not path.startswith('admin') and not path.startswith('service') and \
-                            not any(path == eu for eu in ["logout/",
-                                                          iri_to_uri(reverse('activation_required', args=[])).lstrip(
-                                                              '/')]):
-                        return redirect(reverse('activation_required', args=[]))
+            elif not is_activated(request.user):
+                # Redirect users that haven't been approved by the server admin
+                if not path.startswith(self.unactivated_prefixes) and path not in self.unactivated_paths:
+                    return redirect(reverse('activation_required', args=[]))
         return None
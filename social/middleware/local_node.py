@@ -1,38 +1,27 @@
-import urlparse
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 
-from social.app.models.node import Node
+from social.app.models.noderegistry import ensure_local_node
 
 
 class LocalNodeMiddleware(object):
     """
-    Ensures a Node that represents the local server always exists.
+    Ensures a Node that represents the local server always exists, on servers that don't set LOCAL_NODE_URL.
 
-    No other suitable hook for code that's run once and can access the server's host name
-    was found. A migration was not suitable for the second reason.
+    Servers that do set it get their local Node from the bootstrap_local_node command instead, which is run after
+    every migrate, so this middleware takes itself out of the request cycle. Otherwise the host name of the first
+    request each process serves is used, without a write unless it differs from what's saved.
     """
 
     def __init__(self):
+        if settings.LOCAL_NODE_URL:
+            raise MiddlewareNotUsed()
+
         self.local_node_created = False
 
     def process_request(self, request):
         if not self.local_node_created:
-            nodes = Node.objects.filter(local=True)
-
-            host = request.get_host()
-            base_url = request.scheme + '://' + host
-            service_url = urlparse.urljoin(base_url, "service/")
-
-            if len(nodes) == 0:
-                node = Node(name="Local", host=host, service_url=service_url, local=True)
-                node.save()
-            elif len(nodes) == 1:
-                node = nodes[0]
-                node.host = host
-                node.service_url = service_url
-                node.save()
-            else:
-                raise RuntimeError("More than one local node found in Nodes table. Please fix before continuing.")
-
+            ensure_local_node(request.scheme + '://' + request.get_host())
             self.local_node_created = True
 
         return None
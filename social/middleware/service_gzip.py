@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+
+
+class ServiceGZipMiddleware(GZipMiddleware):
+    """
+    Gzips responses from the service API for clients that accept it.
+
+    Pages of posts (with their comments and base64 images) compress very well, but anything shorter than
+    SERVICE_GZIP_MIN_LENGTH bytes isn't worth the CPU time. Streaming responses are compressed as they're sent.
+    """
+
+    def process_response(self, request, response):
+        if not request.path_info.startswith('/service/'):
+            return response
+
+        if not response.streaming and len(response.content) < settings.SERVICE_GZIP_MIN_LENGTH:
+            return response
+
+        return super(ServiceGZipMiddleware, self).process_response(request, response)
@@ -51,6 +51,7 @@ INSTALLED_APPS = [
 MIDDLEWARE_CLASSES = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'social.middleware.service_gzip.ServiceGZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -180,3 +181,60 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 100
 }
 
+
+# How long (in seconds) identical outbound federation requests made by different processes wait on each other's
+# results. Only useful with a cache shared between processes; 0 limits request coalescing to a single process.
+FEDERATION_SINGLE_FLIGHT_SHARED_TIMEOUT = int(environ.get('FEDERATION_SINGLE_FLIGHT_SHARED_TIMEOUT', 0))
+
+# The most requests to remote nodes made at the same time on behalf of a single request or task
+FEDERATION_MAX_CONCURRENT_REQUESTS = int(environ.get('FEDERATION_MAX_CONCURRENT_REQUESTS', 4))
+
+# How long (in seconds) a remote node's answer to whether two Authors are friends is trusted
+FEDERATION_FRIENDSHIP_CACHE_TIMEOUT = int(environ.get('FEDERATION_FRIENDSHIP_CACHE_TIMEOUT', 60))
+
+# How long (in seconds) our mirror of a remote Author's friends is used before it gets refreshed in the background
+FEDERATION_FRIEND_LIST_TTL = int(environ.get('FEDERATION_FRIEND_LIST_TTL', 300))
+
+# Background delivery of Comments and friend requests to remote nodes (see OutboundDelivery)
+FEDERATION_OUTBOX_MAX_ATTEMPTS = int(environ.get('FEDERATION_OUTBOX_MAX_ATTEMPTS', 10))
+# Delay before the first retry (in seconds), doubled after every failed attempt, up to the max
+FEDERATION_OUTBOX_BASE_RETRY_DELAY = int(environ.get('FEDERATION_OUTBOX_BASE_RETRY_DELAY', 10))
+FEDERATION_OUTBOX_MAX_RETRY_DELAY = int(environ.get('FEDERATION_OUTBOX_MAX_RETRY_DELAY', 3600))
+# The most deliveries sent to any one remote node at the same time, and how long (in seconds) the rest wait
+FEDERATION_OUTBOX_MAX_IN_FLIGHT_PER_NODE = int(environ.get('FEDERATION_OUTBOX_MAX_IN_FLIGHT_PER_NODE', 2))
+FEDERATION_OUTBOX_BUSY_RETRY_DELAY = int(environ.get('FEDERATION_OUTBOX_BUSY_RETRY_DELAY', 5))
+# How long (in seconds) a delivery may take before it's assumed to have died with its worker
+FEDERATION_OUTBOX_REQUEST_TIMEOUT = int(environ.get('FEDERATION_OUTBOX_REQUEST_TIMEOUT', 30))
+FEDERATION_OUTBOX_SENDING_TIMEOUT = int(environ.get('FEDERATION_OUTBOX_SENDING_TIMEOUT', 300))
+
+# How long (in seconds) Nodes changed by other processes can take to show up in this process' NodeRegistry
+FEDERATION_NODE_REGISTRY_TIMEOUT = int(environ.get('FEDERATION_NODE_REGISTRY_TIMEOUT', 60))
+
+# Service API responses shorter than this (in bytes) are sent uncompressed
+SERVICE_GZIP_MIN_LENGTH = int(environ.get('SERVICE_GZIP_MIN_LENGTH', 1024))
+
+# How often (in seconds) the bytes sent to us by each remote node are added to its NodeTransferStats
+FEDERATION_TRANSFER_STATS_FLUSH_INTERVAL = int(environ.get('FEDERATION_TRANSFER_STATS_FLUSH_INTERVAL', 60))
+
+# The most Authors or Posts that can be asked for in one request to a batch endpoint, ours or a remote node's
+FEDERATION_MAX_BATCH_SIZE = int(environ.get('FEDERATION_MAX_BATCH_SIZE', 100))
+
+# Where responses to our GETs to remote nodes are kept, to be revalidated or reused (see HTTPCache), and how many bytes
+# of them to keep. 0 turns the cache off. The directory must belong to us and be private (mode 0700), or it's not used.
+FEDERATION_HTTP_CACHE_DIR = environ.get('FEDERATION_HTTP_CACHE_DIR', os.path.join(BASE_DIR, 'http-cache'))
+FEDERATION_HTTP_CACHE_MAX_BYTES = int(environ.get('FEDERATION_HTTP_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+
+# How long (in seconds) a page of local Posts served by the service API is shared between remote nodes that may see
+# the same Posts. Any change to the Posts makes it stale sooner. 0 turns this off.
+SERVICE_POSTS_CACHE_TIMEOUT = int(environ.get('SERVICE_POSTS_CACHE_TIMEOUT', 300))
+
+# How long (in seconds) a remote node's password is trusted after being checked against its hash
+FEDERATION_CREDENTIALS_CACHE_TIMEOUT = int(environ.get('FEDERATION_CREDENTIALS_CACHE_TIMEOUT', 300))
+
+# How long (in seconds) an Author's approval by the server admin is remembered between page loads. Only used with a
+# cache shared by every process (see CACHES), so that taking an approval back reaches all of them.
+AUTH_ACTIVATION_CACHE_TIMEOUT = int(environ.get('AUTH_ACTIVATION_CACHE_TIMEOUT', 300))
+
+# Base URL of this server (e.g. https://example.herokuapp.com/), used to set up its local Node after every migrate.
+# If unset, it's taken from the first request each process serves instead (see LocalNodeMiddleware).
+LOCAL_NODE_URL = environ.get('LOCAL_NODE_URL', '')
@@ -1,4 +1,5 @@
 import feedparser
+import logging
 import re
 
 from background_task import background
@@ -41,4 +42,45 @@ def get_github_activity(author_id):
                                        "content_type": "text/markdown",
                                        "content": content_str,
                                        "published": x["published"].encode(encoding)},
-                           )
\ No newline at end of file
+                           )
+
+
+# Keeps the local mirror of a remote Author's friends up to date
+@background()
+def refresh_remote_friend_list(author_id):
+    from social.app.models.remotefriendlist import RemoteFriendList
+
+    (friend_list, created) = RemoteFriendList.objects.get_or_create(author_id=author_id)
+
+    if not friend_list.is_fresh():
+        friend_list.refresh()
+
+
+# Sends a queued up request to a remote node, see OutboundDelivery
+@background()
+def deliver_outbound(delivery_id):
+    from social.app.models.outbox import OutboundDelivery
+
+    try:
+        delivery = OutboundDelivery.objects.get(id=delivery_id)
+    except OutboundDelivery.DoesNotExist:
+        logging.warn("Outbound delivery %s no longer exists. Skipping it." % delivery_id)
+        return
+
+    delivery.deliver()
+
+
+# Fetches the remote posts that their node told us about through our inbox
+@background()
+def refresh_remote_posts(node_id, post_ids):
+    import uuid
+
+    from social.app.models.node import Node
+
+    node = Node.objects.get(id=node_id)
+    post_uuids = set(uuid.UUID(post_id) for post_id in post_ids)
+
+    (posts, gone_ids) = node.create_or_update_remote_posts(post_uuids)
+
+    # Whatever the node says is gone (or we're no longer allowed to see) shouldn't be shown from our copy anymore
+    Post.objects.filter(id__in=gone_ids, author__node=node).delete()